@@ -1,7 +1,10 @@
 # Copyright 2023 Dixmit
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from collections import defaultdict
+import logging
+import re
+import time
+from collections import Counter, defaultdict
 
 from dateutil import rrule
 from dateutil.relativedelta import relativedelta
@@ -9,8 +12,11 @@ from dateutil.relativedelta import relativedelta
 from odoo import Command, _, api, fields, models
 from odoo.exceptions import UserError
 from odoo.fields import first
+from odoo.osv import expression
 from odoo.tools import float_compare, float_is_zero
 
+_logger = logging.getLogger(__name__)
+
 
 class AccountBankStatementLine(models.Model):
     _name = "account.bank.statement.line"
@@ -961,53 +967,291 @@ class AccountBankStatementLine(models.Model):
     @api.model_create_multi
     def create(self, mvals):
         result = super().create(mvals)
+        result._batch_auto_reconcile()
+        return result
+
+    def _auto_reconcile_data(self, res):
+        """Reconcile data of the line for the result of the reconcile models"""
+        liquidity_lines, _suspense_lines, _other_lines = self._seek_for_lines()
+        data = []
+        for line in liquidity_lines:
+            reconcile_auxiliary_id, lines = self._get_reconcile_line(
+                line,
+                "liquidity",
+                move=True,
+            )
+            data += lines
+        reconcile_auxiliary_id = 1
+        if res.get("status", "") == "write_off":
+            return self._recompute_suspense_line(
+                *self._reconcile_data_by_model(
+                    data, res["model"], reconcile_auxiliary_id
+                ),
+                self.manual_reference,
+            )
+        if res.get("amls"):
+            amount = self.amount_currency or self.amount
+            for line in res.get("amls", []):
+                reconcile_auxiliary_id, line_datas = self._get_reconcile_line(
+                    line, "other", is_counterpart=True, max_amount=amount, move=True
+                )
+                amount -= sum(line_data.get("amount") for line_data in line_datas)
+                data += line_datas
+            return self._recompute_suspense_line(
+                data,
+                reconcile_auxiliary_id,
+                self.manual_reference,
+            )
+        return {}
+
+    def _batch_auto_reconcile(self):
+        """Match and reconcile the lines with the auto reconcile models.
+
+        The models are searched once for all the lines and the open journal
+        items they can propose are read once and indexed by partner and
+        reference, instead of running the candidates queries of
+        `_apply_rules` for every line. Each journal item is proposed to one
+        line only. The matched lines are reconciled once the whole batch has
+        been matched.
+
+        :return: dict with the number of lines processed, the number of lines
+            auto matched and the duration in seconds.
+        """
+        start = time.time()
+        lines = self.filtered(lambda r: not r.is_reconciled)
         models = self.env["account.reconcile.model"].search(
             [
                 ("rule_type", "in", ["invoice_matching", "writeoff_suggestion"]),
-                ("company_id", "in", result.company_id.ids),
+                ("company_id", "in", lines.company_id.ids),
                 ("auto_reconcile", "=", True),
             ]
         )
-        for record in result:
-            res = models._apply_rules(record, record._retrieve_partner())
-            if not res:
-                continue
-            liquidity_lines, suspense_lines, other_lines = record._seek_for_lines()
-            data = []
-            for line in liquidity_lines:
-                reconcile_auxiliary_id, lines = record._get_reconcile_line(
-                    line,
-                    "liquidity",
-                    move=True,
+        matched = self.browse()
+        if lines and models:
+            partners = {record: record._retrieve_partner() for record in lines}
+            candidates = lines._batch_reconcile_candidates(
+                models.filtered(lambda m: m.rule_type == "invoice_matching"),
+                partners,
+            )
+            to_reconcile = []
+            for record in lines:
+                res = record._batch_apply_rules(
+                    models.filtered(lambda m: m.company_id == record.company_id),
+                    partners[record],
+                    candidates,
                 )
-                data += lines
-            reconcile_auxiliary_id = 1
-            if res.get("status", "") == "write_off":
-                data = record._recompute_suspense_line(
-                    *record._reconcile_data_by_model(
-                        data, res["model"], reconcile_auxiliary_id
-                    ),
-                    self.manual_reference,
+                if not res:
+                    continue
+                data = record._auto_reconcile_data(res)
+                if not data.get("can_reconcile"):
+                    continue
+                if res.get("amls"):
+                    candidates["used"].update(res["amls"].ids)
+                to_reconcile.append((record, data))
+            for record, data in to_reconcile:
+                getattr(
+                    record, "_reconcile_bank_line_%s" % record.journal_id.reconcile_mode
+                )(record._prepare_reconcile_line_data(data["data"]))
+                matched |= record
+        result = {
+            "total": len(self),
+            "matched": len(matched),
+            "duration": time.time() - start,
+        }
+        if len(self) > 1:
+            _logger.info(
+                "Auto reconciled %(matched)s of %(total)s statement lines "
+                "in %(duration).2fs",
+                result,
+            )
+        return result
+
+    def _batch_reconcile_candidates(self, models, partners):
+        """Open journal items the invoice matching models may propose for the
+        lines, read in a single query.
+
+        :return: dict with the item values by id ("amls"), the item ids by
+            partner ("partner") and by reference token ("token") and the set
+            of items already proposed ("used").
+        """
+        candidates = {
+            "amls": {},
+            "partner": defaultdict(list),
+            "token": defaultdict(list),
+            "used": set(),
+        }
+        if not self or not models:
+            return candidates
+        tokens = set()
+        for record in self:
+            for model in models:
+                numerical_tokens, exact_tokens, _text_tokens = (
+                    model._get_invoice_matching_st_line_tokens(record)
                 )
-            elif res.get("amls"):
-                amount = self.amount_currency or self.amount
-                for line in res.get("amls", []):
-                    reconcile_auxiliary_id, line_datas = record._get_reconcile_line(
-                        line, "other", is_counterpart=True, max_amount=amount, move=True
-                    )
-                    amount -= sum(line_data.get("amount") for line_data in line_datas)
-                    data += line_datas
-                data = record._recompute_suspense_line(
-                    data,
-                    reconcile_auxiliary_id,
-                    self.manual_reference,
+                tokens.update(numerical_tokens + exact_tokens)
+        partner_ids = list({partner.id for partner in partners.values() if partner})
+        if not tokens and not partner_ids:
+            return candidates
+        domain = expression.OR(
+            [
+                self.filtered(lambda r: r.company_id == company)[
+                    :1
+                ]._get_default_amls_matching_domain()
+                for company in self.company_id
+            ]
+        )
+        self.env["account.move"].flush_model()
+        self.env["account.move.line"].flush_model()
+        query = self.env["account.move.line"]._where_calc(domain)
+        tables, where_clause, where_params = query.get_sql()
+        self.env.cr.execute(
+            """
+            SELECT account_move_line.id, account_move_line.partner_id,
+                account_move_line.currency_id, account_move_line.balance,
+                account_move_line.date, account_move_line.date_maturity,
+                account_move_line.name, candidate_move.name, candidate_move.ref
+            FROM """
+            + tables
+            + """
+            JOIN account_move candidate_move
+                ON candidate_move.id = account_move_line.move_id
+            WHERE """
+            + where_clause,
+            where_params,
+        )
+        for row in self.env.cr.fetchall():
+            aml_id, partner_id, currency_id, balance, date, date_maturity = row[:6]
+            aml_tokens = []
+            for value in row[6:]:
+                if not value:
+                    continue
+                # Same tokens as the queries of _get_invoice_matching_amls_candidates
+                aml_tokens += re.sub(r"[^0-9\s]", "", value).split()
+                aml_tokens.append(value)
+            aml_tokens = [token for token in aml_tokens if token in tokens]
+            if not aml_tokens and partner_id not in partner_ids:
+                continue
+            candidates["amls"][aml_id] = {
+                "partner_id": partner_id,
+                "currency_id": currency_id,
+                "balance": balance,
+                "date": date,
+                "sort_key": (
+                    date_maturity is None,
+                    date_maturity or date,
+                    date,
+                    aml_id,
+                ),
+            }
+            if partner_id:
+                candidates["partner"][partner_id].append(aml_id)
+            for token in aml_tokens:
+                candidates["token"][token].append(aml_id)
+        return candidates
+
+    def _batch_matching_amls_candidates(self, model, partner, candidates):
+        """Indexed version of `_get_invoice_matching_amls_candidates`"""
+        currency = self.foreign_currency_id or self.currency_id
+        date_limit = model.past_months_limit and (
+            fields.Date.context_today(self)
+            - relativedelta(months=model.past_months_limit)
+        )
+
+        def _filter(aml_id):
+            vals = candidates["amls"][aml_id]
+            balance = vals["balance"]
+            return (
+                aml_id not in candidates["used"]
+                and (balance > 0.0 if self.amount > 0.0 else balance < 0.0)
+                and (
+                    not model.match_same_currency or vals["currency_id"] == currency.id
                 )
-            if not data.get("can_reconcile"):
+                and (not partner or vals["partner_id"] == partner.id)
+                and (not date_limit or vals["date"] >= date_limit)
+            )
+
+        def _sorted(aml_ids):
+            return sorted(
+                aml_ids,
+                key=lambda aml_id: candidates["amls"][aml_id]["sort_key"],
+                reverse=model.matching_order == "new_first",
+            )
+
+        numerical_tokens, exact_tokens, _text_tokens = (
+            model._get_invoice_matching_st_line_tokens(self)
+        )
+        nb_match = Counter(
+            aml_id
+            for token in set(numerical_tokens + exact_tokens)
+            for aml_id in candidates["token"].get(token, [])
+            if _filter(aml_id)
+        )
+        if nb_match:
+            aml_ids = sorted(_sorted(nb_match), key=lambda a: -nb_match[a])
+            return {
+                "allow_auto_reconcile": True,
+                "amls": self.env["account.move.line"].browse(aml_ids),
+            }
+        if not partner:
+            return
+        aml_ids = _sorted(filter(_filter, candidates["partner"].get(partner.id, [])))
+        if aml_ids:
+            return {
+                "allow_auto_reconcile": False,
+                "amls": self.env["account.move.line"].browse(aml_ids),
+            }
+
+    def _batch_apply_rules(self, models, partner, candidates):
+        """`_apply_rules` reading the invoice matching candidates from the
+        batch index"""
+        models = models.filtered(lambda m: m.rule_type != "writeoff_button")
+        for model in models.sorted():
+            if not model._is_applicable_for(self, partner):
                 continue
-            getattr(
-                record, "_reconcile_bank_line_%s" % record.journal_id.reconcile_mode
-            )(self._prepare_reconcile_line_data(data["data"]))
-        return result
+            if model.rule_type == "writeoff_suggestion":
+                return {
+                    "model": model,
+                    "status": "write_off",
+                    "auto_reconcile": model.auto_reconcile,
+                }
+            rules_map = model._get_invoice_matching_rules_map()
+            for rule_index in sorted(rules_map.keys()):
+                for rule_method in rules_map[rule_index]:
+                    if rule_method.__name__ == "_get_invoice_matching_amls_candidates":
+                        candidate_vals = self._batch_matching_amls_candidates(
+                            model, partner, candidates
+                        )
+                    else:
+                        candidate_vals = rule_method(self, partner)
+                    if not candidate_vals:
+                        continue
+                    if candidate_vals.get("amls"):
+                        res = model._get_invoice_matching_amls_result(
+                            self, partner, candidate_vals
+                        )
+                        if res:
+                            return {**res, "model": model}
+                    else:
+                        return {**candidate_vals, "model": model}
+        return {}
+
+    def action_batch_auto_reconcile(self):
+        result = self._batch_auto_reconcile()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("Auto reconciliation"),
+                "message": _(
+                    "%(matched)s of %(total)s statement lines auto reconciled "
+                    "in %(duration).2f seconds.",
+                    **result,
+                ),
+                "type": "success" if result["matched"] else "info",
+                "sticky": False,
+                "next": {"type": "ir.actions.act_window_close"},
+            },
+        }
 
     def _synchronize_to_moves(self, changed_fields):
         """We want to avoid to change stuff (mainly amounts ) in accounting entries
@@ -617,6 +617,51 @@ class TestReconciliationWidget(TestAccountReconciliationCommon):
         )
         self.assertTrue(bank_stmt_line.is_reconciled)
 
+    def test_batch_auto_reconcile_on_create(self):
+        """
+        Testing that the lines created together are matched with their
+        invoices by an invoice matching model with auto_reconcile
+        """
+        self.env["account.reconcile.model"].create(
+            {
+                "name": "invoice matching auto",
+                "rule_type": "invoice_matching",
+                "auto_reconcile": True,
+                "match_text_location_label": True,
+                "allow_payment_tolerance": False,
+            }
+        )
+        invoices = [
+            self.create_invoice(currency_id=self.currency_euro_id, invoice_amount=100)
+            for _i in range(3)
+        ]
+        bank_stmt = self.acc_bank_stmt_model.create(
+            {
+                "journal_id": self.bank_journal_euro.id,
+                "date": time.strftime("%Y-07-15"),
+                "name": "test",
+            }
+        )
+        bank_stmt_lines = self.acc_bank_stmt_line_model.create(
+            [
+                {
+                    "name": invoice.name,
+                    "payment_ref": invoice.name,
+                    "journal_id": self.bank_journal_euro.id,
+                    "statement_id": bank_stmt.id,
+                    "amount": 100,
+                    "date": time.strftime("%Y-07-15"),
+                }
+                for invoice in invoices
+            ]
+        )
+        for bank_stmt_line, invoice in zip(bank_stmt_lines, invoices):
+            self.assertTrue(bank_stmt_line.is_reconciled)
+            self.assertEqual(invoice.payment_state, "paid")
+        result = bank_stmt_lines._batch_auto_reconcile()
+        self.assertEqual(result["total"], 3)
+        self.assertEqual(result["matched"], 0)
+
     def test_reconcile_invoice_keep(self):
         """
         We want to test how the keep mode works, keeping the original move lines.
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+#╔══════════════════════════════════════════════════════════════════════╗
+#║                                                                      ║
+#║                  ╔═══╦╗       ╔╗  ╔╗     ╔═══╦═══╗                   ║
+#║                  ║╔═╗║║       ║║ ╔╝╚╗    ║╔═╗║╔═╗║                   ║
+#║                  ║║ ║║║╔╗╔╦╦══╣╚═╬╗╔╬╗ ╔╗║║ ╚╣╚══╗                   ║
+#║                  ║╚═╝║║║╚╝╠╣╔╗║╔╗║║║║║ ║║║║ ╔╬══╗║                   ║
+#║                  ║╔═╗║╚╣║║║║╚╝║║║║║╚╣╚═╝║║╚═╝║╚═╝║                   ║
+#║                  ╚╝ ╚╩═╩╩╩╩╩═╗╠╝╚╝╚═╩═╗╔╝╚═══╩═══╝                   ║
+#║                            ╔═╝║     ╔═╝║                             ║
+#║                            ╚══╝     ╚══╝                             ║
+#║                  SOFTWARE DEVELOPED AND SUPPORTED BY                 ║
+#║                ALMIGHTY CONSULTING SOLUTIONS PVT. LTD.               ║
+#║                      COPYRIGHT (C) 2016 - TODAY                      ║
+#║                      https://www.almightycs.com                      ║
+#║                                                                      ║
+#╚══════════════════════════════════════════════════════════════════════╝
+{
+    'name' : 'Announcement Base',
+    'summary': 'Common recipients, rendering and queueing of SMS and WhatsApp announcements.',
+    'category' : 'Extra-Addons',
+    'version': '1.0.0',
+    'license': 'OPL-1',
+    'depends' : ['hr'],
+    'author': 'Almighty Consulting Solutions Pvt. Ltd.',
+    'website': 'www.almightycs.com',
+    'description': """
+        Base of the SMS and WhatsApp announcements, acs hms
+    """,
+    "data": [],
+    'installable': True,
+    'application': False,
+    'sequence': 2,
+}
+# vim:expandtab:smartindent:tabstop=4:softtabstop=4:shiftwidth=4:
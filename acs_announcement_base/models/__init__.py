@@ -0,0 +1,5 @@
+# -*- encoding: utf-8 -*-
+
+from . import announcement
+
+# vim:expandtab:smartindent:tabstop=4:softtabstop=4:shiftwidth=4:
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import defaultdict
+
+from odoo import fields, models, _
+from odoo.exceptions import UserError
+
+
+class AcsAnnouncementMixin(models.AbstractModel):
+    _name = 'acs.announcement.mixin'
+    _description = 'Announcement Mixin'
+
+    # Queue model of the messages and its field linking them to the announcement
+    _acs_queue_model = False
+    _acs_queue_announcement_field = False
+
+    queued_count = fields.Integer(string='Queued Messages', readonly=True, copy=False,
+        help="Messages already queued for this announcement. Sending again only queues the missing numbers.")
+
+    def acs_get_recipients(self):
+        """(mobile, partner, res_model, res_id) of every announcement recipient"""
+        recipients = []
+        if self.announcement_type=='contacts':
+            for partner in self.partner_ids:
+                if partner.mobile:
+                    recipients.append((partner.mobile, partner, 'res.partner', partner.id))
+        else:
+            if self.employee_selection_type=='employees':
+                employees = self.employee_ids
+            elif self.employee_selection_type=='department':
+                employees = self.env['hr.employee'].search([('department_id','=',self.department_id.id)])
+            else:
+                employees = self.env['hr.employee'].search([])
+            for employee in employees:
+                partner = employee.user_id and employee.user_id.partner_id
+                mobile = partner.mobile or employee.mobile_phone
+                if mobile:
+                    recipients.append((mobile, False, 'hr.employee', employee.id))
+        return recipients
+
+    def acs_render_messages(self, recipients):
+        """Message text per (res_model, res_id), rendered in one pass per model
+        when the announcement contains placeholders."""
+        messages = {}
+        if not self.message or '{{' not in self.message:
+            return messages
+        ids_by_model = defaultdict(list)
+        for mobile, partner, res_model, res_id in recipients:
+            ids_by_model[res_model].append(res_id)
+        for res_model, res_ids in ids_by_model.items():
+            try:
+                rendered = self.env['mail.render.mixin']._render_template(self.message, res_model, res_ids)
+            except Exception:
+                raise UserError(_("Configured Message fromat is wrong please contact administrator correct it first."))
+            messages.update({(res_model, res_id): body for res_id, body in rendered.items()})
+        return messages
+
+    def acs_bulk_create_queue(self, vals_list, chunk_size=1000):
+        """Create the queue rows chunk by chunk, committing after each chunk
+        outside of tests to keep the transactions short. Numbers already queued
+        by an interrupted run are skipped and the progress is saved with each
+        chunk, so sending the announcement again does not duplicate them."""
+        self.ensure_one()
+        Queue = self.env[self._acs_queue_model]
+        announcement_field = self._acs_queue_announcement_field
+        queued = {row['mobile'] for row in Queue.search_read([(announcement_field, '=', self.id)], ['mobile'])}
+        vals_list = [dict(vals, **{announcement_field: self.id}) for vals in vals_list if vals['mobile'] not in queued]
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        records = Queue
+        for i in range(0, len(vals_list), chunk_size):
+            records |= Queue.create(vals_list[i:i + chunk_size])
+            self.queued_count = len(queued) + len(records)
+            if auto_commit:
+                self.env.cr.commit()
+        return records
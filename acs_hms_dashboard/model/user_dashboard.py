@@ -24,6 +24,25 @@ DASHBOARD_FIELDS = ['is_physician', 'is_manager', 'identification_id', 'birthday
                     'my_avg_time_color', 'my_total_treatments_color', 'avg_time_color', 'physicians_color']
 
 
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    def init(self):
+        super().init()
+        # The birthday of the patients is stored on their partner (_inherits)
+        self.env.cr.execute("""CREATE INDEX IF NOT EXISTS res_partner_birthday_month_day_index
+            ON res_partner (date_part('month', birthday::timestamp), date_part('day', birthday::timestamp))""")
+
+
+class HrEmployee(models.Model):
+    _inherit = 'hr.employee'
+
+    def init(self):
+        super().init()
+        self.env.cr.execute("""CREATE INDEX IF NOT EXISTS hr_employee_birthday_month_day_index
+            ON hr_employee (date_part('month', birthday::timestamp), date_part('day', birthday::timestamp))""")
+
+
 class ResUsers(models.Model):
     _inherit = "res.users"
 
@@ -50,28 +69,44 @@ class ResUsers(models.Model):
                           (field_name, '>=', time.strftime('%Y-%m-01'))]
             return domain
 
+    def _get_birthday_domain(self, model_name):
+        """ Domain on the records of model_name born on today's month and day,
+        looked up through the (month, day) expression index. """
+        today = datetime.now()
+        Model = self.env[model_name]
+        field = Model._fields['birthday']
+        if field.inherited:
+            # birthday lives on the parent table of the _inherits, e.g. res_partner for hms.patient
+            parent_field = field.related.split('.')[0]
+            parent_table = self.env[Model._fields[parent_field].comodel_name]._table
+            from_clause = '%s JOIN %s p ON p.id = %s.%s' % (Model._table, parent_table, Model._table, parent_field)
+            birthday = 'p.birthday'
+        else:
+            from_clause = Model._table
+            birthday = '%s.birthday' % Model._table
+        self.env.cr.execute("""SELECT %s.id FROM %s
+            WHERE date_part('month', %s::timestamp) = %%s
+            AND date_part('day', %s::timestamp) = %%s""" % (Model._table, from_clause, birthday, birthday),
+            (today.month, today.day))
+        return [('id', 'in', [row[0] for row in self.env.cr.fetchall()])]
+
     @api.depends('dashboard_data_filter')
     def _compute_dashboard_data(self):
+        my_physician_ids = self.env['hms.physician'].search([('user_id', '=', self.env.uid)]).ids
+
         # Patients
         Patient = self.env['hms.patient']
         patient_domain = self.get_filter('create_date')
         _logger.info(f"Total patients domain: {patient_domain}")
         try:
-            self.total_patients = Patient.search_count(patient_domain)
+            patient_groups = Patient.read_group(patient_domain, ['primary_physician_id'], ['primary_physician_id'],
+                                                lazy=False)
+            self.total_patients = sum(group['__count'] for group in patient_groups)
+            self.my_total_patients = sum(group['__count'] for group in patient_groups
+                                         if group['primary_physician_id'] and group['primary_physician_id'][0] in my_physician_ids)
         except Exception as e:
             _logger.error(f"Error computing total patients: {str(e)}")
             self.total_patients = 0
-
-        # Fix for my_total_patients: Combine date filter with physician filter using expression.AND
-        my_patient_domain = expression.AND([
-            patient_domain,
-            [('primary_physician_id.user_id', '=', self.env.uid)]
-        ])
-        _logger.info(f"My total patients domain for user {self.env.uid}: {my_patient_domain}")
-        try:
-            self.my_total_patients = Patient.search_count(my_patient_domain)
-        except Exception as e:
-            _logger.error(f"Error computing my_total_patients for user {self.env.uid}: {str(e)}")
             self.my_total_patients = 0
 
         # Physicians
@@ -100,21 +135,27 @@ class ResUsers(models.Model):
             _logger.error(f"Error computing total schedules: {str(e)}")
             self.total_shedules = 0
 
-        # Appointments
+        # Appointments: counts and durations per physician in one grouped query
         Appointment = self.env['hms.appointment']
         appointment_domain = self.get_filter('date')
         try:
-            self.total_appointments = Appointment.search_count(appointment_domain)
+            appointment_groups = Appointment.read_group(appointment_domain,
+                ['appointment_duration:sum', 'waiting_duration:sum'], ['physician_id'], lazy=False)
         except Exception as e:
-            _logger.error(f"Error computing total appointments: {str(e)}")
-            self.total_appointments = 0
+            _logger.error(f"Error computing appointments: {str(e)}")
+            appointment_groups = []
+        my_appointment_groups = [group for group in appointment_groups
+                                 if group['physician_id'] and group['physician_id'][0] in my_physician_ids]
 
-        try:
-            self.my_total_appointments = Appointment.search_count(
-                appointment_domain + [('physician_id.user_id', '=', self.env.uid)])
-        except Exception as e:
-            _logger.error(f"Error computing my_total_appointments for user {self.env.uid}: {str(e)}")
-            self.my_total_appointments = 0
+        def avg_durations(groups):
+            count = sum(group['__count'] for group in groups)
+            avg_cons_time = sum(group['appointment_duration'] or 0 for group in groups) / count if count else 0
+            avg_wait_time = sum(group['waiting_duration'] or 0 for group in groups) / count if count else 0
+            return (count, '{0:02.0f}:{1:02.0f}'.format(*divmod(avg_cons_time * 60, 60)),
+                    '{0:02.0f}:{1:02.0f}'.format(*divmod(avg_wait_time * 60, 60)))
+
+        self.total_appointments, self.avg_cons_time, self.avg_wait_time = avg_durations(appointment_groups)
+        self.my_total_appointments, self.my_avg_cons_time, self.my_avg_wait_time = avg_durations(my_appointment_groups)
 
         appointmnt_data = []
         if self.is_physician:
@@ -123,8 +164,6 @@ class ResUsers(models.Model):
         else:
             appointment_list = Appointment.search(appointment_domain, limit=20)
 
-        tzinfo = self.env.context.get('tz') or self.env.user.tz or 'UTC'
-        locale = self.env.context.get('lang') or self.env.user.lang or 'en_US'
         for appointment in appointment_list:
             app_date = tool_format_datetime(self.env, appointment.date, dt_format=False)
             appointmnt_data.append({
@@ -140,97 +179,41 @@ class ResUsers(models.Model):
             })
         self.appointment_data = json.dumps(appointmnt_data)
 
-        # My Avg Time
-        my_appointments_domain = self.get_filter('date')
-        my_appointments_domain += [('physician_id.user_id', '=', self.env.uid)]
-        try:
-            my_total_appointments = Appointment.search(my_appointments_domain)
-            my_avg_cons_time = my_avg_wait_time = 0
-            my_total_appointments_cnt = len(my_total_appointments)
-            for app in my_total_appointments:
-                my_avg_cons_time += app.appointment_duration
-                my_avg_wait_time += app.waiting_duration
-            my_avg_cons_time = my_avg_cons_time / my_total_appointments_cnt if my_total_appointments_cnt else 0
-            self.my_avg_cons_time = '{0:02.0f}:{1:02.0f}'.format(*divmod(my_avg_cons_time * 60, 60))
-            my_avg_wait_time = my_avg_wait_time / my_total_appointments_cnt if my_total_appointments_cnt else 0
-            self.my_avg_wait_time = '{0:02.0f}:{1:02.0f}'.format(*divmod(my_avg_wait_time * 60, 60))
-        except Exception as e:
-            _logger.error(f"Error computing my_avg_time for user {self.env.uid}: {str(e)}")
-            self.my_avg_cons_time = '00:00'
-            self.my_avg_wait_time = '00:00'
-
-        # Avg Time
-        total_appointments_domain = self.get_filter('date')
-        try:
-            total_appointments = Appointment.search(total_appointments_domain)
-            avg_cons_time = avg_wait_time = 0
-            total_appointments_cnt = len(total_appointments)
-            self.total_appointments = total_appointments_cnt
-            for app in total_appointments:
-                avg_cons_time += app.appointment_duration
-                avg_wait_time += app.waiting_duration
-            avg_cons_time = avg_cons_time / total_appointments_cnt if total_appointments_cnt else 0
-            self.avg_cons_time = '{0:02.0f}:{1:02.0f}'.format(*divmod(avg_cons_time * 60, 60))
-            avg_wait_time = avg_wait_time / total_appointments_cnt if total_appointments_cnt else 0
-            self.avg_wait_time = '{0:02.0f}:{1:02.0f}'.format(*divmod(avg_wait_time * 60, 60))
-        except Exception as e:
-            _logger.error(f"Error computing avg_time: {str(e)}")
-            self.avg_cons_time = '00:00'
-            self.avg_wait_time = '00:00'
-
-        # Total Treatment
+        # Total Treatment: counts per physician and state in one grouped query
         treatment_domain = self.get_filter('date')
         Treatment = self.env['hms.treatment']
         try:
-            self.total_treatments = Treatment.search_count(treatment_domain)
-        except Exception as e:
-            _logger.error(f"Error computing total treatments: {str(e)}")
-            self.total_treatments = 0
-
-        running_treatment_domain = treatment_domain + [('state', '=', 'running')]
-        try:
-            self.total_running_treatments = Treatment.search_count(running_treatment_domain)
-        except Exception as e:
-            _logger.error(f"Error computing total running treatments: {str(e)}")
-            self.total_running_treatments = 0
-
-        my_treatment_domain = treatment_domain + [('physician_id.user_id', '=', self.env.uid)]
-        try:
-            self.my_total_treatments = Treatment.search_count(my_treatment_domain)
+            treatment_groups = Treatment.read_group(treatment_domain, ['physician_id', 'state'],
+                                                    ['physician_id', 'state'], lazy=False)
         except Exception as e:
-            _logger.error(f"Error computing my_total_treatments for user {self.env.uid}: {str(e)}")
-            self.my_total_treatments = 0
-
-        my_running_treatment_domain = treatment_domain + [('state', '=', 'running'),
-                                                          ('physician_id.user_id', '=', self.env.uid)]
-        try:
-            self.my_total_running_treatments = Treatment.search_count(my_running_treatment_domain)
-        except Exception as e:
-            _logger.error(f"Error computing my_total_running_treatments for user {self.env.uid}: {str(e)}")
-            self.my_total_running_treatments = 0
+            _logger.error(f"Error computing treatments: {str(e)}")
+            treatment_groups = []
+        my_treatment_groups = [group for group in treatment_groups
+                               if group['physician_id'] and group['physician_id'][0] in my_physician_ids]
+        self.total_treatments = sum(group['__count'] for group in treatment_groups)
+        self.total_running_treatments = sum(group['__count'] for group in treatment_groups
+                                            if group['state'] == 'running')
+        self.my_total_treatments = sum(group['__count'] for group in my_treatment_groups)
+        self.my_total_running_treatments = sum(group['__count'] for group in my_treatment_groups
+                                               if group['state'] == 'running')
 
         # Open Invoices
         Invoice = self.env['account.move'].sudo()
         open_invoice_domain = self.get_filter('invoice_date')
         open_invoice_domain += [('move_type', '=', 'out_invoice'), ('state', '=', 'posted')]
         try:
-            open_invoice = Invoice.search(open_invoice_domain)
-            self.total_open_invoice = len(open_invoice)
-            total = 0
-            for inv in open_invoice:
-                total += inv.amount_residual
-            self.total_open_invoice_amount = total
+            open_invoice = Invoice.read_group(open_invoice_domain, ['amount_residual:sum'], [], lazy=False)
+            self.total_open_invoice = open_invoice[0]['__count'] if open_invoice else 0
+            self.total_open_invoice_amount = (open_invoice[0]['amount_residual'] or 0) if open_invoice else 0
         except Exception as e:
             _logger.error(f"Error computing open invoices: {str(e)}")
             self.total_open_invoice = 0
             self.total_open_invoice_amount = 0
 
         # Birthday
-        today = datetime.now()
-        today_month_day = '%-' + today.strftime('%m') + '-' + today.strftime('%d')
         try:
-            self.birthday_patients = Patient.search_count([('birthday', 'like', today_month_day)])
-            self.birthday_employee = self.env['hr.employee'].search_count([('birthday', 'like', today_month_day)])
+            self.birthday_patients = Patient.search_count(self._get_birthday_domain('hms.patient'))
+            self.birthday_employee = self.env['hr.employee'].search_count(self._get_birthday_domain('hr.employee'))
         except Exception as e:
             _logger.error(f"Error computing birthday counts: {str(e)}")
             self.birthday_patients = 0
@@ -333,27 +316,19 @@ class ResUsers(models.Model):
                                                                                                              'lang') or 'en_US')
             data.append({'label': label, 'value': 0.0, 'type': 'past' if i < 0 else 'future'})
 
-        # Build SQL query to find amount aggregated by week
-        (select_sql_clause, query_args) = ("""SELECT count(id) as total, min(date) as aggr_date
-               FROM hms_appointment WHERE state != 'cancel'""", {})
-        query = ''
-        start_date = (first_day_of_week + timedelta(days=-7))
-        for i in range(0, 6):
-            if i == 0:
-                query += "(" + select_sql_clause + " and date < '" + start_date.strftime(DF) + "')"
-            elif i == 5:
-                query += " UNION ALL (" + select_sql_clause + " and date >= '" + start_date.strftime(DF) + "')"
-            else:
-                next_date = start_date + timedelta(days=7)
-                query += " UNION ALL (" + select_sql_clause + " and date >= '" + start_date.strftime(
-                    DF) + "' and date < '" + next_date.strftime(DF) + "')"
-                start_date = next_date
-
-        self.env.cr.execute(query, query_args)
-        query_results = self.env.cr.dictfetchall()
-        for index in range(0, len(query_results)):
-            if query_results[index].get('aggr_date') != None:
-                data[index]['value'] = query_results[index].get('total')
+        # Count the appointments of each bar in a single pass: past, the
+        # four weeks from last week on, and future.
+        start_date = (first_day_of_week + timedelta(days=-7)).date()
+        bounds = [start_date + timedelta(days=7 * i) for i in range(0, 5)]
+        buckets = ["date < %s"] + ["date >= %s AND date < %s"] * 4 + ["date >= %s"]
+        query_args = [bounds[0]]
+        for i in range(0, 4):
+            query_args += [bounds[i], bounds[i + 1]]
+        query_args.append(bounds[4])
+        self.env.cr.execute("SELECT " + ", ".join("COUNT(id) FILTER (WHERE %s)" % bucket for bucket in buckets) + """
+               FROM hms_appointment WHERE state != 'cancel'""", query_args)
+        for index, total in enumerate(self.env.cr.fetchone()):
+            data[index]['value'] = total
 
         [graph_title, graph_key] = ['', _('Appointments')]
         return [{'values': data, 'title': graph_title, 'key': graph_key}]
@@ -502,18 +477,14 @@ class ResUsers(models.Model):
 
     def open_birthday_patients(self):
         Patient = self.env['hms.patient']
-        today = datetime.now()
-        today_month_day = '%-' + today.strftime('%m') + '-' + today.strftime('%d')
-        patient_ids = Patient.search([('birthday', 'like', today_month_day)])
+        patient_ids = Patient.search(self._get_birthday_domain('hms.patient'))
         action = self.env["ir.actions.actions"]._for_xml_id("acs_hms_base.action_patient")
         action['domain'] = [('id', 'in', patient_ids.ids)]
         return action
 
     def open_birthday_employee(self):
         Employee = self.env['hr.employee']
-        today = datetime.now()
-        today_month_day = '%-' + today.strftime('%m') + '-' + today.strftime('%d')
-        employee_ids = Employee.search([('birthday', 'like', today_month_day)])
+        employee_ids = Employee.search(self._get_birthday_domain('hr.employee'))
         action = self.env["ir.actions.actions"]._for_xml_id("hr.hr_employee_public_action")
         action['domain'] = [('id', 'in', employee_ids.ids)]
         return action
@@ -21,7 +21,7 @@
     'description' : """
         This module provides screen of next patient who is going in consultation. ACS HMS Hospital management system
     """,
-    'version': '1.0.1',
+    'version': '1.0.2',
     'category': 'Industry',
     'author': 'Almighty Consulting Solutions Pvt. Ltd.',
     'support': 'info@almightycs.com',
@@ -10,15 +10,23 @@ class AcsNextPatientScreen(http.Controller):
     @http.route(['/acs/waitingscreen/<int:screen>'], type='http', auth="user", website=True, sitemap=False)
     def acs_waiting_screen(self, screen=False, **kw):
         screen = request.env['acs.hms.waiting.screen'].sudo().search([('id','=',screen)])
-        ResModel = request.env[screen.res_model_id.model]
-        domain = [('company_id','=',screen.company_id.id)]
-        if screen and screen.physician_ids and screen.acs_physician_field_id:
-            domain += [(screen.acs_physician_field_id.name,'in',screen.physician_ids.ids)]
-        
-        if screen.acs_states_to_include and screen.acs_state_field_id:
-            domain += [(screen.acs_state_field_id.name, 'in', eval(screen.acs_states_to_include))]
-        limit = screen.acs_number_of_records or 5
-        records = ResModel.sudo().search(domain, order="id asc", limit=limit)
-        return request.render("acs_hms_next_patient_screen.next_patient_view",{'acs_ws': screen, 'records': records, 'ResModel': ResModel})
+        config = screen._acs_get_screen_config(screen.id)
+        ResModel = request.env[config['model']]
+        records = ResModel.sudo().search(config['domain'], order="id asc", limit=config['limit'])
+        return request.render("acs_hms_next_patient_screen.next_patient_view", {
+            'acs_ws': screen,
+            'records': records,
+            'ResModel': ResModel,
+            #ACS: Pushed updates are sent for appointments only, other models are polled.
+            'acs_push': config['model'] == 'hms.appointment',
+            'acs_channel': config['channel'],
+        })
 
-# vim:expandtab:smartindent:tabstop=4:softtabstop=4:shiftwidth=4:
\ No newline at end of file
+    @http.route(['/acs/waitingscreen/<int:screen>/data'], type='json', auth="user", sitemap=False)
+    def acs_waiting_screen_data(self, screen=False, **kw):
+        screen = request.env['acs.hms.waiting.screen'].sudo().browse(screen).exists()
+        if not screen:
+            return {'error': _('Waiting screen not found.')}
+        return screen.acs_get_screen_data()
+
+# vim:expandtab:smartindent:tabstop=4:softtabstop=4:shiftwidth=4:
@@ -1,3 +1,5 @@
 # -*- coding: utf-8 -*-
 
 from . import waiting_screen
+
+from . import appointment
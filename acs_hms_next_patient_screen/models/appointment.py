@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, models
+
+
+class Appointment(models.Model):
+    _inherit = 'hms.appointment'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super(Appointment, self).create(vals_list)
+        self.env['acs.hms.waiting.screen']._acs_notify_screens(res)
+        return res
+
+    def write(self, values):
+        res = super(Appointment, self).write(values)
+        if self.env['acs.hms.waiting.screen']._acs_get_watched_fields(self._name).intersection(values):
+            self.env['acs.hms.waiting.screen']._acs_notify_screens(self)
+        return res
+
+    def unlink(self):
+        self.env['acs.hms.waiting.screen']._acs_notify_screens(self, removed=True)
+        return super(Appointment, self).unlink()
+
+# vim:expandtab:smartindent:tabstop=4:softtabstop=4:shiftwidth=4:
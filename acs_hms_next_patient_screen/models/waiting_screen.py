@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 
-from odoo import api, fields, models, _
+from ast import literal_eval
+
+from odoo import api, fields, models, tools, _
+
+#ACS: Bus channel of a waiting screen, the page subscribes once and receives the changes
+WAITING_SCREEN_CHANNEL = 'acs_waiting_screen_%s'
 
 
 class AcsHmsWaitingScreen(models.Model):
@@ -63,6 +68,108 @@ class AcsHmsWaitingScreen(models.Model):
             if self.res_model_id.model in ['acs.laboratory.request','acs.patient.laboratory.sample']:
                 self.acs_states_to_include = "['draft']"
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super(AcsHmsWaitingScreen, self).create(vals_list)
+        self.clear_caches()
+        return res
+
+    def write(self, values):
+        res = super(AcsHmsWaitingScreen, self).write(values)
+        self.clear_caches()
+        return res
+
+    def unlink(self):
+        res = super(AcsHmsWaitingScreen, self).unlink()
+        self.clear_caches()
+        return res
+
+    @api.model
+    @tools.ormcache('model_name')
+    def _acs_get_model_screen_ids(self, model_name):
+        return tuple(self.sudo().search([('res_model_id.model', '=', model_name)]).ids)
+
+    @api.model
+    @tools.ormcache('screen_id')
+    def _acs_get_screen_config(self, screen_id):
+        """Compile the screen configuration once, it is cached until a screen is
+        modified. The returned values are shared: do not modify them."""
+        screen = self.sudo().browse(screen_id).exists()
+        if not screen:
+            return None
+        domain = [('company_id','=',screen.company_id.id)]
+        if screen.physician_ids and screen.acs_physician_field_id:
+            domain += [(screen.acs_physician_field_id.name,'in',screen.physician_ids.ids)]
+        if screen.acs_states_to_include and screen.acs_state_field_id:
+            domain += [(screen.acs_state_field_id.name, 'in', literal_eval(screen.acs_states_to_include))]
+        return {
+            'model': screen.res_model_id.model,
+            'domain': domain,
+            'limit': screen.acs_number_of_records or 5,
+            'channel': WAITING_SCREEN_CHANNEL % screen.id,
+            'physician_field': screen.acs_physician_field_id.name,
+            'patient_field': screen.show_patient_name_image and screen.acs_patient_field_id.name,
+            'cabin_field': screen.show_cabin and screen.acs_cabin_field_id.name,
+            'state_field': screen.acs_state_field_id.name,
+            'in_progress_state': screen.in_progress_state,
+            # Changes on other fields do not change the screen
+            'watched_fields': tuple(filter(None, [
+                'company_id', 'name', screen.acs_physician_field_id.name, screen.acs_patient_field_id.name,
+                screen.acs_cabin_field_id.name, screen.acs_state_field_id.name])),
+        }
+
+    @api.model
+    def _acs_prepare_screen_rows(self, config, records):
+        rows = []
+        for record in records.with_context(bin_size=True):
+            patient = config['patient_field'] and record[config['patient_field']]
+            physician = config['physician_field'] and record[config['physician_field']]
+            cabin = config['cabin_field'] and record[config['cabin_field']]
+            rows.append({
+                'id': record.id,
+                'name': record.name,
+                'patient': patient.name if patient else '',
+                'image_url': '/web/image/%s/%s/image_128' % (patient._name, patient.id) if patient and patient.image_128 else '',
+                'physician': physician.name if physician else '',
+                'cabin': cabin.name if cabin else '',
+                'in_progress': bool(config['state_field']) and record[config['state_field']] == config['in_progress_state'],
+            })
+        return rows
+
+    def acs_get_screen_data(self):
+        """Rows currently shown on the screen, as plain values."""
+        self.ensure_one()
+        config = self._acs_get_screen_config(self.id)
+        records = self.env[config['model']].sudo().search(config['domain'], order="id asc", limit=config['limit'])
+        return {
+            'channel': config['channel'],
+            'limit': config['limit'],
+            'rows': self._acs_prepare_screen_rows(config, records),
+        }
+
+    @api.model
+    def _acs_get_watched_fields(self, model_name):
+        watched_fields = set()
+        for screen_id in self._acs_get_model_screen_ids(model_name):
+            watched_fields.update(self._acs_get_screen_config(screen_id)['watched_fields'])
+        return watched_fields
+
+    @api.model
+    def _acs_notify_screens(self, records, removed=False):
+        """Push the changed records to the screens showing their model: rows to
+        add or update and ids to remove."""
+        notifications = []
+        for screen_id in self._acs_get_model_screen_ids(records._name):
+            config = self._acs_get_screen_config(screen_id)
+            shown = self.env[records._name] if removed else records.sudo().filtered_domain(config['domain'])
+            hidden = records - shown
+            notifications.append([config['channel'], 'acs_waiting_screen/delta', {
+                'upsert': self._acs_prepare_screen_rows(config, shown),
+                'remove': hidden.ids,
+            }])
+        if notifications:
+            self.env['bus.bus']._sendmany(notifications)
+
     def acs_open_website_url(self):
         self.ensure_one()
         return {
@@ -0,0 +1,136 @@
+/* Live waiting screen: the rows are loaded once, then appointments changes are
+ * pushed on the bus channel of the screen. Other models are polled through
+ * the JSON route at the configured refresh time. */
+$(document).ready(function () {
+    var $config = $('#acs_waiting_screen');
+    if (!$config.length) {
+        return;
+    }
+    var screenId = $config.data('screen-id');
+    var channel = $config.data('channel');
+    var limit = parseInt($config.data('limit'), 10) || 5;
+    var showPatient = !!$config.data('show-patient');
+    var showCabin = !!$config.data('show-cabin');
+    var inProgressColor = $config.data('in-progress-color');
+    var refreshTime = parseInt($('#acs_refresh_time').val(), 10) || 5000;
+    var rows = null;
+    var lastNotification = 0;
+
+    function escape(value) {
+        return $('<div/>').text(value || '').html();
+    }
+
+    function renderRow(row, number, fontColor) {
+        var html = '<div class="media main-box" style="color:' + escape(fontColor || 'black') + '">';
+        html += '<h1 class="pull-left col-xs-1 img-rounded box"><span' + (fontColor ? ' style="font-size:25px !important;"' : '') + '>' + escape(String(number)) + '</span></h1>';
+        if (showPatient) {
+            if (row && row.image_url) {
+                html += '<div class="pull-left col-xs-2 img-circle"><span itemprop="image"><img class="img img-fluid" src="' + escape(row.image_url) + '" style="height:90px !important;width:100px !important;"/></span></div>';
+            } else {
+                html += '<div class="pull-left col-xs-2"></div>';
+            }
+            if (row && row.patient) {
+                html += '<div class="pull-left col-xs-3 line"><span><span>' + escape(row.patient) + '</span></span></div>';
+            } else {
+                html += '<div class="pull-left col-xs-3 line big-font"><span>-------</span></div>';
+            }
+        } else {
+            html += '<div class="pull-left col-xs-2"></div>';
+        }
+        if (row) {
+            html += '<div class="col-xs-4"><div class="line"><strong><span>' + escape(row.physician) + '</span></strong></div>';
+            if (showCabin && row.cabin) {
+                html += '<div class="cabin-data"><strong>(<span>' + escape(row.cabin) + '</span>)</strong></div>';
+            }
+            html += '</div>';
+            if (!showPatient) {
+                html += '<div class="pull-left col-xs-2"></div>';
+            }
+            html += '<div class="pull-left col-xs-1 line"><strong><span><span>' + escape(row.name) + '</span></span></strong></div>';
+        } else {
+            html += '<div class="pull-left col-xs-2 line big-font"><span>-------</span></div>';
+        }
+        return html + '</div>';
+    }
+
+    function render() {
+        var shown = rows.slice().sort(byId).slice(0, limit);
+        var inRows = shown.filter(function (row) { return row.in_progress; });
+        var waitingRows = shown.filter(function (row) { return !row.in_progress; });
+        var html = '';
+        inRows.forEach(function (row) {
+            html += renderRow(row, 'NOW', inProgressColor);
+        });
+        waitingRows.forEach(function (row, index) {
+            html += renderRow(row, index + 1);
+        });
+        for (var index = inRows.length + waitingRows.length; index < limit; index++) {
+            html += renderRow(false, index - inRows.length + 1);
+        }
+        $('.acs_row').html(html);
+    }
+
+    function loadRows() {
+        return $.ajax({
+            url: '/acs/waitingscreen/' + screenId + '/data',
+            type: 'POST',
+            contentType: 'application/json',
+            data: JSON.stringify({jsonrpc: '2.0', method: 'call', params: {}}),
+        }).then(function (response) {
+            if (response.result && response.result.rows) {
+                rows = response.result.rows;
+                render();
+            }
+        });
+    }
+
+    function byId(a, b) {
+        return a.id - b.id;
+    }
+
+    function applyDelta(delta) {
+        if (rows === null) {
+            return;
+        }
+        var loadedIds = rows.map(function (row) { return row.id; });
+        if (delta.remove.some(function (id) { return loadedIds.indexOf(id) >= 0; })) {
+            // A shown row was removed or left the domain: the next records to show are not known here
+            loadRows();
+            return;
+        }
+        // Only the first records of the queue are loaded, later ones stay out of the window
+        var lastId = rows.length >= limit ? Math.max.apply(null, loadedIds) : Infinity;
+        var changedIds = delta.upsert.map(function (row) { return row.id; });
+        rows = rows.filter(function (row) { return changedIds.indexOf(row.id) < 0; })
+            .concat(delta.upsert.filter(function (row) { return row.id <= lastId; }))
+            .sort(byId).slice(0, limit);
+        render();
+    }
+
+    function connect(retryDelay) {
+        var protocol = window.location.protocol === 'https:' ? 'wss://' : 'ws://';
+        var socket = new WebSocket(protocol + window.location.host + '/websocket');
+        socket.onopen = function () {
+            retryDelay = 1000;
+            socket.send(JSON.stringify({event_name: 'subscribe', data: {channels: [channel], last: lastNotification}}));
+            loadRows();
+        };
+        socket.onmessage = function (event) {
+            JSON.parse(event.data).forEach(function (notification) {
+                lastNotification = Math.max(lastNotification, notification.id);
+                if (notification.message.type === 'acs_waiting_screen/delta') {
+                    applyDelta(notification.message.payload);
+                }
+            });
+        };
+        socket.onclose = function () {
+            setTimeout(function () { connect(Math.min(retryDelay * 2, 60000)); }, retryDelay);
+        };
+    }
+
+    if ($config.data('push') && window.WebSocket) {
+        connect(1000);
+    } else {
+        setInterval(loadRows, refreshTime);
+    }
+});
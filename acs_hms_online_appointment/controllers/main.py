@@ -143,7 +143,7 @@ class HMSWebsite(Website):
                 values.update({'error_message':['Appointment date is past please enter valid.']})
                 return request.render("acs_hms_online_appointment.appointment_slot_details", values)
 
-            if slot.rem_limit <= 0:
+            if not slot.sudo().acs_reserve_slot():
                 values = self.user_booking_data(post)
                 values.update({'error_message':['Appointment slot is already booked please select other slot.']})
                 return request.render("acs_hms_online_appointment.appointment_slot_details", values)
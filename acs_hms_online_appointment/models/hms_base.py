@@ -3,6 +3,13 @@ from odoo import api, fields, models,_
 from datetime import datetime
 from datetime import timedelta
 from odoo.tools import DEFAULT_SERVER_DATETIME_FORMAT,DEFAULT_SERVER_DATE_FORMAT
+import time
+from dateutil.relativedelta import relativedelta
+
+from .schedule import AVAILABILITY_CACHE_TTL, _availability_cache
+
+#ACS: fields deciding whether an appointment holds its schedule slot.
+SLOT_BOOKING_FIELDS = {'schedule_slot_id', 'state', 'booked_online', 'company_id'}
 
 
 def float_to_time(hours):
@@ -26,19 +33,41 @@ class Appointment(models.Model):
     schedule_slot_id = fields.Many2one('appointment.schedule.slot.lines', string = 'Schedule Slot', states=READONLY_CONFIRMED_STATES)
     booked_online = fields.Boolean('Booked Online', states=READONLY_CONFIRMED_STATES)
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super(Appointment, self).create(vals_list)
+        res.schedule_slot_id._acs_update_booked_count()
+        return res
+
+    def write(self, values):
+        slots = self.env['appointment.schedule.slot.lines']
+        if SLOT_BOOKING_FIELDS.intersection(values):
+            slots = self.schedule_slot_id
+        res = super(Appointment, self).write(values)
+        if SLOT_BOOKING_FIELDS.intersection(values):
+            (slots | self.schedule_slot_id)._acs_update_booked_count()
+        return res
+
+    def unlink(self):
+        slots = self.schedule_slot_id
+        res = super(Appointment, self).unlink()
+        slots._acs_update_booked_count()
+        return res
+
     @api.model
     def clear_appointment_cron(self):
-        if self.env.user.company_id.allowed_booking_payment:
-            appointments = self.search([('booked_online','=', True),('state','=','draft')])
-            for appointment in appointments:
-                #cancel appointment after 20 minute if not paid
-                create_time = appointment.create_date + timedelta(minutes=20)
-                if create_time <= datetime.now():
-                    if appointment.invoice_id:
-                        if appointment.invoice_id.state=='paid':
-                            continue
-                        appointment.invoice_id.action_invoice_cancel()
-                    appointment.appointment_cancel()
+        #ACS: same companies as the drafts holding their slot, see SLOT_HOLDING_CONDITION.
+        appointments = self.search([('booked_online','=', True),('state','=','draft'),
+            ('company_id.allowed_booking_payment','=', True)])
+        for appointment in appointments:
+            #cancel appointment after 20 minute if not paid
+            create_time = appointment.create_date + timedelta(minutes=20)
+            if create_time <= datetime.now():
+                if appointment.invoice_id:
+                    if appointment.invoice_id.state=='paid':
+                        continue
+                    appointment.invoice_id.action_invoice_cancel()
+                appointment.appointment_cancel()
 
     #To Avoid code duplication in mobile api.
     def acs_get_slot_lines(self, physician_id, department_id, date, schedule_type):
@@ -72,21 +101,58 @@ class Appointment(models.Model):
             })
         return slot_data
 
+    @api.model
+    def acs_get_month_availability(self, physician_id, department_id, month, schedule_type="appointment"):
+        """Number of bookable slots per date of the month starting on month,
+        cached AVAILABILITY_CACHE_TTL seconds per physician and department."""
+        physician_id = physician_id and int(physician_id) or False
+        department_id = department_id and int(department_id) or False
+        key = (self._cr.dbname, physician_id, department_id, schedule_type, month)
+        cached = _availability_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        where = ["l.rem_limit >= 1", "l.from_slot >= %s", "s.slot_date >= %s", "s.slot_date < %s", "sc.schedule_type = %s"]
+        params = [fields.Datetime.now(), month, month + relativedelta(months=1), schedule_type]
+        if physician_id:
+            where.append("l.physician_id = %s")
+            params.append(physician_id)
+        if department_id:
+            where.append("l.department_id = %s")
+            params.append(department_id)
+        self.env['appointment.schedule.slot.lines'].flush_model(['rem_limit', 'from_slot', 'physician_id', 'department_id', 'slot_id'])
+        self.env.cr.execute("""
+            SELECT s.slot_date, COUNT(*)
+            FROM appointment_schedule_slot_lines l
+            JOIN appointment_schedule_slot s ON s.id = l.slot_id
+            JOIN appointment_schedule sc ON sc.id = s.schedule_id
+            WHERE """ + " AND ".join(where) + """
+            GROUP BY s.slot_date
+        """, params)
+        availability = dict(self.env.cr.fetchall())
+        _availability_cache[key] = (time.monotonic() + AVAILABILITY_CACHE_TTL, availability)
+        return availability
+
     def get_disabled_dates(self, physician_id, department_id, date=False, schedule_type="appointment"):
-        slot_lines = self.acs_get_slot_lines(physician_id, department_id, date, schedule_type)
-        dates = slot_lines.mapped('slot_id.slot_date')
-        available_dates = []
-        for av_date in dates:
-            available_dates.append(fields.Date.to_string(av_date))
+        today = fields.Date.today()
+        last_date = today + timedelta(days=self.env.user.sudo().company_id.allowed_booking_online_days)
+        available_dates = {}
+        if date:
+            date = fields.Date.to_date(date)
+            availability = self.acs_get_month_availability(physician_id, department_id, date.replace(day=1), schedule_type)
+            if availability.get(date):
+                return []
+        else:
+            month = today.replace(day=1)
+            while month <= last_date:
+                available_dates.update(self.acs_get_month_availability(physician_id, department_id, month, schedule_type))
+                month += relativedelta(months=1)
 
         disabled_dates = []
-        start_date = fields.Date.today()
-        if date and slot_lines:
-            return []
-        for days in range(0, self.env.user.sudo().company_id.allowed_booking_online_days + 1):
-            date = fields.Date.to_string(fields.Date.today() + timedelta(days=days))
-            if date not in available_dates:
-                disabled_dates.append(date)
+        for days in range(0, (last_date - today).days + 1):
+            day = today + timedelta(days=days)
+            if not available_dates.get(day):
+                disabled_dates.append(fields.Date.to_string(day))
         return disabled_dates
 
     @api.onchange('schedule_slot_id')
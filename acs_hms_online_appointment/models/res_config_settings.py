@@ -13,6 +13,15 @@ class ResCompany(models.Model):
     acs_appointment_tc = fields.Char('Terms & Conditions Page link', default="/appointment/terms")
     acs_allowed_video_consultation = fields.Boolean("Allowed Online Consultation", help="Allowed Online Consultation")
 
+    def write(self, values):
+        res = super(ResCompany, self).write(values)
+        if 'allowed_booking_payment' in values:
+            #ACS: online bookings waiting for payment hold their slot only with online payments.
+            appointments = self.env['hms.appointment'].sudo().search([('company_id', 'in', self.ids),
+                ('booked_online', '=', True), ('state', '=', 'draft'), ('schedule_slot_id', '!=', False)])
+            appointments.schedule_slot_id._acs_update_booked_count()
+        return res
+
 
 class ResConfigSettings(models.TransientModel):
     _inherit = 'res.config.settings'
@@ -11,10 +11,27 @@ import math
 from pytz import timezone, utc
 from odoo.tools.float_utils import float_round
 from odoo.addons.base.models.res_partner import _tz_get
+from odoo.tools.sql import column_exists
 
 import logging
 _logger = logging.getLogger(__name__)
 
+AVAILABILITY_CACHE_TTL = 60
+
+#ACS: appointments (alias a) holding their slot: confirmed ones, and online bookings
+# waiting for their payment when the company takes online payments (the
+# cleanup cron cancels the unpaid ones).
+SLOT_HOLDING_CONDITION = """a.state != 'cancel' AND (a.state != 'draft' OR (a.booked_online
+    AND a.company_id IN (SELECT id FROM res_company WHERE allowed_booking_payment)))"""
+
+# {(dbname, physician_id, department_id, schedule_type, month): (expiry, {date: slots})}, local to the worker
+_availability_cache = {}
+
+
+def _clear_availability_cache(dbname):
+    for key in [key for key in _availability_cache if key[0] == dbname]:
+        _availability_cache.pop(key, None)
+
 
 def float_to_time(hours):
     """ Convert a number of hours into a time object. """
@@ -107,7 +124,7 @@ class AppointmentscheduleSlot(models.Model):
     _description = "Appointment Schedule Slot"
     _rec_name = 'slot_date'
 
-    slot_date = fields.Date(string='Slot Date')
+    slot_date = fields.Date(string='Slot Date', index=True)
     appointment_tz = fields.Selection(_tz_get, string='Timezone', required=True, default=lambda self: self.env.user.tz,
         help="Timezone where appointment take place")
     slot_ids = fields.One2many('appointment.schedule.slot.lines', 'slot_id', string="Slot Lines")
@@ -197,12 +214,13 @@ class AppointmentscheduleSlotLines(models.Model):
                 name = from_slot.strftime("%H:%M") + ' - ' + to_slot.strftime("%H:%M")
             rec.name = name
 
-    @api.depends('appointment_ids','appointment_ids.state')
+    @api.depends('limit','booked_count')
     def _limit_count(self):
         for slot in self:
-            slot.rem_limit = slot.limit - len(self.env['hms.appointment'].search([('schedule_slot_id','=',slot.id),('state','not in',['draft','cancel'])]))
+            slot.rem_limit = slot.limit - slot.booked_count
 
     def _get_booking_price(self):
+        prices = {}
         for rec in self:
             product = self.env.user.sudo().company_id.consultation_product_id
             if rec.physician_id and rec.physician_id.consultaion_service_id:
@@ -211,7 +229,9 @@ class AppointmentscheduleSlotLines(models.Model):
                 product = rec.department_id.consultaion_service_id
             if not product:
                 raise UserError(_('Please define Consultation Service product from HMS Settings or in the respective physician or in department.'))
-            rec.appointment_price = product._acs_get_partner_price()
+            if product not in prices:
+                prices[product] = product._acs_get_partner_price()
+            rec.appointment_price = prices[product]
 
     name = fields.Char(string='name', compute='_get_slot_name')
     from_slot = fields.Datetime(string='Starting Slot')
@@ -219,11 +239,34 @@ class AppointmentscheduleSlotLines(models.Model):
     physician_id = fields.Many2one('hms.physician', string='Physician', index=True)
     department_id = fields.Many2one('hr.department', domain=[('patient_department', '=', True)])
     limit = fields.Integer(string='Limit', default=lambda self: self.env.user.company_id.allowed_booking_per_slot)
+    booked_count = fields.Integer(string='Booked', readonly=True, copy=False, default=0,
+        help="Appointments holding the slot, kept up to date when appointments change.")
     rem_limit = fields.Integer(compute="_limit_count",string='Remaining Limit',store=True)
     slot_id = fields.Many2one('appointment.schedule.slot', string="Slot", ondelete="cascade")
     appointment_ids = fields.One2many('hms.appointment', 'schedule_slot_id', string="Appointment")
     appointment_price = fields.Float(compute="_get_booking_price", string="Appointment Fees")
 
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS appointment_schedule_slot_lines_available_idx
+            ON appointment_schedule_slot_lines (slot_id, from_slot)
+            WHERE rem_limit > 0
+        """)
+        #ACS: count the existing bookings once when the column is added.
+        if column_exists(self.env.cr, 'hms_appointment', 'booked_online'):
+            self.env.cr.execute("""
+                UPDATE appointment_schedule_slot_lines l
+                SET booked_count = b.booked, rem_limit = COALESCE(l."limit", 0) - b.booked
+                FROM (
+                    SELECT l.id, COUNT(a.id) AS booked
+                    FROM appointment_schedule_slot_lines l
+                    LEFT JOIN hms_appointment a ON a.schedule_slot_id = l.id
+                        AND """ + SLOT_HOLDING_CONDITION + """
+                    GROUP BY l.id
+                ) b
+                WHERE b.id = l.id AND l.booked_count IS DISTINCT FROM b.booked
+            """)
+
     @api.model
     def default_get(self, fields):
         res = super(AppointmentscheduleSlotLines, self).default_get(fields)
@@ -231,6 +274,64 @@ class AppointmentscheduleSlotLines(models.Model):
             res['physician_id'] = self.env.user.sudo().physician_ids and self.env.user.sudo().physician_ids.ids[0]
         return res
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super(AppointmentscheduleSlotLines, self).create(vals_list)
+        self._acs_invalidate_availability()
+        return res
+
+    def write(self, vals):
+        res = super(AppointmentscheduleSlotLines, self).write(vals)
+        self._acs_invalidate_availability()
+        return res
+
+    def _acs_invalidate_availability(self):
+        """Drop the cached availabilities of this database once the
+        transaction changing the slots is committed."""
+        dbname = self._cr.dbname
+        self._cr.postcommit.add(lambda: _clear_availability_cache(dbname))
+
+    def _acs_update_booked_count(self):
+        """Recount the appointments holding the slots, see SLOT_HOLDING_CONDITION."""
+        slots = self.sudo().exists()
+        if not slots:
+            return
+        self.env['hms.appointment'].flush_model(['schedule_slot_id', 'state', 'booked_online', 'company_id'])
+        self.env['res.company'].flush_model(['allowed_booking_payment'])
+        self.env.cr.execute("""
+            SELECT l.id, COUNT(a.id)
+            FROM appointment_schedule_slot_lines l
+            LEFT JOIN hms_appointment a ON a.schedule_slot_id = l.id
+                AND """ + SLOT_HOLDING_CONDITION + """
+            WHERE l.id IN %s
+            GROUP BY l.id
+        """, (tuple(slots.ids),))
+        for slot_id, booked_count in self.env.cr.fetchall():
+            slot = slots.browse(slot_id)
+            if slot.booked_count != booked_count:
+                slot.booked_count = booked_count
+
+    def acs_reserve_slot(self):
+        """Take one place of the slot, False when it is already full.
+
+        The conditional update locks the slot row: concurrent bookings of the
+        same slot wait for each other, and the request losing the race is
+        retried by the serialization failure handling and sees the slot full.
+        """
+        self.ensure_one()
+        self.flush_recordset(['booked_count', 'rem_limit'])
+        self.env.cr.execute("""
+            UPDATE appointment_schedule_slot_lines
+            SET booked_count = booked_count + 1, rem_limit = rem_limit - 1
+            WHERE id = %s AND rem_limit > 0
+            RETURNING id
+        """, (self.id,))
+        reserved = bool(self.env.cr.fetchone())
+        self.invalidate_recordset(['booked_count', 'rem_limit'])
+        if reserved:
+            self._acs_invalidate_availability()
+        return reserved
+
     def acs_book_appointment(self):
         action = self.env["ir.actions.actions"]._for_xml_id("acs_hms.action_appointment")
         action['context'] = {
@@ -248,6 +349,7 @@ class AppointmentscheduleSlotLines(models.Model):
         for rec in self:
             if rec.appointment_ids:
                 raise UserError(_('You can not delete slot which already have booked appointments.'))
+        self._acs_invalidate_availability()
         return super(AppointmentscheduleSlotLines, self).unlink()
 
 # vim:expandtab:smartindent:tabstop=4:softtabstop=4:shiftwidth=4:
\ No newline at end of file
@@ -19,9 +19,9 @@
     'name' : 'Notification SMS',
     'summary': 'Send SMS notification to Employee and Customer.',
     'category' : 'Extra-Addons',
-    'version': '1.2.4',
+    'version': '1.2.5',
     'license': 'OPL-1',
-    'depends' : ['hr'],
+    'depends' : ['hr', 'acs_announcement_base'],
     'author': 'Almighty Consulting Solutions Pvt. Ltd.',
     'website': 'www.almightycs.com',
     'description': """
@@ -1,5 +1,4 @@
 # -*- coding: utf-8 -*-
-
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 
@@ -11,9 +10,13 @@ class HrEmployee(models.Model):
 
 class Announcement(models.Model):
     _name = 'acs.sms.announcement'
+    _inherit = ['acs.announcement.mixin']
     _description = 'SMS Announcement'
     _rec_name = 'message'
 
+    _acs_queue_model = 'acs.sms'
+    _acs_queue_announcement_field = 'announcement_id'
+
     READONLY_STATES = {'sent': [('readonly', True)]}
 
     message = fields.Text(string='Announcement', states=READONLY_STATES)
@@ -51,23 +54,32 @@ class Announcement(models.Model):
                 raise UserError(_('You cannot delete an record which is not draft.'))
         return super(Announcement, self).unlink()
 
-    def send_message(self):
-        if self.announcement_type=='contacts':
-            for partner in self.partner_ids:
-                if partner.mobile:
-                    partner.create_sms(self.message, partner.mobile, partner, res_model='res.partner', res_id=partner.id)
-        else:
-            if self.employee_selection_type=='employees':
-                employees = self.employee_ids
-            elif self.employee_selection_type=='department':
-                employees = self.env['hr.employee'].search([('department_id','=',self.department_id.id)])
-            else:
-                employees = self.env['hr.employee'].search([])
-            for employee in employees:
-                partner = employee.user_id and employee.user_id.partner_id
-                mobile = partner.mobile or employee.mobile_phone
-                if mobile:
-                    employee.create_sms(self.message, mobile, False, res_model='hr.employee', res_id=employee.id)
+    def acs_prepare_sms_vals(self, recipients):
+        """Queue values for the recipients, one SMS per normalized number"""
+        company_id = self._context.get('force_company') or self.env.user.sudo().company_id.id
+        messages = self.acs_render_messages(recipients)
+        vals_list = []
+        mobiles = set()
+        for mobile, partner, res_model, res_id in recipients:
+            mobile = mobile.replace(' ', '').replace('-', '')
+            if mobile in mobiles:
+                continue
+            mobiles.add(mobile)
+            vals_list.append({
+                'msg': messages.get((res_model, res_id), self.message),
+                'partner_id': partner and partner.id or False,
+                'mobile': mobile,
+                'company_id': company_id,
+                'template_id': self.template_id.id,
+                'templateid': self.template_id.templateid,
+                'res_model': res_model,
+                'res_id': res_id,
+            })
+        return vals_list
 
+    def send_message(self):
+        records = self.acs_bulk_create_queue(self.acs_prepare_sms_vals(self.acs_get_recipients()))
+        if self.env.context.get('force_send'):
+            records.send_sms()
         self.state = 'sent'
-        self.date = fields.Datetime.now()
\ No newline at end of file
+        self.date = fields.Datetime.now()
@@ -16,6 +16,16 @@ class ResCompany(models.Model):
     sms_templateid_param = fields.Char(string='Template Parameter', default="")
 
     sms_url = fields.Char(string='URL', default='http://www.unicel.in/SendSMS/sendmsg.php?')
+    sms_max_workers = fields.Integer(string='Parallel Connections', default=4,
+        help="Number of gateway requests sent at the same time by the queue.")
+    sms_rate_limit = fields.Integer(string='Requests per Second', default=10,
+        help="Maximum number of gateway requests per second, 0 for no limit.")
+    sms_timeout = fields.Integer(string='Timeout (s)', default=30)
+    sms_verify_ssl = fields.Boolean(string='Verify SSL Certificate', default=False)
+    sms_bulk_separator = fields.Char(string='Bulk Receiver Separator',
+        help="Set it when the gateway accepts several receivers in one request, e.g. ','. "
+            "Messages with the same text are then sent together.")
+    sms_bulk_size = fields.Integer(string='Receivers per Request', default=100)
 
     verify_otp_msg_sms_template_id = fields.Many2one("acs.sms.template", "Verify OTP SMS")
 
@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
-import json
+import time
+from collections import defaultdict
 
 import urllib
-from urllib.request import Request, urlopen
-import ssl
+
+from .sms_sender import SmsGatewaySender
 
 class AcsSms(models.Model):
     _name = 'acs.sms'
@@ -13,23 +14,27 @@ class AcsSms(models.Model):
     _rec_name = 'msg'
     _order = 'id desc'
 
+    @api.model
+    def _get_sms_url(self, company, mobile, msg, templateid=False):
+        prms = {
+            company.sms_receiver_param: mobile,
+            company.sms_message_param: msg
+        }
+        if company.sms_sms_user_name_param:
+            prms[company.sms_sms_user_name_param] = company.sms_user_name
+        if company.sms_password_param:
+            prms[company.sms_password_param] = company.sms_password
+        if company.sms_sender_param:
+            prms[company.sms_sender_param] = company.sms_sender_id
+        if company.sms_templateid_param:
+            prms[company.sms_templateid_param] = templateid
+
+        params = urllib.parse.urlencode(prms)
+        return company.sms_url + "?" + params + (company.sms_extra_param or '')
+
     def _get_url(self):
         for rec in self:
-            prms = {
-                rec.company_id.sms_receiver_param: rec.mobile,
-                rec.company_id.sms_message_param: rec.msg
-            }
-            if rec.company_id.sms_sms_user_name_param:
-                prms[rec.company_id.sms_sms_user_name_param] = rec.company_id.sms_user_name
-            if rec.company_id.sms_password_param:
-                prms[rec.company_id.sms_password_param] = rec.company_id.sms_password
-            if rec.company_id.sms_sender_param:
-                prms[rec.company_id.sms_sender_param] = rec.company_id.sms_sender_id
-            if rec.company_id.sms_templateid_param:
-                prms[rec.company_id.sms_templateid_param] = rec.templateid
-
-            params = urllib.parse.urlencode(prms)
-            rec.name = rec.company_id.sms_url + "?" + params + (rec.company_id.sms_extra_param or '')
+            rec.name = self._get_sms_url(rec.company_id, rec.mobile, rec.msg, rec.templateid)
 
     READONLY_STATES = {'sent': [('readonly', True)], 'error': [('readonly', True)]}
 
@@ -47,6 +52,7 @@ class AcsSms(models.Model):
     error_msg = fields.Char("Error Message/MSG ID", states=READONLY_STATES)
     template_id = fields.Many2one("acs.sms.template", "Template", states=READONLY_STATES)
     templateid = fields.Char("Template ID", help="DLT Approved Template ID")
+    announcement_id = fields.Many2one("acs.sms.announcement", string="Announcement", index=True, states=READONLY_STATES)
     res_model = fields.Char('Resource Model', readonly=True, help="The database object this sms will be attached to.")
     res_id = fields.Many2oneReference('Resource ID', model_field='res_model',
                                       readonly=True, help="The record id this is attached to.")
@@ -62,25 +68,91 @@ class AcsSms(models.Model):
                 raise UserError(_('You cannot delete an record which is not draft.'))
         return super(AcsSms, self).unlink()
 
+    def _acs_prepare_sms_requests(self):
+        """Gateway calls for the records of one company as (sms ids, url).
+        When the gateway accepts several receivers, the messages with the same
+        text are sent together in chunks of sms_bulk_size."""
+        company = self.company_id
+        if not (company.sms_bulk_separator and company.sms_bulk_size > 1):
+            return [(rec.ids, rec.name) for rec in self]
+
+        groups = defaultdict(list)
+        # Records without a number are marked as error by send_sms
+        for rec in self.filtered('mobile'):
+            groups[(rec.msg, rec.templateid or False)].append(rec)
+        requests_list = []
+        for (msg, templateid), records in groups.items():
+            for i in range(0, len(records), company.sms_bulk_size):
+                chunk = records[i:i + company.sms_bulk_size]
+                mobile = company.sms_bulk_separator.join(rec.mobile for rec in chunk)
+                requests_list.append(([rec.id for rec in chunk], self._get_sms_url(company, mobile, msg, templateid)))
+        return requests_list
+
+    def _acs_write_replies(self, replies):
+        """Store the gateway reply of each SMS ({sms id: reply}) in one query."""
+        if not replies:
+            return
+        self.flush_model(['error_msg'])
+        self.env.cr.execute("""
+            UPDATE acs_sms SET error_msg = v.reply
+            FROM unnest(%s::int[], %s::varchar[]) AS v(id, reply)
+            WHERE acs_sms.id = v.id
+        """, (list(replies), list(replies.values())))
+        self.invalidate_model(['error_msg'])
+
     def send_sms(self):
-        for rec in self:
-            try:
-                ssl._create_default_https_context = ssl._create_unverified_context
-                rep = urlopen(Request(rec.name, headers={'User-Agent': 'Mozilla/5.0'})).read()
-                rec.state = 'sent'
-                #rec.error_msg = rep.read()
-                rec.error_msg = json.loads(rep.decode('utf-8'))
-            except Exception as e:
-                rec.state = 'error'
-                rec.error_msg = Exception
+        states = defaultdict(list)
+        replies = {}
+        # Not sendable: marked as error so that the queue does not pick them again
+        for rec in self.filtered(lambda rec: not rec.company_id or not rec.mobile):
+            states['error'].append(rec.id)
+            replies[rec.id] = _("No company set on the SMS.") if not rec.company_id else _("No destination number.")
+
+        for company in self.company_id:
+            records = self.filtered(lambda rec: rec.company_id == company and rec.mobile)
+            if not records:
+                continue
+            sender = SmsGatewaySender(max_workers=company.sms_max_workers, rate=company.sms_rate_limit,
+                timeout=company.sms_timeout, verify=company.sms_verify_ssl)
+            for sms_ids, success, reply in sender.send(records._acs_prepare_sms_requests()):
+                states['sent' if success else 'error'] += sms_ids
+                replies.update(dict.fromkeys(sms_ids, reply))
+
+        for state, sms_ids in states.items():
+            self.browse(sms_ids).write({'state': state})
+        self._acs_write_replies(replies)
 
     def action_draft(self):
         self.state = 'draft'
 
     @api.model
-    def _check_queue(self):
-        records = self.search([('state', '=', 'draft')], limit=100)
-        records.send_sms()
+    def _acs_claim_queue(self, limit=100):
+        """Lock the next queued SMS, skipping the ones locked by another worker."""
+        self.flush_model(['state'])
+        self.env.cr.execute("""
+            SELECT id FROM acs_sms
+            WHERE state = 'draft'
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        """, (limit,))
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    @api.model
+    def _check_queue(self, batch_size=500, auto_commit=False, time_limit=240):
+        """Send the queued SMS. With auto_commit, batches are committed one
+        after the other until the queue is empty or time_limit seconds passed."""
+        start = time.time()
+        while True:
+            records = self._acs_claim_queue(batch_size)
+            if not records:
+                break
+            records.send_sms()
+            if not auto_commit:
+                break
+            self.env.cr.commit()
+            if time.time() - start > time_limit:
+                break
 
     def action_open_record(self):
         self.ensure_one()
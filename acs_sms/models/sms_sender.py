@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_logger = logging.getLogger(__name__)
+
+_session_lock = threading.Lock()
+_sessions = {}
+
+
+def get_session(pool_size, verify):
+    """Process wide keep-alive HTTP session, one per pool size and SSL mode."""
+    key = (pool_size, verify)
+    with _session_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            session.verify = verify
+            session.headers['User-Agent'] = 'Mozilla/5.0'
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[key] = session
+        return session
+
+
+class SmsRateLimiter(object):
+    """Spread the requests of all the workers to at most rate per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SmsGatewaySender(object):
+    """Call the SMS gateway URLs with a bounded pool of workers.
+
+    Requests are (key, url) tuples, the workers only do HTTP and return
+    (key, ok, response text or error) in the same order.
+    """
+
+    def __init__(self, max_workers=4, rate=10, timeout=30, verify=False):
+        self.max_workers = max(1, int(max_workers or 1))
+        self.timeout = timeout or 30
+        self.limiter = SmsRateLimiter(rate)
+        self.session = get_session(self.max_workers, bool(verify))
+
+    def _call(self, request):
+        key, url = request
+        self.limiter.wait()
+        try:
+            reply = self.session.get(url, timeout=self.timeout)
+            reply.raise_for_status()
+            return key, True, reply.text
+        except requests.RequestException as e:
+            return key, False, str(e)
+
+    def send(self, requests_list):
+        if not requests_list:
+            return []
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(requests_list))) as executor:
+            results = list(executor.map(self._call, requests_list))
+        _logger.info("Called SMS gateway %s times in %.2fs", len(requests_list), time.monotonic() - start)
+        return results
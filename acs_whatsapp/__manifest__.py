@@ -19,9 +19,9 @@
     'name' : 'WhatsApp Integration',
     'summary': 'Odoo WhatsApp Integration to send Watsapp messages from Odoo.',
     'category' : 'Extra-Addons',
-    'version': '1.0.8',
+    'version': '1.0.9',
     'license': 'OPL-1',
-    'depends' : ['hr'],
+    'depends' : ['hr', 'acs_announcement_base'],
     'author': 'Almighty Consulting Solutions Pvt. Ltd.',
     'website': 'www.almightycs.com',
     'description': """
@@ -1,5 +1,4 @@
 # -*- coding: utf-8 -*-
-
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 
@@ -11,10 +10,13 @@ class HrEmployee(models.Model):
 
 class WhatsappAnnouncement(models.Model):
     _name = 'acs.whatsapp.announcement'
-    _inherit = ['acs.whatsapp.mixin']
+    _inherit = ['acs.whatsapp.mixin', 'acs.announcement.mixin']
     _description = 'whatsapp Announcement'
     _rec_name = 'message'
 
+    _acs_queue_model = 'acs.whatsapp.message'
+    _acs_queue_announcement_field = 'whatsapp_announcement_id'
+
     READONLY_STATES = {'sent': [('readonly', True)]}
 
     name = fields.Char("Name", states=READONLY_STATES)
@@ -80,25 +82,43 @@ class WhatsappAnnouncement(models.Model):
         elif self.message_type=='file':
             self.send_whatsapp_file(self.file, self.file_name, mobile, partner, template=template, res_model=res_model, res_id=res_id)
 
-    def send_message(self):
-        template = self.template_id or False
-        if self.announcement_type=='contacts':
-            for partner in self.partner_ids:
-                if partner.mobile:
-                    self.acs_create_message(partner.mobile, partner, template=template, res_model='res.partner', res_id=partner.id)
-        else:
-            if self.employee_selection_type=='employees':
-                employees = self.employee_ids
-            elif self.employee_selection_type=='department':
-                employees = self.env['hr.employee'].search([('department_id','=',self.department_id.id)])
-            else:
-                employees = self.env['hr.employee'].search([])
-            for employee in employees:
-                partner = employee.user_id and employee.user_id.partner_id
-                mobile = partner.mobile or employee.mobile_phone
-                if mobile: 
-                    self.acs_create_message(mobile, False, template=template, res_model='hr.employee', res_id=employee.id)
+    def acs_prepare_message_vals(self, recipients):
+        """Queue values for the recipients, one message per normalized number"""
+        Message = self.env['acs.whatsapp.message']
+        company_id = self._context.get('force_company') or self.env.user.sudo().company_id.id
+        common_vals = {
+            'message_type': self.message_type,
+            'company_id': company_id,
+            'template_id': self.template_id.id,
+            'whatsapp_announcement_id': self.id,
+        }
+        if self.message_type=='message':
+            common_vals['message'] = self.message
+        elif self.message_type=='file_url':
+            common_vals['file_url'] = self.file_url
+        elif self.message_type=='file':
+            common_vals.update({'file': self.file, 'file_name': self.file_name})
+        common_vals = Message._check_contents(common_vals)
 
+        messages = self.acs_render_messages(recipients) if self.message_type=='message' else {}
+        vals_list = []
+        mobiles = set()
+        for mobile, partner, res_model, res_id in recipients:
+            mobile = Message.acs_sanatize_mobile_number({'mobile': mobile})['mobile']
+            if mobile in mobiles:
+                continue
+            mobiles.add(mobile)
+            vals = dict(common_vals, mobile=mobile, partner_id=partner and partner.id or False,
+                res_model=res_model, res_id=res_id)
+            if (res_model, res_id) in messages:
+                vals['message'] = messages[(res_model, res_id)]
+            vals_list.append(vals)
+        return vals_list
+
+    def send_message(self):
+        records = self.acs_bulk_create_queue(self.acs_prepare_message_vals(self.acs_get_recipients()))
+        if self.env.context.get('force_send'):
+            records.send_whatsapp_message()
         self.state = 'sent'
         self.date = fields.Datetime.now()
 
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import time
+
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 from odoo.tools import format_datetime
@@ -48,7 +50,7 @@ class AcsWhatsAppMessage(models.Model):
         default=lambda self: self.env.company, states=READONLY_STATES)
     error_message = fields.Char("Error Message", states=READONLY_STATES)
     template_id = fields.Many2one("acs.whatsapp.template", string="Template", states=READONLY_STATES)
-    whatsapp_announcement_id = fields.Many2one("acs.whatsapp.announcement", string="Announcement", states=READONLY_STATES)
+    whatsapp_announcement_id = fields.Many2one("acs.whatsapp.announcement", string="Announcement", index=True, states=READONLY_STATES)
     reply_data = fields.Text(copy=False, states=READONLY_STATES)
     mimetype = fields.Char('Mime Type', readonly=True, states=READONLY_STATES)
     link = fields.Char('Link', states=READONLY_STATES)
@@ -112,9 +114,34 @@ class AcsWhatsAppMessage(models.Model):
         self.state = 'draft'
 
     @api.model
-    def complete_queue(self):
-        records = self.search([('state', '=', 'draft')], limit=100)
-        records.send_whatsapp_message()
+    def acs_claim_queue(self, limit=100):
+        """Lock and return the next queued messages. Messages locked by another
+        worker are skipped, so several crons can drain the queue together."""
+        self.flush_model(['state'])
+        self.env.cr.execute("""
+            SELECT id FROM acs_whatsapp_message
+            WHERE state = 'draft'
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        """, (limit,))
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    @api.model
+    def complete_queue(self, batch_size=100, auto_commit=False, time_limit=240):
+        """Send the queued messages. With auto_commit, batches are committed one
+        after the other until the queue is empty or time_limit seconds passed."""
+        start = time.time()
+        while True:
+            records = self.acs_claim_queue(batch_size)
+            if not records:
+                break
+            records.send_whatsapp_message()
+            if not auto_commit or all(rec.state == 'draft' for rec in records):
+                break
+            self.env.cr.commit()
+            if time.time() - start > time_limit:
+                break
 
     @api.onchange('partner_id')
     def onchange_partner(self):
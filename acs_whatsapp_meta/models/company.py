@@ -12,6 +12,10 @@ class ResCompany(models.Model):
     whatsapp_meta_phone_number_id = fields.Char(string='Phone Number ID')
     whatsapp_meta_token = fields.Char(string='Meta Token')
     whatsapp_business_acccountid = fields.Char("Whatsapp Business Account ID")
+    whatsapp_meta_rate_limit = fields.Integer(string='Messages per Second', default=20,
+        help="Maximum number of messages sent per second from the phone number.")
+    whatsapp_meta_max_workers = fields.Integer(string='Parallel Connections', default=8,
+        help="Number of messages sent at the same time by the queue.")
 
     def get_whatsapp_templates(self):
         messageTemplate = self.env['acs.whatsapp.template']
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_logger = logging.getLogger(__name__)
+
+#ACS: HTTP statuses worth retrying, everything else is a final answer from Meta.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+REQUEST_TIMEOUT = (5, 30)
+
+_session_lock = threading.Lock()
+_sessions = {}
+_bucket_lock = threading.Lock()
+_buckets = {}
+
+
+def get_session(pool_size):
+    """Process wide HTTP session keeping pool_size connections alive per host."""
+    with _session_lock:
+        session = _sessions.get(pool_size)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[pool_size] = session
+        return session
+
+
+def get_bucket(sender, rate):
+    """Process wide token bucket of a sender phone number id. It is shared by
+    all the dispatchers, so the rate holds across batches and parallel sends."""
+    with _bucket_lock:
+        bucket = _buckets.get(sender)
+        if bucket is None:
+            bucket = _buckets[sender] = TokenBucket(rate)
+        elif bucket.rate != float(rate):
+            bucket.set_rate(rate)
+        return bucket
+
+
+class TokenBucket(object):
+    """Thread safe token bucket: rate tokens per second, bursts up to capacity."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def set_rate(self, rate):
+        with self.lock:
+            self.rate = float(rate)
+            self.capacity = float(rate)
+            self.tokens = min(self.tokens, self.capacity)
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class WhatsAppDispatcher(object):
+    """Send prepared WhatsApp API calls with bounded concurrency.
+
+    Every job is a dict with 'key' (returned as is), 'sender' (the phone
+    number id the rate limit applies to), 'url', 'headers' and 'payload'.
+    Jobs only hold plain data: the worker threads never touch the ORM.
+    """
+
+    def __init__(self, max_workers=8, rate=20, session=None, sleep=time.sleep):
+        self.max_workers = max(1, int(max_workers or 1))
+        self.rate = rate
+        self.session = session or get_session(self.max_workers)
+        self.sleep = sleep
+
+    def _backoff(self, attempt, reply=None):
+        retry_after = reply is not None and reply.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX)
+        return min(BACKOFF_BASE * (2 ** (attempt - 1)), BACKOFF_MAX)
+
+    def send_one(self, job):
+        """:return: dict with key, status_code (False on network errors), text,
+        error, attempts and latency (ms of the last attempt)."""
+        bucket = get_bucket(job.get('sender'), self.rate)
+        result = {'key': job['key'], 'status_code': False, 'text': '', 'error': False}
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            bucket.acquire()
+            start = time.monotonic()
+            reply = None
+            try:
+                reply = self.session.post(job['url'], data=json.dumps(job['payload']),
+                    headers=job['headers'], timeout=REQUEST_TIMEOUT)
+                result.update(status_code=reply.status_code, text=reply.text, error=False)
+            except requests.RequestException as e:
+                result.update(status_code=False, text='', error=str(e))
+            result.update(attempts=attempt, latency=(time.monotonic() - start) * 1000.0)
+            if reply is not None and reply.status_code not in RETRY_STATUSES:
+                break
+            if attempt < MAX_ATTEMPTS:
+                self.sleep(self._backoff(attempt, reply))
+        return result
+
+    def send(self, jobs):
+        """Send all the jobs and return their results in the same order."""
+        if not jobs:
+            return []
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as executor:
+            results = list(executor.map(self.send_one, jobs))
+        _logger.info("Dispatched %s WhatsApp messages in %.2fs", len(jobs), time.monotonic() - start)
+        return results
@@ -13,6 +13,8 @@ from odoo import api, fields, models, _
 from odoo.exceptions import UserError, ValidationError
 from odoo.tools import format_datetime, DEFAULT_SERVER_DATETIME_FORMAT as DTF
 
+from .dispatcher import WhatsAppDispatcher
+
 
 class AcsWhatsAppTemplate(models.Model):
     _inherit = 'acs.whatsapp.template'
@@ -77,6 +79,8 @@ class AcsWhatsAppMessage(models.Model):
         ('document','Document'),
         ('audio','Audio'),
         ('video','Video')], compute="acs_get_file_type" ,string="ACS File Type")
+    send_latency = fields.Float("Send Latency (ms)", readonly=True, copy=False, group_operator='avg')
+    send_attempts = fields.Integer("Send Attempts", readonly=True, copy=False)
 
     def acs_get_media_id(self):
         company = self.env.user.sudo().company_id
@@ -121,73 +125,94 @@ class AcsWhatsAppMessage(models.Model):
                 })
         return parameters_data
 
-    def send_whatsapp_message(self):
-        for rec in self:            
-            try:
-                headers = {
-                    'Content-type': 'application/json',
-                    'Authorization': 'Bearer %s' % (rec.company_id.whatsapp_meta_token)
+    def acs_prepare_meta_request(self):
+        """Dispatcher job for the message, False when it cannot be sent."""
+        self.ensure_one()
+        headers = {
+            'Content-type': 'application/json',
+            'Authorization': 'Bearer %s' % (self.company_id.whatsapp_meta_token)
+        }
+        to_number = self.mobile.replace('+','').replace(' ','')
+        URL = "%s/%s/messages" % (self.company_id.whatsapp_meta_url,self.company_id.whatsapp_meta_phone_number_id)
+        if self.message_type=='message':
+            message = {
+                    "messaging_product": "whatsapp", 
+                    "to": to_number
+                }
+            if self.template_id:
+                message["type"] = "template"
+                message["template"] = { 
+                    "name": self.template_id.name, 
+                    "language": { 
+                        "code": self.template_id.language_id.code or "en_US"
+                    },
+                    "components": [{
+                        "type": "body",
+                    }]
+                }
+                parameters = self.acs_get_template_parameters(self.template_id.body_message)
+                if parameters:
+                    message["template"]["components"][0].update({
+                        "parameters": parameters
+                    })
+
+            else:
+                message["text"] = { 
+                    "body": self.message
                 }
-                to_number = rec.mobile.replace('+','').replace(' ','')
-                if rec.message_type=='message':
-                    URL = "%s/%s/messages" % (rec.company_id.whatsapp_meta_url,rec.company_id.whatsapp_meta_phone_number_id)
-                    message = {
-                            "messaging_product": "whatsapp", 
-                            "to": to_number
-                        }
-                    if rec.template_id:
-                        message["type"] = "template"
-                        message["template"] = { 
-                            "name": rec.template_id.name, 
-                            "language": { 
-                                "code": rec.template_id.language_id.code or "en_US"
-                            },
-                            "components": [{
-                                "type": "body",
-                            }]
-                        }
-                        parameters = rec.acs_get_template_parameters(self.template_id.body_message)
-                        if parameters:
-                            message["template"]["components"][0].update({
-                                "parameters": parameters
-                            })
-
-                    else:
-                        message["text"] = { 
-                            "body": rec.message
-                        }
-
-                elif rec.message_type in ['file']:
-                    #ACS: if no media first create media id.
-                    if not rec.media_id:
-                        rec.acs_get_media_id()
-
-                    URL = "%s/%s/messages" % (rec.company_id.whatsapp_meta_url,rec.company_id.whatsapp_meta_phone_number_id)
-                    message = {
-                        "messaging_product": "whatsapp", 
-                        "to": to_number,
-                        "type": rec.media_type,
-                        rec.media_type: {
-                            "id" : rec.media_id,
-                            "filename": rec.file_name.replace('/',' ').replace(' ','_')
-                        }
-                    }
-
-                else:
-                    rec.state = 'error'
-                    rec.error_message = 'This Message Type is not suppoerted.'
-                    return
-
-                reply = requests.post(URL, data=json.dumps(message), headers=headers)
-                if reply.status_code==200:
-                    rec.state = 'sent'
-                else:
-                    rec.state = 'error'
-                rec.reply_data = reply.text
 
+        elif self.message_type in ['file']:
+            #ACS: if no media first create media id.
+            if not self.media_id:
+                self.acs_get_media_id()
+
+            message = {
+                "messaging_product": "whatsapp", 
+                "to": to_number,
+                "type": self.media_type,
+                self.media_type: {
+                    "id" : self.media_id,
+                    "filename": self.file_name.replace('/',' ').replace(' ','_')
+                }
+            }
+
+        else:
+            self.state = 'error'
+            self.error_message = 'This Message Type is not suppoerted.'
+            return False
+
+        return {
+            'key': self.id,
+            'sender': self.company_id.whatsapp_meta_phone_number_id,
+            'url': URL,
+            'headers': headers,
+            'payload': message,
+        }
+
+    def send_whatsapp_message(self):
+        jobs_by_company = {}
+        for rec in self:
+            try:
+                job = rec.acs_prepare_meta_request()
             except Exception as e:
                 rec.state = 'error'
                 rec.error_message = e
+                continue
+            if job:
+                jobs_by_company.setdefault(rec.company_id, []).append(job)
+
+        for company, jobs in jobs_by_company.items():
+            dispatcher = WhatsAppDispatcher(max_workers=company.whatsapp_meta_max_workers,
+                rate=company.whatsapp_meta_rate_limit or 20)
+            for result in dispatcher.send(jobs):
+                rec = self.browse(result['key'])
+                rec.write({
+                    'state': 'sent' if result['status_code']==200 else 'error',
+                    'reply_data': result['text'],
+                    'error_message': result['error'],
+                    'send_latency': result['latency'],
+                    'send_attempts': result['attempts'],
+                })
 
 
 class ACSwhatsappMixin(models.AbstractModel):
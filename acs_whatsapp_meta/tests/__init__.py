@@ -0,0 +1,3 @@
+# -*- encoding: utf-8 -*-
+
+from . import test_dispatcher
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from odoo.tests import common, tagged
+
+from ..models import dispatcher
+
+
+class MetaStubHandler(BaseHTTPRequestHandler):
+    """Fake Meta messages endpoint: answers the statuses queued for the
+    destination number, then 200."""
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        server = self.server
+        with server.lock:
+            server.calls[payload['to']] = server.calls.get(payload['to'], 0) + 1
+            statuses = server.statuses.get(payload['to']) or []
+            status = statuses.pop(0) if statuses else 200
+        body = json.dumps({'messages': [{'id': 'wamid.test'}]} if status == 200 else {'error': status}).encode()
+        self.send_response(status)
+        # No wait between the retries of the test
+        self.send_header('Retry-After', '0')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@tagged('post_install', '-at_install')
+class TestWhatsAppDispatcher(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), MetaStubHandler)
+        cls.server.lock = threading.Lock()
+        cls.server.calls = {}
+        cls.server.statuses = {}
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+
+        cls.env.company.write({
+            'whatsapp_meta_url': 'http://127.0.0.1:%s' % cls.server.server_address[1],
+            'whatsapp_meta_phone_number_id': 'acs_test_phone',
+            'whatsapp_meta_token': 'token',
+            'whatsapp_meta_rate_limit': 50,
+            'whatsapp_meta_max_workers': 4,
+        })
+
+    def _create_message(self, mobile):
+        return self.env['acs.whatsapp.message'].create({
+            'message': 'Test message',
+            'message_type': 'message',
+            'mobile': mobile,
+            'company_id': self.env.company.id,
+        })
+
+    def test_retry_statuses(self):
+        """ 429 and 5xx answers are retried until a final status or the last attempt. """
+        self.server.statuses.update({
+            '910000000001': [429, 500],
+            '910000000002': [503] * dispatcher.MAX_ATTEMPTS,
+            '910000000003': [],
+        })
+        retried = self._create_message('+91 0000000001')
+        failed = self._create_message('+91 0000000002')
+        direct = self._create_message('+91 0000000003')
+
+        (retried | failed | direct).send_whatsapp_message()
+
+        self.assertEqual(retried.state, 'sent')
+        self.assertEqual(retried.send_attempts, 3)
+        self.assertEqual(self.server.calls['910000000001'], 3)
+
+        self.assertEqual(failed.state, 'error')
+        self.assertEqual(failed.send_attempts, dispatcher.MAX_ATTEMPTS)
+        self.assertEqual(self.server.calls['910000000002'], dispatcher.MAX_ATTEMPTS)
+
+        self.assertEqual(direct.state, 'sent')
+        self.assertEqual(direct.send_attempts, 1)
+        self.assertIn('wamid.test', direct.reply_data)
+
+    def test_shared_rate_limit(self):
+        """ The rate limit of a phone number is shared by all the dispatchers. """
+        bucket = dispatcher.get_bucket('acs_test_phone', 50)
+        self.assertIs(dispatcher.get_bucket('acs_test_phone', 50), bucket)
+        self.assertEqual(dispatcher.get_bucket('acs_test_phone', 10).rate, 10.0)
+        self.assertIsNot(dispatcher.get_bucket('acs_other_phone', 50), bucket)
@@ -1,18 +1,72 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields, api
+from odoo import models, fields, api, _
 import calendar
 import datetime
+import logging
+import time
+from collections import defaultdict
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from odoo import models, api, tools
+from odoo.exceptions import UserError
 from odoo.http import request
 
+_logger = logging.getLogger(__name__)
+
+# Seconds a computed dashboard stays valid, see get_dashboard_data()
+DASHBOARD_CACHE_TTL = 60
+
+# {(dbname, company ids, posted, lang): (expiry, data)}, local to the worker
+_dashboard_cache = {}
+
+# (method, args) of the tiles timed by benchmark_dashboard_tiles()
+DASHBOARD_BENCHMARK_TILES = [
+    ('get_income_this_year', ('posted',)),
+    ('get_income_last_year', ('posted',)),
+    ('get_income_this_month', ('posted',)),
+    ('get_income_last_month', ('posted',)),
+    ('get_today_income_expense', ('posted',)),
+    ('get_overdues_this_month_and_year', ('posted', 'this_month')),
+    ('get_latebillss', ('posted', 'this_year')),
+    ('get_top_10_customers_month', ('posted', 'this_month')),
+    ('get_total_invoice_current_month', ('posted',)),
+    ('get_total_invoice_current_year', ('posted',)),
+    ('unreconcile_items_this_month', ('posted',)),
+    ('unreconcile_items_this_year', ('posted',)),
+    ('month_income_this_month', ('posted',)),
+    ('month_income_this_year', ('posted',)),
+    ('month_expense_this_month', ('posted',)),
+    ('month_expense_this_year', ('posted',)),
+    ('profit_income_this_month', ('posted',)),
+    ('profit_income_this_year', ('posted',)),
+    ('bank_balance', ('posted',)),
+]
+
+
+def _clear_dashboard_cache(dbname):
+    for key in [key for key in _dashboard_cache if key[0] == dbname]:
+        _dashboard_cache.pop(key, None)
+
+
+class DashBoardLine(models.Model):
+    _inherit = 'account.move.line'
+
+    def init(self):
+        super(DashBoardLine, self).init()
+        # Every dashboard tile filters on these columns, the date as a range
+        tools.create_index(self._cr, 'account_move_line_dashboard_index', self._table,
+                           ['company_id', 'parent_state', 'date', 'account_id'])
+
 
 class DashBoard(models.Model):
     _inherit = 'account.move'
 
     def get_current_company_value(self):
         """Optimized company retrieval with caching"""
+        if not request:
+            # Outside of a web request (shell, cron, benchmark)
+            company_ids = self.env.companies.ids
+            return company_ids + [0] if len(company_ids) == 1 else company_ids
         cookies_cids = [int(r) for r in request.httprequest.cookies.get('cids').split(",")] \
             if request.httprequest.cookies.get('cids') \
             else [request.env.user.company_id.id]
@@ -44,21 +98,21 @@ class DashBoard(models.Model):
         # Single optimized query using JOIN and CASE statements
         query = """
             SELECT 
-                TO_CHAR(aml.date, 'Month') as month,
+                date_trunc('month', aml.date)::date as month,
                 SUM(CASE WHEN aa.internal_group = 'income' THEN aml.debit - aml.credit ELSE 0 END) as income,
                 SUM(CASE WHEN aa.internal_group = 'expense' THEN aml.debit - aml.credit ELSE 0 END) as expense
             FROM account_move_line aml
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group IN ('income', 'expense')
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('year', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND aml.company_id = ANY(%s)
                 AND {}
-            GROUP BY TO_CHAR(aml.date, 'Month')
-            ORDER BY MIN(aml.date)
+            GROUP BY date_trunc('month', aml.date)
         """.format(states_condition)
 
         self._cr.execute(query, (company_id,))
-        results = {row['month'].strip(): row for row in self._cr.dictfetchall()}
+        results = {format(row['month'], '%B'): row for row in self._cr.dictfetchall()}
 
         # Process results efficiently
         records = []
@@ -98,21 +152,21 @@ class DashBoard(models.Model):
 
         query = """
             SELECT 
-                TO_CHAR(aml.date, 'Month') as month,
+                date_trunc('month', aml.date)::date as month,
                 SUM(CASE WHEN aa.internal_group = 'income' THEN aml.debit - aml.credit ELSE 0 END) as income,
                 SUM(CASE WHEN aa.internal_group = 'expense' THEN aml.debit - aml.credit ELSE 0 END) as expense
             FROM account_move_line aml
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group IN ('income', 'expense')
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE) - 1
+                AND aml.date >= (date_trunc('year', CURRENT_DATE) - interval '1 year')::date
+                AND aml.date < date_trunc('year', CURRENT_DATE)::date
                 AND aml.company_id = ANY(%s)
                 AND {}
-            GROUP BY TO_CHAR(aml.date, 'Month')
-            ORDER BY MIN(aml.date)
+            GROUP BY date_trunc('month', aml.date)
         """.format(states_condition)
 
         self._cr.execute(query, (company_id,))
-        results = {row['month'].strip(): row for row in self._cr.dictfetchall()}
+        results = {format(row['month'], '%B'): row for row in self._cr.dictfetchall()}
 
         records = []
         for month in month_list:
@@ -154,14 +208,14 @@ class DashBoard(models.Model):
             FROM account_move_line aml
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group IN ('income', 'expense')
-                AND EXTRACT(MONTH FROM aml.date) = %s
-                AND EXTRACT(YEAR FROM aml.date) = %s
+                AND aml.date >= (date_trunc('month', CURRENT_DATE) - interval '1 month')::date
+                AND aml.date < date_trunc('month', CURRENT_DATE)::date
                 AND aml.company_id = ANY(%s)
                 AND {}
             GROUP BY EXTRACT(DAY FROM aml.date)
         """.format(states_condition)
 
-        self._cr.execute(query, (last_month.month, last_month.year, company_id))
+        self._cr.execute(query, (company_id,))
         results = {int(row['date']): row for row in self._cr.dictfetchall()}
 
         records = []
@@ -204,8 +258,8 @@ class DashBoard(models.Model):
             FROM account_move_line aml
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group IN ('income', 'expense')
-                AND EXTRACT(MONTH FROM aml.date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('month', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND aml.company_id = ANY(%s)
                 AND {}
             GROUP BY EXTRACT(DAY FROM aml.date)
@@ -324,11 +378,14 @@ class DashBoard(models.Model):
 
         if post[1] == 'this_month':
             date_condition = """
-                AND EXTRACT(MONTH FROM am.invoice_date_due) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM am.invoice_date_due) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND am.invoice_date_due >= date_trunc('month', CURRENT_DATE)::date
+                AND am.invoice_date_due < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
             """
         else:
-            date_condition = "AND EXTRACT(YEAR FROM am.invoice_date_due) = EXTRACT(YEAR FROM CURRENT_DATE)"
+            date_condition = """
+                AND am.invoice_date_due >= date_trunc('year', CURRENT_DATE)::date
+                AND am.invoice_date_due < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
+            """
 
         query = """
             SELECT 
@@ -374,11 +431,14 @@ class DashBoard(models.Model):
 
         if post[1] == 'this_month':
             date_condition = """
-                AND EXTRACT(MONTH FROM am.invoice_date_due) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM am.invoice_date_due) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND am.invoice_date_due >= date_trunc('month', CURRENT_DATE)::date
+                AND am.invoice_date_due < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
             """
         else:
-            date_condition = "AND EXTRACT(YEAR FROM am.invoice_date_due) = EXTRACT(YEAR FROM CURRENT_DATE)"
+            date_condition = """
+                AND am.invoice_date_due >= date_trunc('year', CURRENT_DATE)::date
+                AND am.invoice_date_due < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
+            """
 
         query = """
             SELECT 
@@ -424,12 +484,14 @@ class DashBoard(models.Model):
 
         if post[1] == 'this_month':
             date_condition = """
-                AND EXTRACT(MONTH FROM am.invoice_date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM am.invoice_date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND am.invoice_date >= date_trunc('month', CURRENT_DATE)::date
+                AND am.invoice_date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
             """
         else:
-            one_month_ago = (datetime.now() - relativedelta(months=1)).month
-            date_condition = f"AND EXTRACT(MONTH FROM am.invoice_date) = {one_month_ago}"
+            date_condition = """
+                AND am.invoice_date >= (date_trunc('month', CURRENT_DATE) - interval '1 month')::date
+                AND am.invoice_date < date_trunc('month', CURRENT_DATE)::date
+            """
 
         # Single query for both invoice and refund data
         query = """
@@ -509,7 +571,8 @@ class DashBoard(models.Model):
                      THEN -(amount_total_signed - amount_residual_signed) ELSE 0 END) as supplier_paid
             FROM account_move
             WHERE move_type IN ('out_invoice', 'in_invoice')
-                AND EXTRACT(YEAR FROM date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND date >= date_trunc('year', CURRENT_DATE)::date
+                AND date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND company_id = ANY(%s)
                 AND {}
         """.format(states_condition)
@@ -544,8 +607,8 @@ class DashBoard(models.Model):
                      THEN -(amount_total_signed - amount_residual_signed) ELSE 0 END) as supplier_paid
             FROM account_move
             WHERE move_type IN ('out_invoice', 'in_invoice')
-                AND EXTRACT(MONTH FROM date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND date >= date_trunc('month', CURRENT_DATE)::date
+                AND date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND company_id = ANY(%s)
                 AND {}
         """.format(states_condition)
@@ -577,8 +640,8 @@ class DashBoard(models.Model):
             SELECT SUM(amount_total) as total
             FROM account_move
             WHERE move_type = 'out_invoice'
-                AND EXTRACT(MONTH FROM date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND date >= date_trunc('month', CURRENT_DATE)::date
+                AND date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND company_id = ANY(%s)
                 AND {}
         """.format(states_condition)
@@ -589,18 +652,16 @@ class DashBoard(models.Model):
     @api.model
     def get_total_invoice_last_month(self):
         """Optimized invoice total for last month"""
-        one_month_ago = (datetime.now() - relativedelta(months=1))
-
         query = """
             SELECT SUM(amount_total) as total
             FROM account_move
             WHERE move_type = 'out_invoice'
                 AND state = 'posted'
-                AND EXTRACT(MONTH FROM date) = %s
-                AND EXTRACT(YEAR FROM date) = %s
+                AND date >= (date_trunc('month', CURRENT_DATE) - interval '1 month')::date
+                AND date < date_trunc('month', CURRENT_DATE)::date
         """
 
-        self._cr.execute(query, (one_month_ago.month, one_month_ago.year))
+        self._cr.execute(query)
         return self._cr.dictfetchall()
 
     @api.model
@@ -635,7 +696,8 @@ class DashBoard(models.Model):
             FROM account_move
             WHERE move_type = 'out_invoice'
                 AND state = 'posted'
-                AND EXTRACT(YEAR FROM date) = EXTRACT(YEAR FROM CURRENT_DATE) - 1
+                AND date >= (date_trunc('year', CURRENT_DATE) - interval '1 year')::date
+                AND date < date_trunc('year', CURRENT_DATE)::date
         """
 
         self._cr.execute(query)
@@ -651,7 +713,8 @@ class DashBoard(models.Model):
             FROM account_move
             WHERE move_type = 'out_invoice'
                 AND state = 'posted'
-                AND EXTRACT(YEAR FROM date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND date >= date_trunc('year', CURRENT_DATE)::date
+                AND date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND company_id = ANY(%s)
         """
 
@@ -684,8 +747,8 @@ class DashBoard(models.Model):
             SELECT COUNT(*)
             FROM account_move_line aml
             JOIN account_account aa ON aml.account_id = aa.id
-            WHERE EXTRACT(MONTH FROM aml.date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+            WHERE aml.date >= date_trunc('month', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND aml.full_reconcile_id IS NULL
                 AND aml.product_id IS NULL
                 AND aml.balance != 0
@@ -700,20 +763,18 @@ class DashBoard(models.Model):
     @api.model
     def unreconcile_items_last_month(self):
         """Optimized unreconciled items for last month"""
-        one_month_ago = (datetime.now() - relativedelta(months=1))
-
         query = """
             SELECT COUNT(*)
             FROM account_move_line aml
             JOIN account_account aa ON aml.account_id = aa.id
-            WHERE EXTRACT(MONTH FROM aml.date) = %s
-                AND EXTRACT(YEAR FROM aml.date) = %s
+            WHERE aml.date >= (date_trunc('month', CURRENT_DATE) - interval '1 month')::date
+                AND aml.date < date_trunc('month', CURRENT_DATE)::date
                 AND aml.full_reconcile_id IS NULL
                 AND aml.balance != 0
                 AND aa.reconcile IS TRUE
         """
 
-        self._cr.execute(query, (one_month_ago.month, one_month_ago.year))
+        self._cr.execute(query)
         return self._cr.dictfetchall()
 
     @api.model
@@ -727,7 +788,8 @@ class DashBoard(models.Model):
             SELECT COUNT(*)
             FROM account_move_line aml
             JOIN account_account aa ON aml.account_id = aa.id
-            WHERE EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+            WHERE aml.date >= date_trunc('year', CURRENT_DATE)::date
+            AND aml.date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND aml.full_reconcile_id IS NULL
                 AND aml.product_id IS NULL
                 AND aml.balance != 0
@@ -746,7 +808,8 @@ class DashBoard(models.Model):
             SELECT COUNT(*)
             FROM account_move_line aml
             JOIN account_account aa ON aml.account_id = aa.id
-            WHERE EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE) - 1
+            WHERE aml.date >= (date_trunc('year', CURRENT_DATE) - interval '1 year')::date
+            AND aml.date < date_trunc('year', CURRENT_DATE)::date
                 AND aml.full_reconcile_id IS NULL
                 AND aml.balance != 0
                 AND aa.reconcile IS TRUE
@@ -768,8 +831,8 @@ class DashBoard(models.Model):
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group = 'expense'
                 AND {}
-                AND EXTRACT(MONTH FROM aml.date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('month', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND aml.company_id = ANY(%s)
         """.format(states_condition)
 
@@ -789,7 +852,8 @@ class DashBoard(models.Model):
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group = 'expense'
                 AND {}
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('year', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND aml.company_id = ANY(%s)
         """.format(states_condition)
 
@@ -809,8 +873,8 @@ class DashBoard(models.Model):
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group = 'income'
                 AND {}
-                AND EXTRACT(MONTH FROM aml.date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('month', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND aml.company_id = ANY(%s)
         """.format(states_condition)
 
@@ -830,7 +894,8 @@ class DashBoard(models.Model):
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group = 'income'
                 AND {}
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('year', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND aml.company_id = ANY(%s)
         """.format(states_condition)
 
@@ -850,8 +915,8 @@ class DashBoard(models.Model):
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group IN ('income', 'expense')
                 AND {}
-                AND EXTRACT(MONTH FROM aml.date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('month', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND aml.company_id = ANY(%s)
         """.format(states_condition)
 
@@ -871,7 +936,8 @@ class DashBoard(models.Model):
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group IN ('income', 'expense')
                 AND {}
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('year', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND aml.company_id = ANY(%s)
         """.format(states_condition)
 
@@ -888,7 +954,8 @@ class DashBoard(models.Model):
             SELECT id FROM account_move
             WHERE move_type = 'in_invoice'
                 AND {}
-                AND EXTRACT(YEAR FROM date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND date >= date_trunc('year', CURRENT_DATE)::date
+                AND date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND company_id = ANY(%s)
         """.format(states_condition)
 
@@ -905,7 +972,8 @@ class DashBoard(models.Model):
             WHERE move_type = 'in_invoice'
                 AND {}
                 AND payment_state = 'paid'
-                AND EXTRACT(YEAR FROM date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND date >= date_trunc('year', CURRENT_DATE)::date
+                AND date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND company_id = ANY(%s)
         """.format(states_condition)
 
@@ -922,7 +990,8 @@ class DashBoard(models.Model):
             WHERE move_type = 'out_invoice'
                 AND {}
                 AND payment_state = 'paid'
-                AND EXTRACT(YEAR FROM date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND date >= date_trunc('year', CURRENT_DATE)::date
+                AND date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND company_id = ANY(%s)
         """.format(states_condition)
 
@@ -938,7 +1007,8 @@ class DashBoard(models.Model):
             SELECT id FROM account_move
             WHERE move_type = 'out_invoice'
                 AND {}
-                AND EXTRACT(YEAR FROM date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND date >= date_trunc('year', CURRENT_DATE)::date
+                AND date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND company_id = ANY(%s)
         """.format(states_condition)
 
@@ -954,8 +1024,8 @@ class DashBoard(models.Model):
             SELECT id FROM account_move
             WHERE move_type = 'in_invoice'
                 AND {}
-                AND EXTRACT(MONTH FROM date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND date >= date_trunc('month', CURRENT_DATE)::date
+                AND date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND company_id = ANY(%s)
         """.format(states_condition)
 
@@ -972,8 +1042,8 @@ class DashBoard(models.Model):
             WHERE move_type = 'in_invoice'
                 AND {}
                 AND payment_state = 'paid'
-                AND EXTRACT(MONTH FROM date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND date >= date_trunc('month', CURRENT_DATE)::date
+                AND date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND company_id = ANY(%s)
         """.format(states_condition)
 
@@ -990,8 +1060,8 @@ class DashBoard(models.Model):
             WHERE move_type = 'out_invoice'
                 AND {}
                 AND payment_state = 'paid'
-                AND EXTRACT(MONTH FROM date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND date >= date_trunc('month', CURRENT_DATE)::date
+                AND date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND company_id = ANY(%s)
         """.format(states_condition)
 
@@ -1007,8 +1077,8 @@ class DashBoard(models.Model):
             SELECT id FROM account_move
             WHERE move_type = 'out_invoice'
                 AND {}
-                AND EXTRACT(MONTH FROM date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND date >= date_trunc('month', CURRENT_DATE)::date
+                AND date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND company_id = ANY(%s)
         """.format(states_condition)
 
@@ -1025,8 +1095,8 @@ class DashBoard(models.Model):
             SELECT aml.id
             FROM account_move_line aml
             JOIN account_account aa ON aml.account_id = aa.id
-            WHERE EXTRACT(MONTH FROM aml.date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+            WHERE aml.date >= date_trunc('month', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND aml.full_reconcile_id IS NULL
                 AND aml.product_id IS NULL
                 AND aml.balance != 0
@@ -1048,7 +1118,8 @@ class DashBoard(models.Model):
             SELECT aml.id
             FROM account_move_line aml
             JOIN account_account aa ON aml.account_id = aa.id
-            WHERE EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+            WHERE aml.date >= date_trunc('year', CURRENT_DATE)::date
+            AND aml.date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND aml.full_reconcile_id IS NULL
                 AND aml.product_id IS NULL
                 AND aml.balance != 0
@@ -1112,7 +1183,8 @@ class DashBoard(models.Model):
             WHERE am.move_type = 'entry'
                 AND am.state = 'posted'
                 AND aa.internal_group = 'income'
-                AND EXTRACT(MONTH FROM aml.date) = EXTRACT(MONTH FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('month', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
         """
         self._cr.execute(query)
         return self._cr.dictfetchall()
@@ -1129,8 +1201,8 @@ class DashBoard(models.Model):
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group = 'income'
                 AND {}
-                AND EXTRACT(MONTH FROM aml.date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('month', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND aml.company_id = ANY(%s)
         """.format(states_condition)
 
@@ -1151,8 +1223,8 @@ class DashBoard(models.Model):
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group IN ('income', 'expense')
                 AND {}
-                AND EXTRACT(MONTH FROM aml.date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('month', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND aml.company_id = ANY(%s)
             GROUP BY aa.internal_group
         """.format(states_condition)
@@ -1175,7 +1247,8 @@ class DashBoard(models.Model):
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group IN ('income', 'expense')
                 AND {}
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('year', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND aml.company_id = ANY(%s)
             GROUP BY aa.internal_group
         """.format(states_condition)
@@ -1186,19 +1259,17 @@ class DashBoard(models.Model):
 
     @api.model
     def month_income_last_month(self):
-        one_month_ago = (datetime.now() - relativedelta(months=1))
-
         query = """
             SELECT SUM(aml.debit) as debit, SUM(aml.credit) as credit
             FROM account_move_line aml
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group = 'income'
                 AND aml.parent_state = 'posted'
-                AND EXTRACT(MONTH FROM aml.date) = %s
-                AND EXTRACT(YEAR FROM aml.date) = %s
+                AND aml.date >= (date_trunc('month', CURRENT_DATE) - interval '1 month')::date
+                AND aml.date < date_trunc('month', CURRENT_DATE)::date
         """
 
-        self._cr.execute(query, (one_month_ago.month, one_month_ago.year))
+        self._cr.execute(query)
         return self._cr.dictfetchall()
 
     @api.model
@@ -1213,7 +1284,8 @@ class DashBoard(models.Model):
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group = 'income'
                 AND {}
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('year', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND aml.company_id = ANY(%s)
         """.format(states_condition)
 
@@ -1228,7 +1300,8 @@ class DashBoard(models.Model):
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group = 'income'
                 AND aml.parent_state = 'posted'
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE) - 1
+                AND aml.date >= (date_trunc('year', CURRENT_DATE) - interval '1 year')::date
+                AND aml.date < date_trunc('year', CURRENT_DATE)::date
         """
 
         self._cr.execute(query)
@@ -1264,7 +1337,8 @@ class DashBoard(models.Model):
             WHERE am.move_type = 'entry'
                 AND am.state = 'posted'
                 AND aa.internal_group = 'expense'
-                AND EXTRACT(MONTH FROM aml.date) = EXTRACT(MONTH FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('month', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
         """
         self._cr.execute(query)
         return self._cr.dictfetchall()
@@ -1281,8 +1355,8 @@ class DashBoard(models.Model):
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group = 'expense'
                 AND {}
-                AND EXTRACT(MONTH FROM aml.date) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('month', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('month', CURRENT_DATE) + interval '1 month')::date
                 AND aml.company_id = ANY(%s)
         """.format(states_condition)
 
@@ -1301,7 +1375,8 @@ class DashBoard(models.Model):
             JOIN account_account aa ON aml.account_id = aa.id
             WHERE aa.internal_group = 'expense'
                 AND {}
-                AND EXTRACT(YEAR FROM aml.date) = EXTRACT(YEAR FROM CURRENT_DATE)
+                AND aml.date >= date_trunc('year', CURRENT_DATE)::date
+                AND aml.date < (date_trunc('year', CURRENT_DATE) + interval '1 year')::date
                 AND aml.company_id = ANY(%s)
         """.format(states_condition)
 
@@ -1346,3 +1421,303 @@ class DashBoard(models.Model):
             'banking': banking,
             'bank_ids': bank_ids
         }
+
+    def _post(self, soft=True):
+        res = super(DashBoard, self)._post(soft)
+        self._invalidate_dashboard_cache()
+        return res
+
+    def button_draft(self):
+        res = super(DashBoard, self).button_draft()
+        self._invalidate_dashboard_cache()
+        return res
+
+    def _invalidate_dashboard_cache(self):
+        """Drop the cached dashboards of this database once the transaction
+        changing the posted entries is committed."""
+        dbname = self._cr.dbname
+        self._cr.postcommit.add(lambda: _clear_dashboard_cache(dbname))
+
+    @api.model
+    def get_dashboard_data(self, *post):
+        """All the tiles shown when the dashboard opens, in one call.
+
+        Returns a dict mapping each tile method to the value that method
+        returns, computed from a few grouped queries and cached for
+        DASHBOARD_CACHE_TTL seconds per company set and posted filter.
+        """
+        company_id = self.get_current_company_value()
+        posted = post == ('posted',)
+        key = (self._cr.dbname, tuple(sorted(company_id)), posted, self.env.user.lang)
+        cached = _dashboard_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        data = self._compute_dashboard_data(company_id, posted)
+        _dashboard_cache[key] = (time.monotonic() + DASHBOARD_CACHE_TTL, data)
+        return data
+
+    @api.model
+    def _compute_dashboard_data(self, company_id, posted):
+        post = ('posted',) if posted else (False,)
+        aml_states = "aml.parent_state = 'posted'" if posted else "aml.parent_state IN ('posted', 'draft')"
+        am_states = "am.state = 'posted'" if posted else "am.state IN ('posted', 'draft')"
+
+        today = fields.Date.today()
+        month_start = today.replace(day=1)
+        next_month = month_start + relativedelta(months=1)
+        year_start = today.replace(month=1, day=1)
+        next_year = year_start + relativedelta(years=1)
+        params = {
+            'company_id': company_id,
+            'month_start': month_start,
+            'next_month': next_month,
+            'year_start': year_start,
+            'next_year': next_year,
+        }
+
+        # Income and expense of the year per day and account group: every
+        # profit and loss tile is a sum over a slice of these rows.
+        self._cr.execute("""
+            SELECT aml.date, aa.internal_group,
+                SUM(aml.debit) as debit, SUM(aml.credit) as credit
+            FROM account_move_line aml
+            JOIN account_account aa ON aml.account_id = aa.id
+            WHERE aa.internal_group IN ('income', 'expense')
+                AND aml.date >= %(year_start)s AND aml.date < %(next_year)s
+                AND aml.company_id = ANY(%(company_id)s)
+                AND {}
+            GROUP BY aml.date, aa.internal_group
+        """.format(aml_states), params)
+        pl_rows = self._cr.dictfetchall()
+
+        def pl_total(group, date_from, date_to):
+            total = {'debit': 0.0, 'credit': 0.0}
+            for row in pl_rows:
+                if row['internal_group'] == group and date_from <= row['date'] < date_to:
+                    total['debit'] += row['debit'] or 0.0
+                    total['credit'] += row['credit'] or 0.0
+            return total
+
+        def pl_profit(date_from, date_to):
+            profit = []
+            for group in ('income', 'expense'):
+                if any(row['internal_group'] == group and date_from <= row['date'] < date_to
+                       for row in pl_rows):
+                    total = pl_total(group, date_from, date_to)
+                    profit.append(total['debit'] - total['credit'])
+            return profit
+
+        daily = defaultdict(lambda: {'income': 0.0, 'expense': 0.0})
+        for row in pl_rows:
+            if row['date'] >= month_start and row['date'] < next_month:
+                daily[row['date'].day][row['internal_group']] += (row['debit'] or 0.0) - (row['credit'] or 0.0)
+        day_list = list(range(1, calendar.monthrange(today.year, today.month)[1] + 1))
+        income_this_month = {'income': [], 'expense': [], 'date': day_list, 'profit': []}
+        for day in day_list:
+            income_val = abs(daily[day]['income'])
+            expense_val = abs(daily[day]['expense'])
+            income_this_month['income'].append(income_val)
+            income_this_month['expense'].append(expense_val)
+            income_this_month['profit'].append(income_val - expense_val)
+
+        tomorrow = today + relativedelta(days=1)
+        today_income = pl_total('income', today, tomorrow)
+        today_expense = pl_total('expense', today, tomorrow)
+
+        self._cr.execute("""
+            SELECT
+                COUNT(*) FILTER (WHERE aml.date >= %(month_start)s AND aml.date < %(next_month)s) as this_month,
+                COUNT(*) as this_year
+            FROM account_move_line aml
+            JOIN account_account aa ON aml.account_id = aa.id
+            WHERE aml.date >= %(year_start)s AND aml.date < %(next_year)s
+                AND aml.full_reconcile_id IS NULL
+                AND aml.product_id IS NULL
+                AND aml.balance != 0
+                AND aa.reconcile IS TRUE
+                AND {}
+                AND aml.company_id = ANY(%(company_id)s)
+        """.format(aml_states), params)
+        unreconciled = self._cr.dictfetchone()
+
+        # Unpaid invoices and bills of the year per partner, with the part
+        # due this month, for the overdue and late bill charts.
+        self._cr.execute("""
+            SELECT
+                am.move_type,
+                rp.name as partner,
+                SUM(am.amount_total) FILTER (
+                    WHERE am.invoice_date_due >= %(month_start)s AND am.invoice_date_due < %(next_month)s
+                ) as month_amount,
+                SUM(am.amount_total) as year_amount
+            FROM account_move am
+            JOIN res_partner rp ON am.partner_id = rp.id
+            WHERE am.move_type IN ('out_invoice', 'in_invoice')
+                AND am.payment_state = 'not_paid'
+                AND {}
+                AND am.company_id = ANY(%(company_id)s)
+                AND am.partner_id = rp.commercial_partner_id
+                AND am.invoice_date_due >= %(year_start)s AND am.invoice_date_due < %(next_year)s
+            GROUP BY am.move_type, rp.name, am.partner_id
+        """.format(am_states), params)
+        due_rows = self._cr.dictfetchall()
+
+        return {
+            'get_currency': self.get_currency(),
+            'get_income_this_month': income_this_month,
+            'get_today_income_expense': [
+                today_income['debit'] - today_income['credit'],
+                today_expense['debit'] - today_expense['credit'],
+            ],
+            'get_overdues_this_month_and_year': self._dashboard_top_partners(
+                due_rows, 'out_invoice', 'month_amount', 'due_partner', 'due_amount'),
+            'get_latebillss': self._dashboard_top_partners(
+                due_rows, 'in_invoice', 'year_amount', 'bill_partner', 'bill_amount'),
+            'get_total_invoice_current_month': self.get_total_invoice_current_month(*post),
+            'get_top_10_customers_month': self.get_top_10_customers_month(post[0], 'this_month'),
+            'bank_balance': self.bank_balance(*post),
+            'unreconcile_items_this_month': [{'count': unreconciled['this_month']}],
+            'unreconcile_items_this_year': [{'count': unreconciled['this_year']}],
+            'month_income_this_month': [pl_total('income', month_start, next_month)],
+            'month_income_this_year': [pl_total('income', year_start, next_year)],
+            'month_expense_this_month': [pl_total('expense', month_start, next_month)],
+            'month_expense_this_year': [pl_total('expense', year_start, next_year)],
+            'profit_income_this_month': pl_profit(month_start, next_month),
+            'profit_income_this_year': pl_profit(year_start, next_year),
+        }
+
+    @api.model
+    def _dashboard_top_partners(self, rows, move_type, amount_key, partner_key, total_key):
+        """Top 10 partners of the given rows, the 10th folded into "Others"
+        as get_overdues_this_month_and_year() does."""
+        record = sorted(
+            (row for row in rows if row['move_type'] == move_type and row[amount_key]),
+            key=lambda row: row[amount_key], reverse=True)[:10]
+        partners = [item['partner'] for item in record]
+        amounts = [item[amount_key] for item in record]
+        if len(record) > 9:
+            others = sum(amounts[9:])
+            amounts = amounts[:9]
+            amounts.append(others)
+            partners = partners[:9]
+            partners.append("Others")
+        return {
+            partner_key: partners,
+            total_key: amounts,
+            'result': []
+        }
+
+    @api.model
+    def populate_dashboard_benchmark(self, line_count, days=1095, batch_size=100000):
+        """Grow the database to about `line_count` journal items for
+        benchmark_dashboard_tiles(), by cloning the posted moves of the
+        current companies with SQL. Every clone gets all its dates shifted
+        so that its move date falls on a random day of the last `days` days.
+
+        Only meant for benchmark databases: the clones are not part of any
+        sequence, hash chain or reconciliation, and every batch of about
+        `batch_size` journal items is committed.
+
+        :return: number of journal items after the population
+        """
+        cr = self._cr
+        cr.execute("""
+            SELECT m.id, COUNT(l.id)
+            FROM account_move m
+            JOIN account_move_line l ON l.move_id = m.id
+            WHERE m.state = 'posted' AND m.company_id = ANY(%s)
+            GROUP BY m.id
+        """, [self.env.companies.ids])
+        templates = cr.fetchall()
+        if not templates:
+            raise UserError(_("Post some journal entries first, they are used as templates."))
+        template_ids = [move_id for move_id, _count in templates]
+        template_lines = sum(count for _move_id, count in templates)
+
+        def _columns(table, overrides):
+            # Every column of the table, dates shifted unless overridden
+            cr.execute("""
+                SELECT column_name, data_type FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = %s
+                ORDER BY ordinal_position
+            """, [table])
+            names, values = [], []
+            for name, data_type in cr.fetchall():
+                names.append('"%s"' % name)
+                if name in overrides:
+                    values.append(overrides[name])
+                elif data_type == 'date':
+                    values.append('src."%s" + map.delta' % name)
+                else:
+                    values.append('src."%s"' % name)
+            return ', '.join(names), ', '.join(values)
+
+        move_columns = _columns('account_move', {
+            'id': 'map.new_id',
+            'name': "src.name || '/' || map.new_id",
+            'inalterable_hash': 'NULL',
+        })
+        line_columns = _columns('account_move_line', {
+            'id': "nextval('account_move_line_id_seq')",
+            'move_id': 'map.new_id',
+            'full_reconcile_id': 'NULL',
+            'matching_number': 'NULL',
+        })
+
+        cr.execute("SELECT COUNT(*) FROM account_move_line")
+        current = cr.fetchone()[0]
+        copies_per_batch = max(1, batch_size // template_lines)
+        while current < line_count:
+            copies = min(copies_per_batch, -(-(line_count - current) // template_lines))
+            cr.execute("""
+                CREATE TEMP TABLE dashboard_benchmark_map ON COMMIT DROP AS
+                SELECT nextval('account_move_id_seq') AS new_id, m.id AS old_id,
+                       CURRENT_DATE - (random() * %(days)s)::int - m.date AS delta
+                FROM account_move m, generate_series(1, %(copies)s)
+                WHERE m.id = ANY(%(template_ids)s)
+            """, {'days': days, 'copies': copies, 'template_ids': template_ids})
+            cr.execute("INSERT INTO account_move (%s) SELECT %s FROM dashboard_benchmark_map map "
+                       "JOIN account_move src ON src.id = map.old_id" % move_columns)
+            cr.execute("INSERT INTO account_move_line (%s) SELECT %s FROM dashboard_benchmark_map map "
+                       "JOIN account_move_line src ON src.move_id = map.old_id" % line_columns)
+            current += cr.rowcount
+            cr.execute("DROP TABLE dashboard_benchmark_map")
+            cr.commit()
+            _logger.info("Dashboard benchmark: %s journal items", current)
+        cr.execute("ANALYZE account_move")
+        cr.execute("ANALYZE account_move_line")
+        self.env.invalidate_all()
+        return current
+
+    @api.model
+    def benchmark_dashboard_tiles(self, repeat=3):
+        """Time the dashboard tiles, e.g. from an odoo shell on databases
+        populated with 1M and 10M journal items by
+        populate_dashboard_benchmark():
+
+            env['account.move'].populate_dashboard_benchmark(1000000)
+            env['account.move'].benchmark_dashboard_tiles()
+
+        Logs and returns the best of `repeat` runs of each tile in ms,
+        along with the number of journal items it was measured on.
+        """
+        self._cr.execute("SELECT COUNT(*) FROM account_move_line")
+        line_count = self._cr.fetchone()[0]
+        company_id = self.get_current_company_value()
+        tiles = [
+            (method, lambda method=method, args=args: getattr(self, method)(*args))
+            for method, args in DASHBOARD_BENCHMARK_TILES
+        ]
+        tiles.append(('get_dashboard_data', lambda: self._compute_dashboard_data(company_id, True)))
+
+        timings = {}
+        for name, tile in tiles:
+            best = None
+            for _run in range(repeat):
+                start = time.perf_counter()
+                tile()
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = round(best, 1)
+            _logger.info("Dashboard tile %s: %.1f ms on %s journal items", name, best, line_count)
+        return {'line_count': line_count, 'timings': timings}
@@ -1178,16 +1178,18 @@ todayexpense: function(ev) {
                 if ($('#toggle-two')[0].checked == true) {
                     posted = "posted"
                 }
-                rpc.query({
+                var dashboard = rpc.query({
                     model: "account.move",
-                    method: "get_currency",
+                    method: "get_dashboard_data",
+                    args: [posted],
+                });
+                dashboard.then(function(data) {
+                    return data.get_currency;
                 }).then(function(result) {
                     currency = result;
                 })
-                rpc.query({
-                    model: "account.move",
-                    method: "get_income_this_month",
-                    args: [posted],
+                dashboard.then(function(data) {
+                    return data.get_income_this_month;
                 }).then(function(result) {
                     var ctx = document.getElementById("canvas").getContext('2d');
                     // Define the data
@@ -1246,10 +1248,8 @@ todayexpense: function(ev) {
                 })
                 // Today Income/Expense - NEW
 // Today Income/Expense - NEW
-rpc.query({
-    model: 'account.move',
-    method: 'get_today_income_expense',
-    args: [posted],
+dashboard.then(function(data) {
+    return data.get_today_income_expense;
 }).then(function(result) {
     var today_income = Math.abs(result[0]) || 0;
     var today_expense = Math.abs(result[1]) || 0;
@@ -1271,19 +1271,8 @@ rpc.query({
     $('#today_income_value').text(self.format_currency(currency, 0));
     $('#today_expense_value').text(self.format_currency(currency, 0));
 });
-                var arg = 'this_month';
-                rpc.query({
-                    model: 'account.move',
-                    method: 'get_overdues_this_month_and_year',
-                    args: [posted, arg],
-                }).then(function(result) {
-                    //
-                })
-                var arg = 'this_month';
-                rpc.query({
-                    model: 'account.move',
-                    method: 'get_overdues_this_month_and_year',
-                    args: [posted, arg],
+                dashboard.then(function(data) {
+                    return data.get_overdues_this_month_and_year;
                 }).then(function(result) {
                     // Doughnut Chart
                     $(document).ready(function() {
@@ -1335,10 +1324,8 @@ rpc.query({
                         });
                     });
                 })
-                rpc.query({
-                    model: "account.move",
-                    method: "get_total_invoice_current_month",
-                    args: [posted],
+                dashboard.then(function(data) {
+                    return data.get_total_invoice_current_month;
                 }).then(function(result) {
                     $('#total_supplier_invoice_paid').hide();
                     $('#total_supplier_invoice').hide();
@@ -1400,11 +1387,8 @@ rpc.query({
                     $('#total_supplier_invoice_paid_current_month').append('<div" class="logo">' + '<span>' + supplier_invoice_paid_current_month + '</span><span>Total Paid<span></div>');
                     $('#total_supplier_invoice_current_month').append('<div" class="logo">' + '<span>' + supplier_invoice_total_current_month + '</span><span>Total Invoice<span></div>');
                 })
-                var arg = 'last_month'
-                rpc.query({
-                    model: 'account.move',
-                    method: 'get_latebillss',
-                    args: [posted, arg],
+                dashboard.then(function(data) {
+                    return data.get_latebillss;
                 }).then(function(result) {
                     $(document).ready(function() {
                         var options = {
@@ -1455,23 +1439,8 @@ rpc.query({
                         });
                     });
                 })
-                rpc.query({
-                    model: "account.move",
-                    method: "get_overdues",
-                }).then(function(result) {
-                    var due_count = 0;
-                    _.forEach(result, function(x) {
-                        due_count++;
-                        $('#overdues').append('<li><a class="overdue_line_cust" href="#" id="line_' + x.parent + '" data-user-id="' + x.parent + '">' + x.due_partner + '</a>' + '&nbsp;&nbsp;&nbsp;&nbsp;' + '<span>' + x.due_amount + ' ' + currency + '</span>' + '</li>');
-                        //$('#overdues_amounts').append('<li><a class="overdue_line_cust" href="#" id="line_' + x.parent + '" data-user-id="' + x.parent + '">' + x.amount + '</a>' + '<span>'+' '+currency+ '</span>' + '</li>' );
-                    });
-                    $('#due_count').append('<span class="badge badge-danger">' + due_count + ' Due(s)</span>');
-                })
-                var f = 'this_month'
-                rpc.query({
-                    model: "account.move",
-                    method: "get_top_10_customers_month",
-                    args: [posted, f]
+                dashboard.then(function(data) {
+                    return data.get_top_10_customers_month;
                 }).then(function(result) {
                     var due_count = 0;
                     var amount;
@@ -1494,10 +1463,8 @@ rpc.query({
                         });
                     });
                 })
-                rpc.query({
-                    model: "account.move",
-                    method: "bank_balance",
-                    args: [posted]
+                dashboard.then(function(data) {
+                    return data.bank_balance;
                 })
                 .then(function(result) {
                     var banks = result['banks'];
@@ -1525,66 +1492,16 @@ rpc.query({
                         });
                     }
                 })
-                rpc.query({
-                    model: "account.move",
-                    method: "get_latebills",
-                }).then(function(result) {
-                    var late_count = 0;
-                    _.forEach(result, function(x) {
-                        late_count++;
-                        $('#latebills').append('<li><a class="overdue_line_cust" href="#" id="line_' + x.parent + '" data-user-id="' + x.parent + '">' + x.partner + '<span>' + x.amount + ' ' + currency + '</span>' + '</a>' + '</li>');
-                    });
-                    $('#late_count').append('<span class="badge badge-danger">' + late_count + ' Late(s)</span>');
-                })
-                rpc.query({
-                    model: "account.move",
-                    method: "get_total_invoice",
-                }).then(function(result) {
-                    var total_invoice = result[0].sum;
-                    total_invoice = total_invoice
-                    $('#total_invoice').append('<span>' + total_invoice + ' ' + currency + '</span> ')
-                })
-                rpc.query({
-                    model: "account.move",
-                    method: "get_total_invoice_this_month",
-                    args: [posted],
-                }).then(function(result) {
-                    var invoice_this_month = result[0].sum;
-                    if (invoice_this_month) {
-                        var total_invoices_this_month = invoice_this_month.toFixed(2)
-                        $('#total_invoices_').append('<span>' + total_invoices_this_month + ' ' + currency + '</span> <div class="title">This month</div>')
-                    }
-                })
-
-                rpc.query({
-                    model: "account.move",
-                    method: "get_total_invoice_last_month",
-                }).then(function(result) {
-                    var invoice_last_month = result[0].sum;
-                    var total_invoices_last_month = invoice_last_month
-                    $('#total_invoices_last').append('<span>' + total_invoices_last_month + ' ' + currency + '</span><div class="title">Last month</div>')
-                })
 
-                rpc.query({
-                    model: "account.move",
-                    method: "unreconcile_items"
-                }).then(function(result) {
-                    var unreconciled_count = result[0].count;
-                    $('#unreconciled_items').append('<span>' + unreconciled_count + ' Item(s)</a></span> ')
-                })
-                rpc.query({
-                    model: "account.move",
-                    method: "unreconcile_items_this_month",
-                    args: [posted],
+                dashboard.then(function(data) {
+                    return data.unreconcile_items_this_month;
                 }).then(function(result) {
                     var unreconciled_counts_ = result[0].count;
                     $('#unreconciled_items_').empty()
                     $('#unreconciled_items_').append('<span>' + unreconciled_counts_ + ' Item(s)</span><div class="title">This month</div>')
                 })
-                rpc.query({
-                    model: "account.move",
-                    method: "unreconcile_items_this_year",
-                    args: [posted],
+                dashboard.then(function(data) {
+                    return data.unreconcile_items_this_year;
                 })
                 .then(function(result) {
                     var unreconciled_counts_this_year = result[0].count;
@@ -1593,27 +1510,8 @@ rpc.query({
                     //$('#unreconciled_counts_this_year').append('<span style= "color:#455e7b;">' + unreconciled_counts_this_year + ' Item(s)</span><div class="title">This Year</div>')
                 })
 
-                rpc.query({
-                    model: "account.move",
-                    method: "unreconcile_items_last_year"
-                }).then(function(result) {
-                    var unreconciled_counts_last_year = result[0].count;
-                    $('#unreconciled_counts_last_year').empty()
-                    $('#unreconciled_counts_last_year').append('<span>' + unreconciled_counts_last_year + '  Item(s)</span><div class="title">Last Year</div>')
-                })
-                rpc.query({
-                    model: "account.move",
-                    method: "month_income"
-                }).then(function(result) {
-                    var income = result[0].debit - result[0].credit;
-                    income = -income;
-                    income = self.format_currency(currency, income);
-                    $('#total_income').append('<span>' + income + '</span>')
-                })
-                rpc.query({
-                    model: "account.move",
-                    method: "month_income_this_month",
-                    args: [posted],
+                dashboard.then(function(data) {
+                    return data.month_income_this_month;
                 }).then(function(result) {
                     var incomes_ = result[0].debit - result[0].credit;
                     if (incomes_) {
@@ -1629,29 +1527,8 @@ rpc.query({
                     }
                 })
 
-                rpc.query({
-                    model: "account.move",
-                    method: "month_income_last_month"
-                }).then(function(result) {
-                    var incomes_last = result[0].debit - result[0].credit;
-                    incomes_last = -incomes_last;
-                    incomes_last = self.format_currency(currency, incomes_last);
-                    $('#total_incomes_last').append('<span>' + incomes_last + '</span><div class="title">Last month</div>')
-                })
-
-                rpc.query({
-                    model: "account.move",
-                    method: "month_expense"
-                }).then(function(result) {
-                    var expense = result[0].debit - result[0].credit;
-                    var expenses = expense;
-                    expenses = self.format_currency(currency, expenses);
-                    $('#total_expense').append('<span>' + expenses + '</span>')
-                })
-                rpc.query({
-                    model: "account.move",
-                    method: "month_expense_this_month",
-                    args: [posted],
+                dashboard.then(function(data) {
+                    return data.month_expense_this_month;
                 }).then(function(result) {
                     var expense_this_month = result[0].debit - result[0].credit;
                     if (expense_this_month) {
@@ -1666,10 +1543,8 @@ rpc.query({
                         $('#total_expenses_').append('<span>' + expenses_this_month_ + '</span><div class="title">This month</div>')
                     }
                 })
-                rpc.query({
-                    model: "account.move",
-                    method: "month_expense_this_year",
-                    args: [posted],
+                dashboard.then(function(data) {
+                    return data.month_expense_this_year;
                 }).then(function(result) {
                     var expense_this_year = result[0].debit - result[0].credit;
                     if (expense_this_year) {
@@ -1684,20 +1559,8 @@ rpc.query({
                         $('#total_expense_this_year').append('<span >' + expenses_this_year_ + '</span><div class="title">This Year</div>')
                     }
                 })
-                rpc.query({
-                    model: "account.move",
-                    method: "month_income_last_year"
-                }).then(function(result) {
-                    var incomes_last_year = result[0].debit - result[0].credit;
-                    incomes_last_year = -incomes_last_year
-                    incomes_last_year = self.format_currency(currency, incomes_last_year);
-                    $('#total_incomes_last_year').empty();
-                    $('#total_incomes_last_year').append('<span>' + incomes_last_year + '</span><div class="title">Last Year</div>')
-                })
-                rpc.query({
-                    model: "account.move",
-                    method: "month_income_this_year",
-                    args: [posted],
+                dashboard.then(function(data) {
+                    return data.month_income_this_year;
                 }).then(function(result) {
                     var incomes_this_year = result[0].debit - result[0].credit;
                     if (incomes_this_year) {
@@ -1713,10 +1576,8 @@ rpc.query({
                     }
                 })
 
-                rpc.query({
-                    model: "account.move",
-                    method: "profit_income_this_month",
-                    args: [posted],
+                dashboard.then(function(data) {
+                    return data.profit_income_this_month;
                 }).then(function(result) {
                     var net_profit = true
                     if (result[1] == undefined) {
@@ -1751,10 +1612,8 @@ rpc.query({
                     }
                 })
 
-                rpc.query({
-                    model: "account.move",
-                    method: "profit_income_this_year",
-                    args: [posted],
+                dashboard.then(function(data) {
+                    return data.profit_income_this_year;
                 }).then(function(result) {
                     var net_profit = true
                     if (result[1] == undefined) {
@@ -1,3 +1,5 @@
 from . import bills_approval
 from . import payment_advice
-from . import account_payment
\ No newline at end of file
+from . import account_payment
+from . import partner_balance
+from . import account_move
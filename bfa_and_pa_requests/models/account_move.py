@@ -0,0 +1,21 @@
+from odoo import models
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def write(self, vals):
+        if 'state' not in vals:
+            return super(AccountMove, self).write(vals)
+        was_posted = self.filtered(lambda move: move.state == 'posted')
+        if vals['state'] != 'posted':
+            self.env['payment.advice.partner.balance']._apply_move_delta(was_posted.ids, -1)
+        res = super(AccountMove, self).write(vals)
+        if vals['state'] == 'posted':
+            self.env['payment.advice.partner.balance']._apply_move_delta((self - was_posted).ids, 1)
+        return res
+
+    def unlink(self):
+        self.env['payment.advice.partner.balance']._apply_move_delta(
+            self.filtered(lambda move: move.state == 'posted').ids, -1)
+        return super(AccountMove, self).unlink()
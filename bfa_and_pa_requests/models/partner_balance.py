@@ -0,0 +1,113 @@
+import logging
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+BALANCE_INVOICE_TYPES = ('in_invoice', 'out_invoice')
+
+
+class PaymentAdvicePartnerBalance(models.Model):
+    """Posted invoice and payment totals of each partner, per company.
+
+    Kept in sync with signed deltas when a move enters or leaves the posted
+    state, posted moves can no longer change their amounts or partner.
+    """
+    _name = 'payment.advice.partner.balance'
+    _description = 'Payment advice partner balance'
+    _rec_name = 'partner_id'
+
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True, ondelete='cascade')
+    partner_id = fields.Many2one('res.partner', string='Partner', required=True, readonly=True, ondelete='cascade')
+    invoice_total = fields.Float(string='Invoice Total', readonly=True)
+    payment_total = fields.Float(string='Payment Total', readonly=True)
+
+    _sql_constraints = [
+        ('company_partner_uniq', 'unique(company_id, partner_id)', 'Only one balance per partner and company is allowed.'),
+    ]
+
+    def init(self):
+        # Balances used to be kept per partner only
+        self.env.cr.execute("""
+            ALTER TABLE payment_advice_partner_balance
+            DROP CONSTRAINT IF EXISTS payment_advice_partner_balance_partner_uniq
+        """)
+        self.env.cr.execute("""
+            SELECT 1 FROM payment_advice_partner_balance
+            HAVING COUNT(*) = 0 OR BOOL_OR(company_id IS NULL)
+        """)
+        if self.env.cr.fetchone():
+            self.rebuild_balances()
+
+    _delta_query = """
+        SELECT m.company_id, m.partner_id,
+               COALESCE(SUM(m.amount_total_signed) FILTER (WHERE m.move_type IN %(invoice_types)s), 0),
+               COALESCE(SUM(CASE p.payment_type WHEN 'inbound' THEN p.amount
+                                                WHEN 'outbound' THEN -p.amount END), 0)
+        FROM account_move m
+        LEFT JOIN account_payment p ON p.move_id = m.id AND p.payment_type IN ('inbound', 'outbound')
+        WHERE m.partner_id IS NOT NULL AND ({where})
+          AND (m.move_type IN %(invoice_types)s OR p.id IS NOT NULL)
+        GROUP BY m.company_id, m.partner_id
+    """
+
+    @api.model
+    def _apply_move_delta(self, move_ids, sign):
+        """Add (sign=1) or remove (sign=-1) the given moves from the balances."""
+        if not move_ids:
+            return
+        self.env['account.move'].flush_model(['company_id', 'partner_id', 'move_type', 'amount_total_signed'])
+        self.env['account.payment'].flush_model(['move_id', 'payment_type', 'amount'])
+        self.env.cr.execute("""
+            INSERT INTO payment_advice_partner_balance
+                (company_id, partner_id, invoice_total, payment_total, create_uid, create_date, write_uid, write_date)
+            SELECT delta.company_id, delta.partner_id, %(sign)s * delta.invoice_total, %(sign)s * delta.payment_total,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM (""" + self._delta_query.format(where="m.id IN %(move_ids)s") + """
+            ) delta (company_id, partner_id, invoice_total, payment_total)
+            ON CONFLICT (company_id, partner_id) DO UPDATE SET
+                invoice_total = payment_advice_partner_balance.invoice_total + EXCLUDED.invoice_total,
+                payment_total = payment_advice_partner_balance.payment_total + EXCLUDED.payment_total,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, {
+            'sign': sign,
+            'uid': self.env.uid,
+            'move_ids': tuple(move_ids),
+            'invoice_types': BALANCE_INVOICE_TYPES,
+        })
+        self.invalidate_model()
+
+    @api.model
+    def rebuild_balances(self):
+        """Recompute all the balances from the posted invoices and payments."""
+        self.env['account.move'].flush_model()
+        self.env['account.payment'].flush_model()
+        self.env.cr.execute("DELETE FROM payment_advice_partner_balance")
+        self.env.cr.execute("""
+            INSERT INTO payment_advice_partner_balance
+                (company_id, partner_id, invoice_total, payment_total, create_uid, create_date, write_uid, write_date)
+            SELECT delta.company_id, delta.partner_id, delta.invoice_total, delta.payment_total,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM (""" + self._delta_query.format(where="m.state = 'posted'") + """
+            ) delta (company_id, partner_id, invoice_total, payment_total)
+        """, {'uid': self.env.uid, 'invoice_types': BALANCE_INVOICE_TYPES})
+        _logger.info("Rebuilt %s partner balances", self.env.cr.rowcount)
+        self.invalidate_model()
+        return True
+
+    @api.model
+    def _get_balances(self, company_partner_ids):
+        """:param company_partner_ids: (company_id, partner_id) pairs
+        :return: {(company_id, partner_id): invoice total - payment total} of the posted moves"""
+        company_partner_ids = [ids for ids in set(company_partner_ids) if all(ids)]
+        if not company_partner_ids:
+            return {}
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT b.company_id, b.partner_id, b.invoice_total - b.payment_total
+            FROM payment_advice_partner_balance b
+            JOIN unnest(%s::int[], %s::int[]) AS pair (company_id, partner_id)
+                ON pair.company_id = b.company_id AND pair.partner_id = b.partner_id
+        """, ([ids[0] for ids in company_partner_ids], [ids[1] for ids in company_partner_ids]))
+        return {(company_id, partner_id): balance for company_id, partner_id, balance in self.env.cr.fetchall()}
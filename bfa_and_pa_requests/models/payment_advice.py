@@ -95,6 +95,8 @@ class PaymentAdvice(models.Model):
     balance_amount = fields.Float(string='Balance Amount', tracking=True)
     partner_balance_amount = fields.Float(string='Partner Balance Amount', compute='_compute_partner_balance_amount',
                                           store=True, states=READONLY_STATES)
+    vendor_balance_amount = fields.Float(string='Vendor Balance', compute='_compute_balance',
+                                         help='Posted invoices minus posted payments of the vendor in this company.')
     payment_id = fields.Many2one('account.payment', string='Payment Id')
     approval_level_1 = fields.Many2one('res.users', string='Approver Level 1', domain="[('share', '=', False)]",
                                        default=_get_default_user_id,readonly=True, tracking=True)
@@ -173,41 +175,13 @@ class PaymentAdvice(models.Model):
     #     for record in self:
     #         record.balance_amount = record.reference_amount - record.approve_amount
 
-    @api.depends('partner_id')
+    @api.depends('partner_id', 'company_id')
     def _compute_balance(self):
-        for line in self:
-            if line.partner_id:
-                balance = line._compute_vendor_balance()
-                line.balance_amount = balance
-            else:
-                line.balance_amount = 0.0
-
-    def _compute_vendor_balance(self):
-        invoice_total = self._get_invoice_total()
-        payment_total = self._get_payment_total()
-        return invoice_total - payment_total
-
-    def _get_invoice_total(self):
-        invoices = self.env['account.move'].search([
-            ('partner_id', '=', self.partner_id.id),
-            ('move_type', 'in', ['in_invoice', 'out_invoice']),
-            ('state', '=', 'posted'),
-        ])
-        return sum(invoice.amount_total_signed for invoice in invoices)
-
-    def _get_payment_total(self):
-        payments = self.env['account.payment'].search([
-            ('partner_id', '=', self.partner_id.id),
-            ('payment_type', 'in', ['inbound', 'outbound']),
-            ('state', '=', 'posted'),
-        ])
-        payment_total = 0
-        for payment in payments:
-            if payment.payment_type == 'inbound':
-                payment_total += payment.amount
-            elif payment.payment_type == 'outbound':
-                payment_total -= payment.amount
-        return payment_total
+        # One query on the materialized balances for the whole recordset
+        balances = self.env['payment.advice.partner.balance']._get_balances(
+            [(record.company_id.id, record.partner_id.id) for record in self])
+        for record in self:
+            record.vendor_balance_amount = balances.get((record.company_id.id, record.partner_id.id), 0.0)
 
     # @api.onchange('partner_id')
     # def _onchange_partner_id(self):
@@ -772,7 +746,7 @@ class PaymentAdviceLine(models.Model):
     _description = 'Payment advice lines'
 
     advice_id = fields.Many2one('payment.advice', string='Advice Id')
-    reference = fields.Char(string='Bill Reference')
+    reference = fields.Char(string='Bill Reference', index=True)
     number = fields.Char(string='Bill Number')
     reference_amount = fields.Float('Total Project Cost')
     date = fields.Datetime(string='Reference Date')
@@ -794,6 +768,22 @@ class PaymentAdviceLine(models.Model):
             approve = line.approve_amount or 0.0
             line.balance_amount = max(0.0, total - (past + approve))
 
+    @api.model
+    def _get_reference_balances(self, references):
+        """:return: {reference: highest reference amount - received amount} of the
+        advice lines of the given references, in one grouped query."""
+        references = [reference for reference in set(references) if reference]
+        if not references:
+            return {}
+        groups = self.read_group(
+            [('reference', 'in', references)],
+            ['reference', 'reference_amount:max', 'rec_amount:sum'],
+            ['reference'], lazy=False)
+        return {
+            group['reference']: (group['reference_amount'] or 0.0) - (group['rec_amount'] or 0.0)
+            for group in groups
+        }
+
     # @api.onchange('approve_amount')
     # def _onchange_approve_amount(self):
     #     for line in self:
@@ -0,0 +1,94 @@
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestPartnerBalance(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.balance_model = cls.env['payment.advice.partner.balance']
+
+    def _get_table(self):
+        self.balance_model.flush_model()
+        self.env.cr.execute("""
+            SELECT company_id, partner_id, invoice_total, payment_total
+            FROM payment_advice_partner_balance
+            WHERE invoice_total != 0 OR payment_total != 0
+        """)
+        return {(row[0], row[1]): (round(row[2], 2), round(row[3], 2)) for row in self.env.cr.fetchall()}
+
+    def _create_payment(self, amount, payment_type='outbound', company_data=None):
+        company_data = company_data or self.company_data
+        return self.env['account.payment'].with_company(company_data['company']).create({
+            'payment_type': payment_type,
+            'partner_type': 'supplier',
+            'partner_id': self.partner_a.id,
+            'amount': amount,
+            'journal_id': company_data['default_journal_bank'].id,
+        })
+
+    def test_maintained_balances_match_rebuild(self):
+        """The incremental balances always equal a full rebuild."""
+        bill = self.init_invoice('in_invoice', partner=self.partner_a, amounts=[1000.0], post=True)
+        invoice = self.init_invoice('out_invoice', partner=self.partner_a, amounts=[300.0], post=True)
+        other_company_bill = self.init_invoice('in_invoice', partner=self.partner_a, amounts=[50.0],
+                                               company=self.company_data_2['company'], post=True)
+        payment = self._create_payment(400.0)
+        payment.action_post()
+        other_company_payment = self._create_payment(20.0, company_data=self.company_data_2)
+        other_company_payment.action_post()
+
+        # Cancel, reset to draft and post again, unlink
+        invoice.button_draft()
+        invoice.button_cancel()
+        bill.button_draft()
+        bill.action_post()
+        payment.action_draft()
+        payment.action_cancel()
+        refund_payment = self._create_payment(25.0, payment_type='inbound')
+        refund_payment.action_post()
+        other_company_bill.button_draft()
+        other_company_bill.unlink()
+
+        maintained = self._get_table()
+        self.balance_model.rebuild_balances()
+        self.assertEqual(maintained, self._get_table())
+
+        company = self.company_data['company']
+        advices = self.env['payment.advice'].new({'partner_id': self.partner_a.id, 'company_id': company.id}) | \
+            self.env['payment.advice'].new({'partner_id': self.partner_a.id,
+                                            'company_id': self.company_data_2['company'].id})
+        self.assertRecordValues(advices, [
+            {'vendor_balance_amount': bill.amount_total_signed - 25.0},
+            {'vendor_balance_amount': 20.0},
+        ])
+
+    def test_reference_balances(self):
+        """Same balances as the former per-record max and sum of the advice lines."""
+        line_model = self.env['payment.advice.line']
+        line_model.create([
+            {'reference': 'SO/TEST/001', 'reference_amount': 1000.0, 'rec_amount': 200.0},
+            {'reference': 'SO/TEST/001', 'reference_amount': 1200.0, 'rec_amount': 300.0},
+            {'reference': 'SO/TEST/001', 'reference_amount': 0.0, 'rec_amount': 50.0},
+            {'reference': 'BILL/TEST/002', 'reference_amount': 500.0, 'rec_amount': 0.0},
+            {'reference': 'BILL/TEST/003', 'reference_amount': 0.0, 'rec_amount': 75.0},
+        ])
+        references = ['SO/TEST/001', 'BILL/TEST/002', 'BILL/TEST/003', 'BILL/TEST/004']
+        balances = line_model._get_reference_balances(references)
+
+        for reference in references:
+            lines = line_model.search([('reference', '=', reference)])
+            if not lines:
+                self.assertNotIn(reference, balances)
+                continue
+            # service.completion _compute_balance_amount
+            self.assertAlmostEqual(
+                balances[reference],
+                max(line.reference_amount for line in lines) - sum(line.rec_amount for line in lines))
+            # account.move _compute_balance_amount
+            self.assertAlmostEqual(
+                balances[reference],
+                max((line.reference_amount for line in lines if line.reference_amount), default=0.0)
+                - sum(line.rec_amount or 0.0 for line in lines))
@@ -159,69 +159,70 @@ class stock_quant(models.Model):
 
     @api.model
     def sync_product(self, prd_id):
-        notifications = []
+        return self.sync_products([prd_id])
+
+    @api.model
+    def sync_products(self, prd_ids):
+        """Push the current stock of the products to the open POS sessions,
+        in one notification per POS config."""
         ssn_obj = self.env['pos.session'].sudo()
         prod_fields = ssn_obj._loader_params_product_product()['search_params']['fields']
         prod_obj = self.env['product.product'].sudo()
 
-        product = prod_obj.with_context(display_default_code=False).search_read([('id', '=', prd_id)], prod_fields)
-        product_id = prod_obj.browse(prd_id)
-
-        if not product_id.exists():
-            _logger.error(f"Product ID {prd_id} not found in product.product")
-            raise ValueError(f"Product ID {prd_id} not found in product.product")
-
-        res = product_id._compute_quantities_dict(
-            self._context.get('lot_id'),
-            self._context.get('owner_id'),
-            self._context.get('package_id'),
-            self._context.get('from_date'),
-            self._context.get('to_date')
-        )
-
-        if product_id.id not in res:
-            _logger.error(f"Product ID {product_id.id} not found in quantities dictionary: {res}")
-            raise KeyError(f"Product ID {product_id.id} not found in quantities dictionary")
+        products = prod_obj.with_context(display_default_code=False).search_read([('id', 'in', list(prd_ids))], prod_fields)
+        if not products:
+            return True
 
-        if product:
-            product[0]['qty_available'] = res[product_id.id]['qty_available']
-
-            categories = ssn_obj._get_pos_ui_product_category(ssn_obj._loader_params_product_category())
-            product_category_by_id = {category['id']: category for category in categories}
-
-            if product[0]['categ_id'][0] not in product_category_by_id:
-                _logger.error(f"Category ID {product[0]['categ_id'][0]} not found in product categories")
-                raise KeyError(f"Category ID {product[0]['categ_id'][0]} not found in product categories")
-
-            product[0]['categ'] = product_category_by_id[product[0]['categ_id'][0]]
+        res = prod_obj.browse([product['id'] for product in products])._compute_quantities_dict(False, False, False)
+        categories = ssn_obj._get_pos_ui_product_category(ssn_obj._loader_params_product_category())
+        product_category_by_id = {category['id']: category for category in categories}
+        for product in products:
+            product['qty_available'] = res[product['id']]['qty_available']
+            if product['categ_id'] and product['categ_id'][0] in product_category_by_id:
+                product['categ'] = product_category_by_id[product['categ_id'][0]]
+            else:
+                _logger.warning("Category of product %s not loaded in the POS", product['id'])
 
-            vals = {
-                'id': [product[0].get('id')],
-                'product': product,
-                'access': 'pos.sync.product',
-            }
+        vals = {
+            'id': [product['id'] for product in products],
+            'product': products,
+            'access': 'pos.sync.product',
+        }
+        notifications = []
+        sessions = ssn_obj.search([('state', '=', 'opened')])
+        for config in sessions.config_id:
+            config_sessions = sessions.filtered(lambda session: session.config_id == config)
+            for partner in config_sessions.user_id.partner_id:
+                notifications.append([partner, 'product.product/sync_data', dict(vals, config_id=config.id)])
+        if not notifications:
             notifications.append([self.env.user.partner_id, 'product.product/sync_data', vals])
-
-        if notifications:
-            self.env['bus.bus']._sendmany(notifications)
-
+        self.env['bus.bus']._sendmany(notifications)
         return True
 
-    @api.model
-    def create(self, vals):
-        res = super(stock_quant, self).create(vals)
-
-        notifications = []
-
-        for rec in res:
-            rec.sync_product(rec.product_id.id)
+    def _schedule_pos_sync(self):
+        """Collect the moved products of the transaction, they are pushed to the
+        POS together right before the commit."""
+        data = self.env.cr.precommit.data
+        if 'bi_pos_stock.sync_product_ids' not in data:
+            data['bi_pos_stock.sync_product_ids'] = set()
+            self.env.cr.precommit.add(self._flush_pos_sync)
+        data['bi_pos_stock.sync_product_ids'].update(self.product_id.ids)
+
+    def _flush_pos_sync(self):
+        product_ids = self.env.cr.precommit.data.pop('bi_pos_stock.sync_product_ids', set())
+        if product_ids:
+            self.sync_products(product_ids)
+            self.env['bus.bus'].flush_model()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super(stock_quant, self).create(vals_list)
+        res._schedule_pos_sync()
         return res
 
     def write(self, vals):
         res = super(stock_quant, self).write(vals)
-        notifications = []
-        for rec in self:
-            rec.sync_product(rec.product_id.id)
+        self._schedule_pos_sync()
         return res
 
 
@@ -232,30 +233,49 @@ class ProductInherit(models.Model):
 
 
     def get_low_stock_products(self,low_stock):
-        products=self.search([('detailed_type', '=' ,'product')]);
-        product_list=[]
-        for product in products:
-            if product.qty_available <= low_stock:
-                product_list.append(product.id)
-        return product_list
+        """Storable products whose quantity in the internal locations of the
+        allowed companies is at most low_stock."""
+        self.env['stock.quant'].flush_model(['product_id', 'location_id', 'company_id', 'quantity'])
+        self.flush_model(['active', 'product_tmpl_id'])
+        self.env['product.template'].flush_model(['active', 'detailed_type', 'company_id'])
+        company_ids = tuple(self.env.companies.ids)
+        self.env.cr.execute("""
+            SELECT p.id
+            FROM product_product p
+            JOIN product_template t ON t.id = p.product_tmpl_id
+            LEFT JOIN (
+                SELECT q.product_id, SUM(q.quantity) AS qty
+                FROM stock_quant q
+                JOIN stock_location l ON l.id = q.location_id
+                WHERE l.usage = 'internal' AND q.company_id IN %(company_ids)s
+                GROUP BY q.product_id
+            ) stock ON stock.product_id = p.id
+            WHERE t.detailed_type = 'product' AND p.active AND t.active
+              AND (t.company_id IS NULL OR t.company_id IN %(company_ids)s)
+              AND COALESCE(stock.qty, 0) <= %(low_stock)s
+            ORDER BY p.id
+        """, {'company_ids': company_ids, 'low_stock': low_stock or 0.0})
+        return [row[0] for row in self.env.cr.fetchall()]
+
     @api.depends('stock_quant_ids', 'stock_quant_ids.product_id', 'stock_quant_ids.location_id',
                  'stock_quant_ids.quantity')
     def _compute_avail_locations(self):
-        notifications = []
+        quants_by_product = defaultdict(dict)
+        products = self.filtered(lambda rec: rec.type == 'product' and rec.id)
+        if products:
+            self.env['stock.quant'].flush_model(['product_id', 'location_id', 'quantity'])
+            self.env.cr.execute("""
+                SELECT q.product_id, q.location_id, SUM(q.quantity)
+                FROM stock_quant q
+                JOIN stock_location l ON l.id = q.location_id
+                WHERE l.usage = 'internal' AND q.product_id IN %s
+                GROUP BY q.product_id, q.location_id
+                ORDER BY q.product_id, q.location_id
+            """, (tuple(products.ids),))
+            for product_id, location_id, quantity in self.env.cr.fetchall():
+                quants_by_product[product_id][location_id] = [quantity, 0, 0]
         for rec in self:
-            final_data = {}
-            rec.quant_text = json.dumps(final_data)
-            if rec.type == 'product':
-                quants = self.env['stock.quant'].sudo().search(
-                    [('product_id', 'in', rec.ids), ('location_id.usage', '=', 'internal')])
-                for quant in quants:
-                    loc = quant.location_id.id
-                    if loc in final_data:
-                        last_qty = final_data[loc][0]
-                        final_data[loc][0] = last_qty + quant.quantity
-                    else:
-                        final_data[loc] = [quant.quantity, 0, 0]
-                rec.quant_text = json.dumps(final_data)
+            rec.quant_text = json.dumps(quants_by_product.get(rec.id, {}))
         return True
 
 
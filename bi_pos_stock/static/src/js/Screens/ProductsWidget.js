@@ -123,25 +123,29 @@ odoo.define('bi_pos_stock.ProductsWidget', function(require) {
 				notifications.forEach(function (ntf) {
 					ntf = JSON.parse(JSON.stringify(ntf))
 					if(ntf && ntf.type && ntf.type == "product.product/sync_data"){
-						let prod = ntf.payload.product[0];
-						let old_category_id = self.env.pos.db.product_by_id[prod.id];
-						let new_category_id = prod.pos_categ_id[0];
-						let stored_categories = self.env.pos.db.product_by_category_id;
+						if(ntf.payload.config_id && ntf.payload.config_id != self.env.pos.config.id){
+							return;
+						}
+						ntf.payload.product.forEach(function (prod) {
+							let old_category_id = self.env.pos.db.product_by_id[prod.id];
+							let new_category_id = prod.pos_categ_id[0];
+							let stored_categories = self.env.pos.db.product_by_category_id;
 
-						prod.pos = self.env.pos;
-						if(self.env.pos.db.product_by_id[prod.id]){
-							if(old_category_id.pos_categ_id){
-								stored_categories[old_category_id.pos_categ_id[0]] = stored_categories[old_category_id.pos_categ_id[0]].filter(function(item) {
-									return item != prod.id;
-								});
-							}
-							if(stored_categories[new_category_id]){
-								stored_categories[new_category_id].push(prod.id);
+							prod.pos = self.env.pos;
+							if(self.env.pos.db.product_by_id[prod.id]){
+								if(old_category_id.pos_categ_id){
+									stored_categories[old_category_id.pos_categ_id[0]] = stored_categories[old_category_id.pos_categ_id[0]].filter(function(item) {
+										return item != prod.id;
+									});
+								}
+								if(stored_categories[new_category_id]){
+									stored_categories[new_category_id].push(prod.id);
+								}
+								let updated_prod = self.updateProd(prod);
+							}else{
+								let updated_prod = self.updateProd(prod);
 							}
-							let updated_prod = self.updateProd(prod);
-						}else{
-							let updated_prod = self.updateProd(prod);
-						}
+						});
 					}
 				});
 				self.env.pos.is_sync = true;
@@ -1,6 +1,18 @@
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError, UserError
 
+# Number of paid invoices loaded at once in the manual reconciliation lines
+CANDIDATE_PAGE_SIZE = 500
+
+
+def write_grouped(model, values_by_id):
+    """Write {id: values} on model with one write per distinct values."""
+    ids_by_values = {}
+    for record_id, values in values_by_id.items():
+        ids_by_values.setdefault(tuple(sorted(values.items())), []).append(record_id)
+    for values, record_ids in ids_by_values.items():
+        model.browse(record_ids).write(dict(values))
+
 class AccountMove(models.Model):
     _inherit = 'account.move'
 
@@ -26,7 +38,48 @@ class AccountMove(models.Model):
             # Set the value of manual_reconcile_amount equal to amount_total_signed
             record.manual_reconcile_amount = record.amount_total_signed
 
-
-
-
-
+    @api.model
+    def _get_manual_reconcile_candidates(self, account_id, exclude_ids=None, limit=CANDIDATE_PAGE_SIZE):
+        """Paid customer invoices booked on account_id and not yet manually
+        reconciled, as values of the manual reconciliation lines.
+        Pages are taken in (date, id) order, skipping exclude_ids."""
+        self.flush_model(['move_type', 'payment_state', 'is_manual_reconcile', 'company_id', 'partner_id',
+                          'name', 'date', 'amount_total_signed', 'manual_reconcile_amount'])
+        self.env['account.move.line'].flush_model(['move_id', 'account_id'])
+        provider_reference = "NULL"
+        if 'transaction_ids' in self._fields:
+            self.env['payment.transaction'].flush_model(['provider_reference'])
+            # Same as transaction_ids[0]: transactions are ordered by id desc
+            provider_reference = """(
+                SELECT t.provider_reference
+                FROM account_invoice_transaction_rel rel
+                JOIN payment_transaction t ON t.id = rel.transaction_id
+                WHERE rel.invoice_id = m.id
+                ORDER BY t.id DESC
+                LIMIT 1
+            )"""
+        self.env.cr.execute("""
+            SELECT m.id, m.name, m.date, m.amount_total_signed, m.is_manual_reconcile,
+                   m.manual_reconcile_amount, COALESCE(p.name, '') AS customer_name,
+                   """ + provider_reference + """ AS provider_reference
+            FROM account_move m
+            LEFT JOIN res_partner p ON p.id = m.partner_id
+            WHERE m.move_type = 'out_invoice'
+              AND m.payment_state = 'paid'
+              AND NOT COALESCE(m.is_manual_reconcile, FALSE)
+              AND m.company_id IN %s
+              AND m.id != ALL(%s)
+              AND EXISTS (SELECT 1 FROM account_move_line l WHERE l.move_id = m.id AND l.account_id = %s)
+            ORDER BY m.date, m.id
+            LIMIT %s
+        """, (tuple(self.env.companies.ids), list(exclude_ids or []), account_id, limit))
+        return [{
+            'name': row['name'],
+            'date': row['date'],
+            'amount': row['amount_total_signed'],
+            'customer_name': row['customer_name'],
+            'is_manual_reconcile': row['is_manual_reconcile'],
+            'invoice_id': row['id'],
+            'provider_reference': row['provider_reference'] or False,
+            'manual_reconcile_amount': row['manual_reconcile_amount'],
+        } for row in self.env.cr.dictfetchall()]
@@ -1,6 +1,8 @@
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError, UserError
 
+from .account_move import write_grouped
+
 
 class LedgerPaymentBillWiseAdjustments(models.Model):
     _name = 'ledger.payment.bill.wise.adjustments'
@@ -158,37 +160,20 @@ class LedgerPaymentBillWiseAdjustments(models.Model):
         if not self.source_acc:
             return
 
-        customer_acc = self.source_acc.id
-        print("GGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGG", customer_acc)
-        res = self.env['res.partner'].search([('property_account_receivable_id.id', '=', customer_acc)])
-        print("GGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGG", res)
-
-        # Get only customer invoices (type='out_invoice')
-        customer_invoices = self.env['account.move'].search([
-            ('move_type', '=', 'out_invoice'),
-            ('payment_state', '=', 'paid'),
-            ('is_manual_reconcile', '=', False),
-            # ('partner_id.property_account_receivable_id','=',self.source_acc.id)
-        ], limit=200)
-
-        self.account_move_ids = customer_invoices
-        self.bank_manual_line_bwa_ids = [(5, 0, 0)]
-
-        bank_manual_values = []
-        for invoice in customer_invoices:
-            bank_manual_values.append((0, 0, {
-                'name': invoice.name,  # Invoice number
-                'date': invoice.date,
-                'amount': invoice.amount_total_signed,
-                'customer_name': invoice.partner_id.name if invoice.partner_id else '',
-                'is_manual_reconcile': invoice.is_manual_reconcile,
-                'invoice_id': invoice.id,
-                'provider_reference': invoice.transaction_ids and invoice.transaction_ids[
-                    0].provider_reference or False,
-                'manual_reconcile_amount': invoice.manual_reconcile_amount,
-            }))
+        # Get only paid customer invoices booked on the selected account
+        bank_manual_values = self.env['account.move']._get_manual_reconcile_candidates(self.source_acc.id)
 
-        self.bank_manual_line_bwa_ids = bank_manual_values
+        self.account_move_ids = self.env['account.move'].browse([vals['invoice_id'] for vals in bank_manual_values])
+        self.bank_manual_line_bwa_ids = [(5, 0, 0)] + [(0, 0, vals) for vals in bank_manual_values]
+
+    def action_load_more_invoices(self):
+        """Append the next page of paid invoices of the account to the lines."""
+        for rec in self:
+            bank_manual_values = self.env['account.move']._get_manual_reconcile_candidates(
+                rec.source_acc.id, exclude_ids=rec.bank_manual_line_bwa_ids.invoice_id.ids)
+            if bank_manual_values:
+                rec.write({'bank_manual_line_bwa_ids': [(0, 0, vals) for vals in bank_manual_values]})
+        return True
 
     def action_confirm(self):
         self.amount = self.jv_amount
@@ -280,9 +265,10 @@ class LedgerPaymentBillWiseAdjustments(models.Model):
             order.reconciled_amount = reconciled_amount
 
     def submit_reconciliation_records(self):
+        line_values = {}
+        invoice_values = {}
         for rec in self:
             # if rec.amount == rec.reconciled_amount:
-            print("kkkkkkkkkkkkkkkkkkkkkkkkkk", rec.amount, rec.jv_amount, rec.reconciled_amount)
             remaining_amount = rec.amount
 
             # Filter and sort bank_manual_line_ids
@@ -292,25 +278,27 @@ class LedgerPaymentBillWiseAdjustments(models.Model):
             false_lines = rec.bank_manual_line_bwa_ids.filtered(lambda l: not l.is_manual_reconcile)
             false_lines.unlink()
 
-            for line in sorted_lines:
-                invoice = line.invoice_id
-                line_manual_reconcile_amount = line.manual_reconcile_amount
-
-                if line.manual_reconcile_amount <= remaining_amount:
-                    line.manual_reconcile_amount = 0
-                    invoice.manual_reconcile_amount = 0
-                    invoice.is_manual_reconcile = True
+            # Allocate on plain values, lines and invoices are written in bulk below
+            for line_id, invoice_id, line_manual_reconcile_amount in zip(
+                    sorted_lines.ids, sorted_lines.mapped('invoice_id.id'), sorted_lines.mapped('manual_reconcile_amount')):
+                if line_manual_reconcile_amount <= remaining_amount:
+                    line_values[line_id] = {'manual_reconcile_amount': 0}
+                    invoice_values[invoice_id] = {'manual_reconcile_amount': 0, 'is_manual_reconcile': True}
                     remaining_amount -= line_manual_reconcile_amount
-                elif line.manual_reconcile_amount > remaining_amount:
-                    line.manual_reconcile_amount -= remaining_amount
-                    invoice.manual_reconcile_amount = line.manual_reconcile_amount
-                    invoice.is_manual_reconcile = False
-                    remaining_amount -= line.manual_reconcile_amount
-
-            # if rec.amount == rec.reconciled_amount:       
-            self.state = 'recocile'
-            # else:
-            #     raise ValidationError("Reconciled amount should match with the amount. Please check the reconciled amount.")
+                else:
+                    line_manual_reconcile_amount -= remaining_amount
+                    line_values[line_id] = {'manual_reconcile_amount': line_manual_reconcile_amount}
+                    invoice_values[invoice_id] = {'manual_reconcile_amount': line_manual_reconcile_amount,
+                                                  'is_manual_reconcile': False}
+                    remaining_amount -= line_manual_reconcile_amount
+
+        invoice_values.pop(False, None)
+        write_grouped(self.env['bank.account.manual.line.in.bwa'], line_values)
+        write_grouped(self.env['account.move'], invoice_values)
+        # if rec.amount == rec.reconciled_amount:
+        self.state = 'recocile'
+        # else:
+        #     raise ValidationError("Reconciled amount should match with the amount. Please check the reconciled amount.")
 
             # if line_manual_reconcile_amount <= remaining_amount:
             #     if line.commsn != 0:
@@ -53,6 +53,7 @@
     'auto_install': True,
 
     'data': ['security/ir.model.access.csv', 'data/ks_dfr_account_data.xml', 'data/ks_dynamic_financial_report.xml',
+             'data/ks_dfr_balance_cache_cron.xml',
              'security/ks_access_file.xml',
              'views/ks_mail_template.xml', 'views/ks_searchtemplate.xml', 'views/ks_base_template.xml',
              'views/ks_dfr_account_type.xml',
@@ -7,6 +7,10 @@ from odoo.http import serialize_exception as _serialize_exception
 from odoo.tools import html_escape
 
 import json
+import os
+
+# Size of the blocks sent to the client by the streaming exports
+STREAM_BLOCK_SIZE = 64 * 1024
 
 
 class ksDynamicFinancialReportController(http.Controller):
@@ -26,15 +30,27 @@ class ksDynamicFinancialReportController(http.Controller):
             if output_format == 'xlsx':
                 # self.ks_df_report_account_report_ids = self
                 # if self.id == self.env.ref('ks_dynamic_financial_reports.ks_df_tb0').id:
-                    response = request.make_response(
-                        None,
-                        headers=[
-                            ('Content-Type', ks_dynamic_report_model.ks_get_export_plotting_type('xlsx')),
-                            ('Content-Disposition', content_disposition(ks_dynamic_report_name + '.xlsx'))
-                        ]
-                    )
+                    ks_headers = [
+                        ('Content-Type', ks_dynamic_report_model.ks_get_export_plotting_type('xlsx')),
+                        ('Content-Disposition', content_disposition(ks_dynamic_report_name + '.xlsx'))
+                    ]
+                    response = request.make_response(None, headers=ks_headers)
                     if ks_dynamic_report_name == 'Trial Balance':
                         response.stream.write(ks_dynamic_report_instance.ks_get_xlsx_trial_balance(ks_df_informations))
+                    elif ks_dynamic_report_name == 'General Ledger' and \
+                            request.env['ir.config_parameter'].sudo().get_param('ks_stream_xlsx_export'):
+                        ks_path = ks_dynamic_report_instance.ks_get_xlsx_general_ledger_stream(ks_df_informations)
+                        try:
+                            response = request.make_response(
+                                self._ks_stream_file(ks_path),
+                                headers=ks_headers + [('Content-Length', str(os.path.getsize(ks_path)))]
+                            )
+                        except Exception:
+                            self._ks_remove_file(ks_path)
+                            raise
+                        # Called by the server once the response is sent or aborted, consumed or not
+                        response.call_on_close(lambda: self._ks_remove_file(ks_path))
+                        response.direct_passthrough = True
                     elif ks_dynamic_report_name == 'General Ledger':
                         response.stream.write(ks_dynamic_report_instance.ks_get_xlsx_general_ledger(ks_df_informations))
                     elif ks_dynamic_report_name == 'Partner Ledger':
@@ -59,3 +75,21 @@ class ksDynamicFinancialReportController(http.Controller):
                 'data': se
             }
             return request.make_response(html_escape(json.dumps(error)))
+
+    @staticmethod
+    def _ks_stream_file(path):
+        """ Yields the content of a temporary export file. """
+        with open(path, 'rb') as ks_file:
+            while True:
+                ks_block = ks_file.read(STREAM_BLOCK_SIZE)
+                if not ks_block:
+                    break
+                yield ks_block
+
+    @staticmethod
+    def _ks_remove_file(path):
+        """ Removes a temporary export file, if still present. """
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
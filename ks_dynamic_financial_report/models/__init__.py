@@ -7,4 +7,6 @@ from . import ks_dynamic_financial_reports
 from . import ks_res_config_settings
 from . import ks_account_move_line
 from . import ks_dfr_account_type
-from . import ks_general_legdger
\ No newline at end of file
+from . import ks_general_legdger
+from . import ks_dfr_balance_cache
+from . import ks_account_move
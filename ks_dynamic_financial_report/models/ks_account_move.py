@@ -0,0 +1,24 @@
+from odoo import models
+
+# Move fields changing the cached lines of posted moves, dates, journals and
+# companies of the lines are related to the move
+KS_CACHE_MOVE_FIELDS = ('state', 'date', 'journal_id', 'company_id', 'line_ids')
+
+
+class KsAccountMove(models.Model):
+    _inherit = "account.move"
+
+    def write(self, vals):
+        ks_cache = self.env['ks.dfr.balance.cache']
+        if not any(field in vals for field in KS_CACHE_MOVE_FIELDS) or not ks_cache._ks_is_enabled():
+            return super(KsAccountMove, self).write(vals)
+        # The whole moves are moved in and out of the cache: skip their line level hooks
+        ks_cache._ks_apply_move_delta(self.filtered(lambda move: move.state == 'posted').ids, -1)
+        res = super(KsAccountMove, self.with_context(ks_dfr_skip_line_cache=True)).write(vals)
+        ks_cache._ks_apply_move_delta(self.filtered(lambda move: move.state == 'posted').ids, 1)
+        return res
+
+    def unlink(self):
+        self.env['ks.dfr.balance.cache']._ks_apply_move_delta(
+            self.filtered(lambda move: move.state == 'posted').ids, -1)
+        return super(KsAccountMove, self.with_context(ks_dfr_skip_line_cache=True)).unlink()
@@ -1,8 +1,44 @@
 from odoo import api, fields, models
 import ast
 
+# Line fields changing the cached totals, debit and credit are computed from
+# the balance, itself computed from the amount in currency
+KS_CACHE_LINE_WRITE_FIELDS = ('move_id', 'company_id', 'account_id', 'journal_id', 'date', 'debit', 'credit',
+                              'balance', 'amount_currency', 'currency_id')
+
+
 class KsAccountMoveLine(models.Model):
     _inherit = "account.move.line"
+
+    def _ks_posted_for_cache(self):
+        """ Posted lines to be kept in sync with the balance cache by the line
+        level hooks, the move level hooks handle the lines of the moves they
+        write or delete.
+        """
+        if self.env.context.get('ks_dfr_skip_line_cache') or \
+                not self.env['ks.dfr.balance.cache']._ks_is_enabled():
+            return self.browse()
+        return self.filtered(lambda line: line.parent_state == 'posted')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super(KsAccountMoveLine, self).create(vals_list)
+        self.env['ks.dfr.balance.cache']._ks_apply_line_delta(lines._ks_posted_for_cache().ids, 1)
+        return lines
+
+    def write(self, vals):
+        if not any(field in vals for field in KS_CACHE_LINE_WRITE_FIELDS):
+            return super(KsAccountMoveLine, self).write(vals)
+        ks_cache = self.env['ks.dfr.balance.cache']
+        ks_cache._ks_apply_line_delta(self._ks_posted_for_cache().ids, -1)
+        res = super(KsAccountMoveLine, self).write(vals)
+        ks_cache._ks_apply_line_delta(self._ks_posted_for_cache().ids, 1)
+        return res
+
+    def unlink(self):
+        self.env['ks.dfr.balance.cache']._ks_apply_line_delta(self._ks_posted_for_cache().ids, -1)
+        return super(KsAccountMoveLine, self).unlink()
+
     @api.model
     def _query_get(self, domain=None):
             self.check_access_rights('read')
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+import logging
+import time
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# Journal item columns aggregated by the cache
+KS_CACHE_LINE_FIELDS = ['move_id', 'parent_state', 'company_id', 'account_id', 'journal_id', 'date', 'debit',
+                        'credit']
+
+
+class KsDfrBalanceCache(models.Model):
+    """ Monthly pre-aggregated balances of posted journal items.
+
+    One row per (company, account, journal, month), kept in sync with signed
+    deltas whenever a move enters or leaves the posted state and whenever the
+    lines of a posted move are created, changed or deleted. Draft lines are
+    never aggregated here: report variants including unposted entries keep
+    reading account_move_line. Nothing is maintained while the setting is
+    off, enabling it rebuilds the table and a daily cron rebuilds it again if
+    it no longer matches the journal items.
+    """
+    _name = 'ks.dfr.balance.cache'
+    _description = 'Dynamic Financial Report Balance Cache'
+    _order = 'date, account_id'
+
+    company_id = fields.Many2one('res.company', required=True, readonly=True, index=True)
+    company_currency_id = fields.Many2one(related='company_id.currency_id')
+    account_id = fields.Many2one('account.account', required=True, readonly=True, ondelete='cascade')
+    journal_id = fields.Many2one('account.journal', required=True, readonly=True, ondelete='cascade')
+    date = fields.Date('Month', required=True, readonly=True, help="First day of the aggregated month")
+    debit = fields.Monetary(currency_field='company_currency_id', readonly=True)
+    credit = fields.Monetary(currency_field='company_currency_id', readonly=True)
+    balance = fields.Monetary(currency_field='company_currency_id', readonly=True)
+    line_count = fields.Integer(readonly=True)
+
+    _sql_constraints = [
+        ('ks_balance_cache_key_uniq', 'unique(company_id, account_id, journal_id, date)',
+         'Only one cached balance per company, account, journal and month is allowed.'),
+    ]
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS ks_dfr_balance_cache_account_date_idx
+            ON ks_dfr_balance_cache (account_id, date, journal_id)
+        """)
+
+    @api.model
+    def _ks_is_enabled(self):
+        return bool(self.env['ir.config_parameter'].sudo().get_param('ks_enable_balance_cache'))
+
+    @api.model
+    def _ks_apply_move_delta(self, move_ids, sign):
+        """ Add (sign=1) or remove (sign=-1) the lines of the given moves from the cache. """
+        self._ks_apply_delta("l.move_id IN %(ids)s", move_ids, sign)
+
+    @api.model
+    def _ks_apply_line_delta(self, line_ids, sign):
+        """ Add (sign=1) or remove (sign=-1) the given lines from the cache. """
+        self._ks_apply_delta("l.id IN %(ids)s", line_ids, sign)
+
+    @api.model
+    def _ks_apply_delta(self, where, ids, sign):
+        if not ids or not self._ks_is_enabled():
+            return
+        self.env['account.move.line'].flush_model(KS_CACHE_LINE_FIELDS)
+        self.env.cr.execute("""
+            INSERT INTO ks_dfr_balance_cache
+                (company_id, account_id, journal_id, date, debit, credit, balance, line_count,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT l.company_id, l.account_id, l.journal_id, date_trunc('month', l.date)::date,
+                   %(sign)s * COALESCE(SUM(l.debit), 0),
+                   %(sign)s * COALESCE(SUM(l.credit), 0),
+                   %(sign)s * (COALESCE(SUM(l.debit), 0) - COALESCE(SUM(l.credit), 0)),
+                   %(sign)s * COUNT(*),
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM account_move_line l
+            WHERE """ + where + """ AND l.account_id IS NOT NULL
+            GROUP BY l.company_id, l.account_id, l.journal_id, date_trunc('month', l.date)
+            ON CONFLICT (company_id, account_id, journal_id, date) DO UPDATE SET
+                debit = ks_dfr_balance_cache.debit + EXCLUDED.debit,
+                credit = ks_dfr_balance_cache.credit + EXCLUDED.credit,
+                balance = ks_dfr_balance_cache.balance + EXCLUDED.balance,
+                line_count = ks_dfr_balance_cache.line_count + EXCLUDED.line_count,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+            RETURNING id, line_count
+        """, {'sign': sign, 'uid': self.env.uid, 'ids': tuple(ids)})
+        ks_empty_ids = [row[0] for row in self.env.cr.fetchall() if row[1] <= 0]
+        if ks_empty_ids:
+            self.env.cr.execute("DELETE FROM ks_dfr_balance_cache WHERE id IN %s", (tuple(ks_empty_ids),))
+        self.invalidate_model()
+
+    @api.model
+    def ks_rebuild_cache(self):
+        """ Recompute the whole cache from the posted journal items. """
+        ks_start = time.time()
+        self.env['account.move.line'].flush_model()
+        self.env.cr.execute("DELETE FROM ks_dfr_balance_cache")
+        self.env.cr.execute("""
+            INSERT INTO ks_dfr_balance_cache
+                (company_id, account_id, journal_id, date, debit, credit, balance, line_count,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT l.company_id, l.account_id, l.journal_id, date_trunc('month', l.date)::date,
+                   COALESCE(SUM(l.debit), 0), COALESCE(SUM(l.credit), 0),
+                   COALESCE(SUM(l.debit), 0) - COALESCE(SUM(l.credit), 0), COUNT(*),
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM account_move_line l
+            WHERE l.parent_state = 'posted' AND l.account_id IS NOT NULL
+            GROUP BY l.company_id, l.account_id, l.journal_id, date_trunc('month', l.date)
+        """, {'uid': self.env.uid})
+        _logger.info("Rebuilt %s balance cache rows in %.2fs", self.env.cr.rowcount, time.time() - ks_start)
+        self.invalidate_model()
+        return True
+
+    @api.model
+    def _ks_check_cache(self):
+        """ Compare the cache with the posted journal items.
+
+        :return: number of (company, account, journal, month) keys whose cached
+                 totals differ from the journal items
+        """
+        self.flush_model()
+        self.env['account.move.line'].flush_model()
+        self.env.cr.execute("""
+            SELECT COUNT(*)
+            FROM ks_dfr_balance_cache c
+            FULL OUTER JOIN (
+                SELECT l.company_id, l.account_id, l.journal_id, date_trunc('month', l.date)::date AS date,
+                       COALESCE(SUM(l.debit), 0) AS debit, COALESCE(SUM(l.credit), 0) AS credit,
+                       COUNT(*) AS line_count
+                FROM account_move_line l
+                WHERE l.parent_state = 'posted' AND l.account_id IS NOT NULL
+                GROUP BY l.company_id, l.account_id, l.journal_id, date_trunc('month', l.date)
+            ) l ON l.company_id = c.company_id AND l.account_id = c.account_id
+               AND l.journal_id = c.journal_id AND l.date = c.date
+            WHERE c.id IS NULL OR l.date IS NULL
+               OR ROUND(c.debit - l.debit, 6) != 0 OR ROUND(c.credit - l.credit, 6) != 0
+               OR c.line_count != l.line_count
+        """)
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def ks_check_and_rebuild_cache(self):
+        """ Rebuild the cache when it no longer matches the journal items.
+
+        :return: number of mismatched keys found before the rebuild
+        """
+        ks_mismatches = self._ks_check_cache()
+        if ks_mismatches:
+            _logger.warning("Balance cache out of sync on %s keys, rebuilding it", ks_mismatches)
+            self.ks_rebuild_cache()
+        return ks_mismatches
+
+    @api.model
+    def _ks_cron_check_cache(self):
+        if self._ks_is_enabled():
+            self.ks_check_and_rebuild_cache()
+
+    @api.model
+    def _ks_split_period(self, date_from, date_to):
+        """ Split [date_from, date_to] into the whole months served by the cache
+        and the partial-month edges that have to be read from the journal items.
+        Either bound may be False for an open-ended period.
+
+        :return: (months, edges) where months is a (first_month, last_month)
+                 tuple of month starts (each False when unbounded) or None when
+                 no whole month is covered, and edges is a list of inclusive
+                 (date_from, date_to) tuples.
+        """
+        date_from = fields.Date.to_date(date_from) if date_from else False
+        date_to = fields.Date.to_date(date_to) if date_to else False
+        first_month = last_month = False
+        if date_from:
+            first_month = date_from.replace(day=1)
+            if first_month != date_from:
+                first_month += relativedelta(months=1)
+        if date_to:
+            last_month = date_to.replace(day=1)
+            if date_to != last_month + relativedelta(months=1, days=-1):
+                last_month -= relativedelta(months=1)
+        if first_month and last_month and first_month > last_month:
+            return None, [(date_from, date_to)]
+
+        edges = []
+        if first_month and date_from < first_month:
+            edges.append((date_from, first_month - relativedelta(days=1)))
+        if last_month and date_to >= last_month + relativedelta(months=1):
+            edges.append((last_month + relativedelta(months=1), date_to))
+        return (first_month, last_month), edges
+
+    @api.model
+    def _ks_read_balances(self, date_from, date_to, company_ids=None, account_ids=None, journal_ids=None):
+        """ Posted debit, credit and balance per account between date_from and
+        date_to (inclusive, either may be False for an open-ended period).
+
+        :return: dict {account_id: {'debit': x, 'credit': y, 'balance': z}}
+        """
+        months, edges = self._ks_split_period(date_from, date_to)
+        wheres, params = [], []
+        if company_ids:
+            wheres.append("company_id IN %s")
+            params.append(tuple(company_ids))
+        if account_ids:
+            wheres.append("account_id IN %s")
+            params.append(tuple(account_ids))
+        if journal_ids:
+            wheres.append("journal_id IN %s")
+            params.append(tuple(journal_ids))
+        ks_filters = ''.join(" AND " + where for where in wheres)
+
+        ks_res = {}
+
+        def _ks_accumulate(rows):
+            for row in rows:
+                ks_vals = ks_res.setdefault(row['account_id'], dict.fromkeys(('debit', 'credit', 'balance'), 0.0))
+                for field in ks_vals:
+                    ks_vals[field] += row[field]
+
+        if months is not None:
+            ks_month_wheres = ["1=1"]
+            ks_month_params = []
+            if months[0]:
+                ks_month_wheres.append("date >= %s")
+                ks_month_params.append(months[0])
+            if months[1]:
+                ks_month_wheres.append("date <= %s")
+                ks_month_params.append(months[1])
+            self.flush_model()
+            self.env.cr.execute("""
+                SELECT account_id, SUM(debit) AS debit, SUM(credit) AS credit, SUM(balance) AS balance
+                FROM ks_dfr_balance_cache
+                WHERE """ + " AND ".join(ks_month_wheres) + ks_filters + """
+                GROUP BY account_id
+            """, ks_month_params + params)
+            _ks_accumulate(self.env.cr.dictfetchall())
+
+        if edges:
+            self.env['account.move.line'].flush_model()
+            ks_edge_where = " OR ".join(["date BETWEEN %s AND %s"] * len(edges))
+            ks_edge_params = [day for edge in edges for day in edge]
+            self.env.cr.execute("""
+                SELECT account_id,
+                       COALESCE(SUM(debit), 0) AS debit,
+                       COALESCE(SUM(credit), 0) AS credit,
+                       COALESCE(SUM(debit), 0) - COALESCE(SUM(credit), 0) AS balance
+                FROM account_move_line
+                WHERE parent_state = 'posted' AND account_id IS NOT NULL
+                  AND (""" + ks_edge_where + ")" + ks_filters + """
+                GROUP BY account_id
+            """, ks_edge_params + params)
+            _ks_accumulate(self.env.cr.dictfetchall())
+        return ks_res
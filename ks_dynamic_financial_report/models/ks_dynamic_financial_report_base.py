@@ -348,9 +348,19 @@ class ks_dynamic_financial_base(models.Model):
             for account in accounts:
                 for rec in account:
                     account_ids.append(rec.id)
-            ks_params = (tuple(account_ids),) + tuple(ks_where_params)
-            self.env.cr.execute(request, ks_params)
-            for row in self.env.cr.dictfetchall():
+            if self._ks_balance_cache_usable_in_context(ks_df_informations):
+                ks_date_from = self._context.get('date_from')
+                ks_date_to = self._context.get('date_to')
+                if prv_year_dates and ks_date_to:
+                    ks_date_to = prv_year_dates['date_to']
+                if prv_year_dates and ks_date_from:
+                    ks_date_from = prv_year_dates['date_from']
+                ks_rows = self._ks_cached_account_balances(ks_date_from, ks_date_to, account_ids)
+            else:
+                ks_params = (tuple(account_ids),) + tuple(ks_where_params)
+                self.env.cr.execute(request, ks_params)
+                ks_rows = self.env.cr.dictfetchall()
+            for row in ks_rows:
                 # row['balance'] = 0 - row['balance']
                 if self.ks_name == 'Balance Sheet':
                     if (ks_report.ks_parent_id and "Earnings" in ks_report.ks_parent_id.display_name) or \
@@ -371,6 +381,76 @@ class ks_dynamic_financial_base(models.Model):
                     ks_res[row['id']] = row
         return ks_res
 
+    def _ks_balance_cache_usable(self, ks_df_informations):
+        """ The balance cache only aggregates posted lines per company, account,
+        journal and month: any other report filter needs the journal items.
+        """
+        return bool(self.env['ks.dfr.balance.cache']._ks_is_enabled()
+                    and ks_df_informations.get('ks_posted_entries')
+                    and not ks_df_informations.get('ks_unposted_entries')
+                    and not ks_df_informations.get('analytic_accounts')
+                    and not ks_df_informations.get('partner_ids')
+                    and not ks_df_informations.get('ks_partner_ids')
+                    and not ks_df_informations.get('ks_ignore_closing_entry'))
+
+    def _ks_balance_cache_usable_in_context(self, ks_df_informations):
+        """ Same as _ks_balance_cache_usable for the context driven
+        account.move.line _query_get() filters.
+        """
+        ks_context = self._context
+        return bool(self.env['ks.dfr.balance.cache']._ks_is_enabled()
+                    and ks_context.get('state') == 'posted'
+                    and not any(ks_context.get(key) for key in (
+                        'aged_balance', 'reconcile_date', 'account_tag_ids', 'analytic_tag_ids',
+                        'analytic_account_ids', 'partner_ids', 'partner_categories'))
+                    and not ks_df_informations.get('ks_ignore_closing_entry'))
+
+    def _ks_cached_account_balances(self, date_from, date_to, account_ids):
+        """ Balance cache counterpart of the _query_get() based query of
+        _ks_compute_account_balance, returns rows of id, debit, credit, balance.
+        """
+        ks_context = self._context
+        if ks_context.get('company_id'):
+            ks_company_ids = [ks_context['company_id']]
+        elif ks_context.get('allowed_company_ids'):
+            ks_company_ids = self.env.companies.ids
+        else:
+            ks_company_ids = self.env.company.ids
+        if ks_context.get('account_ids'):
+            account_ids = [account_id for account_id in account_ids if account_id in ks_context['account_ids'].ids]
+            if not account_ids:
+                return []
+        ks_balances = self.env['ks.dfr.balance.cache']._ks_read_balances(
+            date_from, date_to, company_ids=ks_company_ids, account_ids=account_ids,
+            journal_ids=ks_context.get('journal_ids'))
+        return [dict(ks_values, id=account_id) for account_id, ks_values in ks_balances.items()]
+
+    def _ks_selected_account_ids(self, ks_df_informations):
+        return [account['id'] for account in ks_df_informations.get('account', [])
+                if account['id'] not in ('divider', 'group') and account['selected']]
+
+    def _ks_cached_code_balances(self, ks_df_informations, date_from, date_to, account_ids=None):
+        """ Balance cache counterpart of the ks_df_build_where_clause based
+        queries: debit, credit and balance per account code between date_from
+        and date_to (inclusive, either may be False for an open-ended period).
+        account_ids replaces the selected accounts of the report when given.
+        """
+        ks_journal_ids = [journal['id'] for journal in ks_df_informations.get('journals', [])
+                          if journal['id'] not in ('divider', 'group') and journal['selected']]
+        if account_ids is None:
+            account_ids = self._ks_selected_account_ids(ks_df_informations)
+        elif not account_ids:
+            return {}
+        ks_company_ids = ks_df_informations.get('company_ids') if ks_df_informations.get('company_id') else None
+        ks_balances = self.env['ks.dfr.balance.cache']._ks_read_balances(
+            date_from, date_to, company_ids=ks_company_ids, account_ids=account_ids, journal_ids=ks_journal_ids)
+        ks_res = {}
+        for ks_account in self.env['account.account'].sudo().browse(ks_balances):
+            ks_values = ks_res.setdefault(ks_account.code, dict.fromkeys(('debit', 'credit', 'balance'), 0.0))
+            for field in ks_values:
+                ks_values[field] += ks_balances[ks_account.id][field]
+        return ks_res
+
     def ks_fetch_report_account_lines(self, ks_df_informations):
         ks_account_report = self.ks_df_report_account_report_ids
 
@@ -856,11 +936,25 @@ class ks_dynamic_financial_base(models.Model):
 
         tuple_acc_ids = tuple(ks_account_ids.ids)
 
+        # Whole months of posted entries can be read from the balance cache
+        ks_use_cache = self._ks_balance_cache_usable(ks_df_informations)
+        ks_selected_account_ids = self._ks_selected_account_ids(ks_df_informations)
+        ks_cache_account_ids = [acc_id for acc_id in tuple_acc_ids
+                                if not ks_selected_account_ids or acc_id in ks_selected_account_ids]
+        ks_day_before_start = is_range_process and \
+            fields.Date.to_date(ks_start_date) - datetime.timedelta(days=1)
+
         # =========================================================================
         # BULK QUERY 1: Initial Balances
         # =========================================================================
         ks_opening_balances_dict = {}
-        if ks_df_informations.get('initial_balance'):
+        if ks_df_informations.get('initial_balance') and ks_use_cache:
+            ks_cached = self._ks_cached_code_balances(
+                ks_df_informations, False, ks_day_before_start, ks_cache_account_ids)
+            for ks_code, ks_values in ks_cached.items():
+                ks_opening_balances_dict[ks_code] = dict(
+                    ks_values, account_code=ks_code, account_id=ks_move_lines[ks_code]['id'])
+        elif ks_df_informations.get('initial_balance'):
             KS_WHERE_INIT = WHERE
             if is_range_process:
                 KS_WHERE_INIT += " AND l.date < '%s'" % ks_start_date
@@ -969,30 +1063,49 @@ class ks_dynamic_financial_base(models.Model):
         else:
             KS_WHERE_FULL = WHERE + " AND l.date <= '%s'" % ks_end_date
 
-        sql_final_bulk = ('''
-                SELECT 
-                    a.code as account_code,
-                    COALESCE(SUM(l.debit),0) AS debit, 
-                    COALESCE(SUM(l.credit),0) AS credit, 
-                    COALESCE(SUM(l.debit - l.credit),0) AS balance
-                FROM account_move_line l
-                JOIN account_move m ON (l.move_id=m.id)
-                JOIN account_account a ON (l.account_id=a.id)
-                LEFT JOIN res_currency c ON (l.currency_id=c.id)
-                LEFT JOIN res_partner p ON (l.partner_id=p.id)
-                JOIN account_journal j ON (l.journal_id=j.id) 
-                WHERE %s AND a.id IN %%s 
-                GROUP BY a.code
-            ''') % KS_WHERE_FULL
-        cr.execute(sql_final_bulk, (tuple_acc_ids,))
-        final_bal_dict = {row['account_code']: row for row in cr.dictfetchall()}
+        if ks_use_cache:
+            if is_range_process and not ks_df_informations.get('initial_balance'):
+                ks_final_from = ks_start_date
+            else:
+                ks_final_from = False
+            final_bal_dict = {
+                ks_code: dict(ks_values, account_code=ks_code)
+                for ks_code, ks_values in self._ks_cached_code_balances(
+                    ks_df_informations, ks_final_from, ks_end_date, ks_cache_account_ids).items()
+            }
+        else:
+            sql_final_bulk = ('''
+                    SELECT 
+                        a.code as account_code,
+                        COALESCE(SUM(l.debit),0) AS debit, 
+                        COALESCE(SUM(l.credit),0) AS credit, 
+                        COALESCE(SUM(l.debit - l.credit),0) AS balance
+                    FROM account_move_line l
+                    JOIN account_move m ON (l.move_id=m.id)
+                    JOIN account_account a ON (l.account_id=a.id)
+                    LEFT JOIN res_currency c ON (l.currency_id=c.id)
+                    LEFT JOIN res_partner p ON (l.partner_id=p.id)
+                    JOIN account_journal j ON (l.journal_id=j.id) 
+                    WHERE %s AND a.id IN %%s 
+                    GROUP BY a.code
+                ''') % KS_WHERE_FULL
+            cr.execute(sql_final_bulk, (tuple_acc_ids,))
+            final_bal_dict = {row['account_code']: row for row in cr.dictfetchall()}
 
         # =========================================================================
         # BULK QUERY 4: Handle Initial Balance for non-income/expense accounts
         # =========================================================================
         init_bal_summary_dict = {}
         is_ledger_bal_enabled = self.env['ir.config_parameter'].sudo().get_param('ks_enable_ledger_in_bal')
-        if is_ledger_bal_enabled and is_range_process:
+        if is_ledger_bal_enabled and is_range_process and ks_use_cache:
+            ks_balance_sheet_ids = ks_account_ids.filtered(
+                lambda acc: acc.id in ks_cache_account_ids and acc.internal_group not in ('income', 'expense')).ids
+            init_bal_summary_dict = {
+                ks_code: ks_values['balance']
+                for ks_code, ks_values in self._ks_cached_code_balances(
+                    ks_df_informations, False, ks_day_before_start, ks_balance_sheet_ids).items()
+            }
+        elif is_ledger_bal_enabled and is_range_process:
             KS_INIT_BAL_WHERE_FULL = WHERE + " AND l.date < '%s'" % ks_start_date
             ks_init_bal_sql_bulk = ('''
                     SELECT 
@@ -2107,6 +2220,30 @@ class ks_dynamic_financial_base(models.Model):
                     'company_currency_id': ks_company_currency_id.id
                 }
 
+            # With the balance cache both sections are read once for every account
+            ks_cached_init = ks_cached_current = None
+            if self._ks_balance_cache_usable(ks_df_informations):
+                ks_cache_account_ids = None
+                if 'a.id' in WHERE:
+                    ks_cache_account_ids = [int(ksaccountid) for ksaccountid in ksaccount_ids]
+                    if ks_account_type_ids and ks_temp_domain != ks_domain:
+                        ks_cache_account_ids += ks_account_type_ids.ids
+                if self.ks_dif_filter_bool:
+                    ks_period = ks_df_informations['ks_differ']
+                else:
+                    ks_period = ks_df_informations['date']
+                if self.ks_date_filter.get('ks_process') == 'range':
+                    ks_cached_init = self._ks_cached_code_balances(
+                        ks_df_informations, False,
+                        fields.Date.to_date(ks_df_informations['date'].get('ks_start_date')) - datetime.timedelta(days=1),
+                        ks_cache_account_ids)
+                    ks_cached_current = self._ks_cached_code_balances(
+                        ks_df_informations, ks_period.get('ks_start_date'), ks_period.get('ks_end_date'),
+                        ks_cache_account_ids)
+                else:
+                    ks_cached_current = self._ks_cached_code_balances(
+                        ks_df_informations, False, ks_period.get('ks_end_date'), ks_cache_account_ids)
+
             ks_retained = {}
             ks_total_deb = 0.0
             ks_total_cre = 0.0
@@ -2120,7 +2257,14 @@ class ks_dynamic_financial_base(models.Model):
                 KS_WHERE_INIT += " AND a.code = '%s'" % ks_account.code
                 ks_init_blns = {}
 
-                if self.ks_date_filter.get('ks_process') == 'range':
+                if ks_cached_init is not None:
+                    ks_cached_row = ks_cached_init.get(ks_account.code, {})
+                    ks_init_blns = {
+                        'initial_debit': ks_cached_row.get('debit', 0.0),
+                        'initial_credit': ks_cached_row.get('credit', 0.0),
+                        'initial_balance': ks_cached_row.get('balance', 0.0),
+                    }
+                elif self.ks_date_filter.get('ks_process') == 'range':
                     sql = ('''
                         SELECT
                             COALESCE(SUM(l.debit),0) AS initial_debit,
@@ -2173,22 +2317,26 @@ class ks_dynamic_financial_base(models.Model):
                             KS_WHERE_CURRENT = WHERE + " AND l.date <= '%s'" % ks_df_informations['ks_differ'].get(
                                 'ks_end_date')
 
-                    KS_WHERE_CURRENT += " AND a.code = '%s'" % ks_account.code
-                    sql = ('''
-                        SELECT
-                            COALESCE(SUM(l.debit),0) AS debit,
-                            COALESCE(SUM(l.credit),0) AS credit,
-                            COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit),0) AS balance
-                        FROM account_move_line l
-                        JOIN account_move m ON (l.move_id=m.id)
-                        JOIN account_account a ON (l.account_id=a.id)
-                        LEFT JOIN res_currency c ON (l.currency_id=c.id)
-                        LEFT JOIN res_partner p ON (l.partner_id=p.id)
-                        JOIN account_journal j ON (l.journal_id=j.id)
-                        WHERE %s
-                    ''') % KS_WHERE_CURRENT
-                    cr.execute(sql)
-                    ks_op = cr.dictfetchone()
+                    if ks_cached_current is not None:
+                        ks_op = dict.fromkeys(('debit', 'credit', 'balance'), 0.0)
+                        ks_op.update(ks_cached_current.get(ks_account.code, {}))
+                    else:
+                        KS_WHERE_CURRENT += " AND a.code = '%s'" % ks_account.code
+                        sql = ('''
+                            SELECT
+                                COALESCE(SUM(l.debit),0) AS debit,
+                                COALESCE(SUM(l.credit),0) AS credit,
+                                COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit),0) AS balance
+                            FROM account_move_line l
+                            JOIN account_move m ON (l.move_id=m.id)
+                            JOIN account_account a ON (l.account_id=a.id)
+                            LEFT JOIN res_currency c ON (l.currency_id=c.id)
+                            LEFT JOIN res_partner p ON (l.partner_id=p.id)
+                            JOIN account_journal j ON (l.journal_id=j.id)
+                            WHERE %s
+                        ''') % KS_WHERE_CURRENT
+                        cr.execute(sql)
+                        ks_op = cr.dictfetchone()
                     ks_deb = ks_op['debit']
                     ks_cre = ks_op['credit']
                     ks_bln = ks_op['balance']
@@ -2800,13 +2948,17 @@ class ks_dynamic_financial_base(models.Model):
         return ks_periods_options_list
 
     def ks_build_detailed_gen_move_lines(self, offset=0, ks_account=0, ks_df_informations=False,
-                                         fetch_range=FETCH_RANGE):
+                                         fetch_range=FETCH_RANGE, ks_cursor=None):
         '''
         It is used for showing detailed move lines as sub lines. It is defered loading compatable
         :param offset: It is nothing but page numbers. Multiply with fetch_range to get final range
         :param account: Integer - Account_id
         :param fetch_range: Global Variable. Can be altered from calling model
+        :param ks_cursor: dict - Keyset position returned with the previous page ({} for the first page).
+                          When given, pages are read after that position instead of with an offset
         :return: count(int-Total rows without offset), offset(integer), ks_move_lines(list of dict)
+                 and, with ks_cursor, the cursor of the next page (False on the last page). In that
+                 case count and offset are the rows read up to and before this page, not a total
 
         Three sections,
         1. Initial Balance
@@ -2858,8 +3010,22 @@ class ks_dynamic_financial_base(models.Model):
         else:
             KS_ORDER_BY_CURRENT = 'l.date, p.name, l.move_id'
 
+        ks_keyset = ks_cursor is not None
+        ks_cursor = ks_cursor or {}
+        if ks_keyset:
+            # The pages are located by the cursor, which counts the rows already read
+            ks_offset_count = ks_cursor.get('count', 0)
+        # Without keyset, the first page is the one at offset 0
+        ks_first_page = not ks_cursor.get('lid') if ks_keyset else int(ks_offset_count / fetch_range) == 0
+        if ks_keyset:
+            KS_ORDER_BY_CURRENT, KS_WHERE_KEYSET = self._ks_keyset_clause(
+                ks_cursor, ks_df_informations.get('sort_accounts_by') != 'date')
+
         ks_move_lines = []
-        if ks_df_informations.get('initial_balance'):
+        if ks_keyset and not ks_first_page:
+            # The running balance (opening balance included) is carried by the cursor
+            ks_opening_balance = ks_cursor.get('balance', 0.0)
+        elif ks_df_informations.get('initial_balance'):
             sql = ('''
                     SELECT 
                         COALESCE(SUM(l.debit - l.credit),0) AS balance
@@ -2875,41 +3041,44 @@ class ks_dynamic_financial_base(models.Model):
             row = cr.dictfetchone()
             ks_opening_balance += row.get('balance')
 
-        sql = ('''
-            SELECT 
-                COALESCE(SUM(l.debit - l.credit),0) AS balance
-            FROM account_move_line l
-            JOIN account_move m ON (l.move_id=m.id)
-            JOIN account_account a ON (l.account_id=a.id)
-            LEFT JOIN res_currency c ON (l.currency_id=c.id)
-            LEFT JOIN res_partner p ON (l.partner_id=p.id)
-            JOIN account_journal j ON (l.journal_id=j.id)
-            WHERE %s
-            GROUP BY j.code,l.date, p.name, l.move_id
-            ORDER BY %s
-            OFFSET %s ROWS
-            FETCH FIRST %s ROWS ONLY
-        ''') % (KS_WHERE_CURRENT, KS_ORDER_BY_CURRENT, 0, ks_offset_count)
-        cr.execute(sql)
-        ks_running_balance_list = cr.fetchall()
-        for ks_running_balance in ks_running_balance_list:
-            ks_opening_balance += ks_running_balance[0]
-
-        sql = ('''
-            SELECT COUNT(*)
-            FROM account_move_line l
+        if not ks_keyset:
+            sql = ('''
+                SELECT 
+                    COALESCE(SUM(l.debit - l.credit),0) AS balance
+                FROM account_move_line l
                 JOIN account_move m ON (l.move_id=m.id)
                 JOIN account_account a ON (l.account_id=a.id)
                 LEFT JOIN res_currency c ON (l.currency_id=c.id)
-                LEFT JOIN res_currency cc ON (l.company_currency_id=cc.id)
                 LEFT JOIN res_partner p ON (l.partner_id=p.id)
                 JOIN account_journal j ON (l.journal_id=j.id)
-            WHERE %s
-        ''') % (KS_WHERE_CURRENT)
-        cr.execute(sql)
-        count = cr.fetchone()[0]
+                WHERE %s
+                GROUP BY j.code,l.date, p.name, l.move_id
+                ORDER BY %s
+                OFFSET %s ROWS
+                FETCH FIRST %s ROWS ONLY
+            ''') % (KS_WHERE_CURRENT, KS_ORDER_BY_CURRENT, 0, ks_offset_count)
+            cr.execute(sql)
+            ks_running_balance_list = cr.fetchall()
+            for ks_running_balance in ks_running_balance_list:
+                ks_opening_balance += ks_running_balance[0]
+
+            sql = ('''
+                SELECT COUNT(*)
+                FROM account_move_line l
+                    JOIN account_move m ON (l.move_id=m.id)
+                    JOIN account_account a ON (l.account_id=a.id)
+                    LEFT JOIN res_currency c ON (l.currency_id=c.id)
+                    LEFT JOIN res_currency cc ON (l.company_currency_id=cc.id)
+                    LEFT JOIN res_partner p ON (l.partner_id=p.id)
+                    JOIN account_journal j ON (l.journal_id=j.id)
+                WHERE %s
+            ''') % (KS_WHERE_CURRENT)
+            cr.execute(sql)
+            count = cr.fetchone()[0]
         ks_initial_bal_data = 0
-        if self.env['ir.config_parameter'].sudo().get_param('ks_enable_ledger_in_bal') and \
+        if ks_keyset and not ks_first_page:
+            ks_initial_bal_data = ks_cursor.get('initial_bal_data', 0.0)
+        elif self.env['ir.config_parameter'].sudo().get_param('ks_enable_ledger_in_bal') and \
                 ks_df_informations['date']['ks_process'] == 'range':
             KSINITWHERE_CURRENT = KSINITWHERE + " AND l.date < '%s'" % ks_df_informations['date'].get('ks_start_date')
             KSINITWHERE_CURRENT += " AND a.internal_group not in ('income', 'expense')"
@@ -2991,7 +3160,7 @@ class ks_dynamic_financial_base(models.Model):
                 ks_initial_bal_data += row['balance']
             ks_move_lines.append(ks_temp_dict)
 
-        if (int(ks_offset_count / fetch_range) == 0) and ks_df_informations.get('initial_balance'):
+        if ks_first_page and ks_df_informations.get('initial_balance'):
             sql = ('''
                     SELECT 
                         COALESCE(SUM(l.debit),0) AS debit, 
@@ -3053,9 +3222,18 @@ class ks_dynamic_financial_base(models.Model):
                 ORDER BY %s
                 OFFSET %s ROWS
                 FETCH FIRST %s ROWS ONLY
-            ''') % (KS_WHERE_CURRENT, KS_ORDER_BY_CURRENT, ks_offset_count, fetch_range)
-        cr.execute(sql)
-        for ks_row in cr.dictfetchall():
+            ''')
+        if ks_keyset:
+            # One extra row tells whether another page follows, without counting the account
+            cr.execute(sql % (KS_WHERE_CURRENT + KS_WHERE_KEYSET, KS_ORDER_BY_CURRENT, 0, fetch_range + 1))
+            ks_rows = cr.dictfetchall()
+            ks_has_more = len(ks_rows) > fetch_range
+            ks_rows = ks_rows[:fetch_range]
+            count = ks_offset_count + len(ks_rows)
+        else:
+            cr.execute(sql % (KS_WHERE_CURRENT, KS_ORDER_BY_CURRENT, ks_offset_count, fetch_range))
+            ks_rows = cr.dictfetchall()
+        for ks_row in ks_rows:
             lang = self.env.user.lang
             lang_id = self.env['res.lang'].search([('code', '=', lang)])['date_format'].replace('/', '-')
 
@@ -3067,7 +3245,27 @@ class ks_dynamic_financial_base(models.Model):
             ks_row['initial_bal'] = False
             ks_move_lines.append(ks_row)
 
-        if ((count - ks_offset_count) <= fetch_range) and ks_df_informations.get('initial_balance'):
+        if ks_keyset:
+            ks_next_cursor = ks_has_more and self._ks_next_cursor(
+                ks_rows[-1], ks_opening_balance, initial_bal_data=ks_initial_bal_data, count=count)
+            self._ks_finish_detailed_gen_move_lines(
+                ks_move_lines, ks_account, ks_df_informations, KS_WHERE_FULL, ks_initial_bal_data, not ks_has_more)
+            return count, ks_offset_count, ks_move_lines, ks_next_cursor
+
+        self._ks_finish_detailed_gen_move_lines(
+            ks_move_lines, ks_account, ks_df_informations, KS_WHERE_FULL, ks_initial_bal_data,
+            (count - ks_offset_count) <= fetch_range)
+        return count, ks_offset_count, ks_move_lines
+
+    def _ks_finish_detailed_gen_move_lines(self, ks_move_lines, ks_account, ks_df_informations, KS_WHERE_FULL,
+                                           ks_initial_bal_data, ks_last_page):
+        '''
+        Appends the ending balance on the last page and flags the bank account lines
+        of a page of ks_build_detailed_gen_move_lines.
+        '''
+        cr = self.env.cr
+        ks_currency_id = self.env.user.company_id.currency_id
+        if ks_last_page and ks_df_informations.get('initial_balance'):
             sql = ('''
                     SELECT 
                         COALESCE(SUM(l.debit),0) AS debit, 
@@ -3104,8 +3302,34 @@ class ks_dynamic_financial_base(models.Model):
             else:
                 line['is_bank_account'] = False
             # <--- CORRECTED BLOCK END --->
+        return ks_move_lines
 
-        return count, ks_offset_count, ks_move_lines
+    def _ks_keyset_clause(self, ks_cursor, ks_by_partner_name=False):
+        '''
+        Keyset pagination of the detailed move lines on (date, [partner name,] move, line)
+        :param ks_cursor: dict - position returned with the previous page, empty for the first page
+        :return: ORDER BY expression, WHERE condition selecting the lines after the cursor
+        '''
+        ks_keys = ['l.date', 'l.move_id', 'l.id']
+        ks_values = [ks_cursor.get('ldate'), ks_cursor.get('move_id'), ks_cursor.get('lid')]
+        if ks_by_partner_name:
+            ks_keys.insert(1, "COALESCE(p.name, '')")
+            ks_values.insert(1, ks_cursor.get('partner_name') or '')
+        KS_ORDER_BY = ', '.join(ks_keys)
+        if not ks_cursor.get('lid'):
+            return KS_ORDER_BY, ''
+        return KS_ORDER_BY, self.env.cr.mogrify(" AND (%s) > %%s" % KS_ORDER_BY, (tuple(ks_values),)).decode()
+
+    def _ks_next_cursor(self, ks_row, ks_balance, **ks_extra):
+        '''
+        Keyset position after ks_row, carrying the running balance to the next page
+        '''
+        return dict(ks_extra,
+                    ldate=fields.Date.to_string(ks_row['ldate']),
+                    partner_name=ks_row.get('partner_name') or '',
+                    move_id=ks_row['move_id'],
+                    lid=ks_row['lid'],
+                    balance=ks_balance)
 
     def ks_fetch_page_list(self, ks_total_count):
         '''
@@ -3228,6 +3452,9 @@ class ks_dynamic_financial_base(models.Model):
         if hasattr(self, 'partner_category_ids') and self.partner_category_ids:
             ks_df_partner_company_domain.append(('category_id', 'in', self.partner_category_ids.ids))
 
+        if self._ks_set_based_partner_reports():
+            return self._ks_partner_process_data_set_based(ks_df_informations, WHERE, ks_df_partner_company_domain)
+
         # Get partners with pagination to prevent memory issues
         if ks_df_informations.get('ks_partner_ids', []):
             partner_limit = min(len(ks_df_informations.get('ks_partner_ids')), 500)  # Limit to 500 partners
@@ -3505,6 +3732,168 @@ class ks_dynamic_financial_base(models.Model):
         _logger.info(f"Partner Ledger processing completed. Processed {len(ks_move_lines)} partners with data.")
         return ks_move_lines, 0.0, 0.0, 0.0
 
+    def _ks_set_based_partner_reports(self):
+        return bool(self.env['ir.config_parameter'].sudo().get_param('ks_set_based_partner_reports'))
+
+    def _ks_partner_process_data_set_based(self, ks_df_informations, WHERE, ks_df_partner_company_domain):
+        '''
+        Set-based Partner Ledger: the initial, current and ending sections of every
+        partner come from a single windowed query instead of three queries per partner.
+        Same result structure as ks_partner_process_data, without the partner cap.
+        '''
+        cr = self.env.cr
+        ks_company_id = self.env['res.company'].sudo().browse(ks_df_informations.get('company_id'))
+        if ks_df_informations.get('ks_partner_ids', []):
+            ks_partner_ids = sorted(ks_df_informations.get('ks_partner_ids'))
+        else:
+            ks_partner_ids = self.env['res.partner'].sudo().search(ks_df_partner_company_domain, order="id asc").ids
+        if not ks_partner_ids:
+            _logger.info("No partners found for the given criteria")
+            return {}, 0.0, 0.0, 0.0
+
+        ks_df_informations['initial_balance'] = True
+        ks_params = {
+            'partner_ids': ks_partner_ids,
+            'date_from': ks_df_informations['date'].get('ks_start_date'),
+            'date_to': ks_df_informations['date'].get('ks_end_date'),
+        }
+        if self.ks_date_filter.get('ks_process') == 'range':
+            KS_INIT = "l.date < %(date_from)s"
+            KS_CURRENT = "l.date >= %(date_from)s AND l.date <= %(date_to)s"
+            KS_DATE_BOUND = " AND l.date <= %(date_to)s"
+        else:
+            KS_INIT = "TRUE"
+            KS_CURRENT = "l.date <= %(date_to)s"
+            KS_DATE_BOUND = ""
+        KS_FULL = "l.date <= %(date_to)s"
+        ks_init_bal_enabled = self.env['ir.config_parameter'].sudo().get_param('ks_enable_ledger_in_bal') and \
+            self.ks_date_filter.get('ks_process') == 'range'
+        KS_INIT_BAL = KS_INIT + " AND a.internal_group NOT IN ('income', 'expense')" \
+            if ks_init_bal_enabled else "FALSE"
+
+        # Current lines come first in each partner partition, so that their row
+        # number and running balance only count current lines. The first row of
+        # a partner without current lines is kept to carry the partner totals.
+        sql = '''
+            SELECT * FROM (
+                SELECT
+                    l.partner_id,
+                    l.id AS lid,
+                    l.date AS ldate,
+                    j.code AS lcode,
+                    a.name AS account_name,
+                    m.name AS move_name,
+                    l.name AS lname,
+                    COALESCE(l.debit, 0) AS debit,
+                    COALESCE(l.credit, 0) AS credit,
+                    COALESCE(l.amount_currency, 0) AS balance_currency,
+                    pc.currency_id AS partner_currency_id,
+                    (%(current)s) AS ks_current,
+                    ROW_NUMBER() OVER ks_partner_lines AS ks_row,
+                    SUM(CASE WHEN %(current)s THEN COALESCE(l.balance, 0) ELSE 0 END) OVER ks_partner_lines AS ks_running,
+                    COALESCE(SUM(l.debit) FILTER (WHERE %(init)s) OVER ks_partner, 0) AS init_debit,
+                    COALESCE(SUM(l.credit) FILTER (WHERE %(init)s) OVER ks_partner, 0) AS init_credit,
+                    COALESCE(SUM(l.debit) FILTER (WHERE %(full)s) OVER ks_partner, 0) AS end_debit,
+                    COALESCE(SUM(l.credit) FILTER (WHERE %(full)s) OVER ks_partner, 0) AS end_credit,
+                    COALESCE(SUM(l.debit) FILTER (WHERE %(init_bal)s) OVER ks_partner, 0) AS init_bal_debit,
+                    COALESCE(SUM(l.credit) FILTER (WHERE %(init_bal)s) OVER ks_partner, 0) AS init_bal_credit
+                FROM account_move_line l
+                INNER JOIN account_move m ON l.move_id = m.id
+                INNER JOIN account_account a ON l.account_id = a.id
+                LEFT JOIN res_currency c ON l.currency_id = c.id
+                LEFT JOIN res_partner p ON l.partner_id = p.id
+                LEFT JOIN res_company pc ON p.company_id = pc.id
+                INNER JOIN account_journal j ON l.journal_id = j.id
+                WHERE %(where)s AND l.partner_id = ANY(%%(partner_ids)s)%(date_bound)s
+                WINDOW ks_partner AS (PARTITION BY l.partner_id),
+                       ks_partner_lines AS (PARTITION BY l.partner_id ORDER BY (%(current)s) DESC, l.date, l.move_id, l.id
+                                            ROWS UNBOUNDED PRECEDING)
+            ) ks_lines
+            WHERE ks_row = 1 OR (ks_current AND ks_row <= 5000)
+            ORDER BY partner_id, ks_row
+        ''' % {
+            'where': WHERE, 'init': KS_INIT, 'current': KS_CURRENT, 'full': KS_FULL,
+            'init_bal': KS_INIT_BAL, 'date_bound': KS_DATE_BOUND,
+        }
+        cr.execute(sql, ks_params)
+
+        ks_move_lines = {}
+        ks_totals = {}
+        ks_currencies = {}
+        for ks_row in cr.dictfetchall():
+            ks_partner_id = ks_row['partner_id']
+            if ks_partner_id not in ks_totals:
+                ks_currency_id = ks_row['partner_currency_id'] or ks_company_id.currency_id.id
+                if ks_currency_id not in ks_currencies:
+                    ks_currencies[ks_currency_id] = self.env['res.currency'].browse(ks_currency_id)
+                ks_currency = ks_currencies[ks_currency_id]
+                ks_init_balance = ks_row['init_debit'] - ks_row['init_credit']
+                ks_totals[ks_partner_id] = dict(ks_row, ks_currency=ks_currency, ks_count=0)
+                ks_move_lines[ks_partner_id] = {'id': ks_partner_id, 'code': ks_partner_id, 'lines': []}
+                if not ks_currency.is_zero(ks_init_balance):
+                    ks_move_lines[ks_partner_id]['lines'].append({
+                        'debit': ks_row['init_debit'],
+                        'credit': ks_row['init_credit'],
+                        'balance': ks_init_balance,
+                        'move_name': 'Initial Balance',
+                        'partner_id': ks_partner_id,
+                        'initial_bal': True,
+                        'ending_bal': False,
+                    })
+                    ks_totals[ks_partner_id]['ks_opening'] = ks_init_balance
+                else:
+                    ks_totals[ks_partner_id]['ks_opening'] = 0.0
+            if not ks_row['ks_current']:
+                continue
+            ks_totals[ks_partner_id]['ks_count'] += 1
+            ks_move_lines[ks_partner_id]['lines'].append({
+                'lid': ks_row['lid'],
+                'ldate': ks_row['ldate'],
+                'lcode': ks_row['lcode'],
+                'account_name': ks_row['account_name'],
+                'move_name': ks_row['move_name'],
+                'lname': ks_row['lname'],
+                'debit': ks_row['debit'],
+                'credit': ks_row['credit'],
+                'balance': ks_totals[ks_partner_id]['ks_opening'] + ks_row['ks_running'],
+                'balance_currency': ks_row['balance_currency'],
+                'initial_bal': False,
+                'ending_bal': False,
+            })
+
+        ks_partner_names = dict(self.env['res.partner'].sudo().browse(list(ks_move_lines)).mapped(
+            lambda partner: (partner.id, partner.name)))
+        for ks_partner_id in list(ks_move_lines):
+            ks_total = ks_totals[ks_partner_id]
+            ks_currency = ks_total['ks_currency']
+            if ks_currency.is_zero(ks_total['end_debit']) and ks_currency.is_zero(ks_total['end_credit']):
+                ks_move_lines.pop(ks_partner_id)
+                continue
+            ks_move_lines[ks_partner_id]['lines'].append({
+                'debit': ks_total['end_debit'],
+                'credit': ks_total['end_credit'],
+                'balance': ks_total['end_debit'] - ks_total['end_credit'],
+                'ending_bal': True,
+                'initial_bal': False,
+            })
+            ks_move_lines[ks_partner_id].update({
+                'name': ks_partner_names.get(ks_partner_id),
+                'initial_balance': ks_total['init_bal_debit'] - ks_total['init_bal_credit'],
+                'debit': ks_total['end_debit'] - ks_total['init_bal_debit'],
+                'credit': ks_total['end_credit'] - ks_total['init_bal_credit'],
+                'balance': ks_total['end_debit'] - ks_total['end_credit'],
+                'company_currency_id': ks_currency.id,
+                'company_currency_symbol': ks_currency.symbol,
+                'company_currency_precision': ks_currency.rounding,
+                'company_currency_position': ks_currency.position,
+                'count': ks_total['ks_count'],
+                'pages': self.ks_fetch_page_list(ks_total['ks_count']),
+                'single_page': ks_total['ks_count'] <= 100,
+            })
+
+        _logger.info(f"Set-based Partner Ledger completed. Processed {len(ks_move_lines)} partners with data.")
+        return ks_move_lines, 0.0, 0.0, 0.0
+
     @api.model
     def ks_build_where_clause(self, ks_df_informations=False, partner_ledger=False):
         WHERE = '(1=1)'
@@ -3555,13 +3944,17 @@ class ks_dynamic_financial_base(models.Model):
         return WHERE
 
     def ks_build_detailed_move_lines(self, offset=0, partner=0, ks_df_informations=False, partner_ledger=False,
-                                     fetch_range=FETCH_RANGE):
+                                     fetch_range=FETCH_RANGE, ks_cursor=None):
         '''
         It is used for showing detailed move lines as sub lines. It is defered loading compatable
         :param offset: It is nothing but page numbers. Multiply with fetch_range to get final range
         :param partner: Integer - Partner_id
         :param fetch_range: Global Variable. Can be altered from calling model
+        :param ks_cursor: dict - Keyset position returned with the previous page ({} for the first page).
+                          When given, pages are read after that position instead of with an offset
         :return: count(int-Total rows without offset), offset(integer), ks_move_lines(list of dict)
+                 and, with ks_cursor, the cursor of the next page (False on the last page). In that
+                 case count and offset are the rows read up to and before this page, not a total
 
         Three sections,
         1. Initial Balance
@@ -3618,6 +4011,15 @@ class ks_dynamic_financial_base(models.Model):
 
         KS_ORDER_BY_CURRENT = 'l.date'
 
+        ks_keyset = ks_cursor is not None
+        ks_cursor = ks_cursor or {}
+        if ks_keyset:
+            # The pages are located by the cursor, which counts the rows already read
+            ks_offset_count = ks_cursor.get('count', 0)
+        ks_first_page = not ks_cursor.get('lid')
+        if ks_keyset:
+            KS_ORDER_BY_CURRENT, KS_WHERE_KEYSET = self._ks_keyset_clause(ks_cursor)
+
         ks_move_lines = []
         sql = ('''
                     SELECT
@@ -3635,26 +4037,33 @@ class ks_dynamic_financial_base(models.Model):
                     OFFSET %s ROWS
                     FETCH FIRST %s ROWS ONLY
                 ''') % (KS_WHERE_CURRENT, KS_ORDER_BY_CURRENT, 0, ks_offset_count)
-        cr.execute(sql)
-        ks_running_balance_list = cr.fetchall()
-        for ks_running_balance in ks_running_balance_list:
-            ks_opening_balance += ks_running_balance[0]
-        sql = ('''
-            SELECT COUNT(*)
-            FROM account_move_line l
-                JOIN account_move m ON (l.move_id=m.id)
-                JOIN account_account a ON (l.account_id=a.id)
-                LEFT JOIN res_currency c ON (l.currency_id=c.id)
-                LEFT JOIN res_currency cc ON (l.company_currency_id=cc.id)
-                LEFT JOIN res_partner p ON (l.partner_id=p.id)
-                JOIN account_journal j ON (l.journal_id=j.id)
-            WHERE %s
-        ''') % (KS_WHERE_CURRENT)
-        cr.execute(sql)
-        count = cr.fetchone()[0]
+        if ks_keyset:
+            # The running balance is carried by the cursor and the page size tells whether
+            # another page follows, so neither the leading lines nor the total are read
+            ks_opening_balance = ks_cursor.get('balance', 0.0)
+        else:
+            cr.execute(sql)
+            ks_running_balance_list = cr.fetchall()
+            for ks_running_balance in ks_running_balance_list:
+                ks_opening_balance += ks_running_balance[0]
+            sql = ('''
+                SELECT COUNT(*)
+                FROM account_move_line l
+                    JOIN account_move m ON (l.move_id=m.id)
+                    JOIN account_account a ON (l.account_id=a.id)
+                    LEFT JOIN res_currency c ON (l.currency_id=c.id)
+                    LEFT JOIN res_currency cc ON (l.company_currency_id=cc.id)
+                    LEFT JOIN res_partner p ON (l.partner_id=p.id)
+                    JOIN account_journal j ON (l.journal_id=j.id)
+                WHERE %s
+            ''') % (KS_WHERE_CURRENT)
+            cr.execute(sql)
+            count = cr.fetchone()[0]
 
         ks_initial_bal_data = 0
-        if self.env['ir.config_parameter'].sudo().get_param('ks_enable_ledger_in_bal') and \
+        # With keyset, the initial balance section only belongs to the first page
+        if (ks_first_page or not ks_keyset) and \
+                self.env['ir.config_parameter'].sudo().get_param('ks_enable_ledger_in_bal') and \
                 self.ks_date_filter.get('ks_process') == 'range':
             KSINITWHERE_CURRENT = KSINITWHERE + " AND l.date < '%s'" % ks_df_informations['date'].get('ks_start_date')
             KSINITWHERE_CURRENT += " AND l.partner_id = %s" % partner
@@ -3777,9 +4186,18 @@ class ks_dynamic_financial_base(models.Model):
                         ORDER BY %s
                         OFFSET %s ROWS
                         FETCH FIRST %s ROWS ONLY
-                    ''') % (KS_WHERE_CURRENT, KS_ORDER_BY_CURRENT, ks_offset_count, fetch_range)
-        cr.execute(sql)
-        for row in cr.dictfetchall():
+                    ''')
+        if ks_keyset:
+            # One extra row tells whether another page follows
+            cr.execute(sql % (KS_WHERE_CURRENT + KS_WHERE_KEYSET, KS_ORDER_BY_CURRENT, 0, fetch_range + 1))
+            ks_rows = cr.dictfetchall()
+            ks_has_more = len(ks_rows) > fetch_range
+            ks_rows = ks_rows[:fetch_range]
+            count = ks_offset_count + len(ks_rows)
+        else:
+            cr.execute(sql % (KS_WHERE_CURRENT, KS_ORDER_BY_CURRENT, ks_offset_count, fetch_range))
+            ks_rows = cr.dictfetchall()
+        for row in ks_rows:
             current_balance = row['balance']
             row['balance'] = ks_opening_balance + current_balance
             ks_opening_balance += current_balance
@@ -3788,7 +4206,8 @@ class ks_dynamic_financial_base(models.Model):
 
             ks_move_lines.append(row)
 
-        if ((count - ks_offset_count) <= fetch_range) and ks_df_informations.get('initial_balance'):
+        ks_last_page = not ks_has_more if ks_keyset else (count - ks_offset_count) <= fetch_range
+        if ks_last_page and ks_df_informations.get('initial_balance'):
             sql = ('''
                     SELECT
                         COALESCE(SUM(l.debit),0) AS debit,
@@ -3812,6 +4231,9 @@ class ks_dynamic_financial_base(models.Model):
             # ks_move_lines[-1]['initial_balance'] = ks_initial_bal_data
             # ks_move_lines[-1]['debit'] = ks_initial_bal_data
             # ks_move_lines[-1]['balance'] += ks_initial_bal_data
+        if ks_keyset:
+            return count, ks_offset_count, ks_move_lines, ks_has_more and self._ks_next_cursor(
+                ks_rows[-1], ks_opening_balance, count=count)
         return count, ks_offset_count, ks_move_lines
 
     ######################################################################
@@ -3830,11 +4252,13 @@ class ks_dynamic_financial_base(models.Model):
             domain.append(('category_id', 'in', self.partner_category_ids.ids))
 
         # CRITICAL OPTIMIZATION: Limit partners to prevent timeout
+        # (the set-based engine handles every partner in a single query)
+        ks_partner_limit = None if self._ks_set_based_partner_reports() else 50
         if ks_df_informations.get('ks_partner_ids', []):
             partner_ids = self.env['res.partner'].browse(
-                ks_df_informations.get('ks_partner_ids')[:50])  # Max 50 partners
+                ks_df_informations.get('ks_partner_ids')[:ks_partner_limit])  # Max 50 partners
         else:
-            partner_ids = self.env['res.partner'].sudo().search(domain, limit=50)  # Max 50 partners
+            partner_ids = self.env['res.partner'].sudo().search(domain, limit=ks_partner_limit)  # Max 50 partners
 
         WHERE = ""
         if ks_df_informations.get('ks_posted_entries') and not ks_df_informations.get('ks_unposted_entries'):
@@ -3873,20 +4297,16 @@ class ks_dynamic_financial_base(models.Model):
             ks_partner_dict = {}
             partner_ids_list = [p.id for p in ks_partner_ids]
 
+            if self._ks_set_based_partner_reports():
+                return ks_period_dict, self._ks_partner_aging_set_based(
+                    ks_df_informations, ks_period_dict, ks_type, ks_partner_ids, WHERE)
+
             # MAJOR OPTIMIZATION: Single bulk query instead of individual partner loops
             # Build aging buckets for SQL CASE statements
-            aging_cases = []
-            for ks_period in ks_period_dict:
-                period_name = ks_period_dict[ks_period]['name'].replace(' ', '_').replace('-', '_').replace('+', 'plus')
-
-                if ks_period_dict[ks_period].get('start') and ks_period_dict[ks_period].get('stop'):
-                    condition = f"COALESCE(l.date_maturity, l.date) BETWEEN '{ks_period_dict[ks_period]['start']}' AND '{ks_period_dict[ks_period]['stop']}'"
-                elif not ks_period_dict[ks_period].get('start'):
-                    condition = f"COALESCE(l.date_maturity, l.date) >= '{ks_period_dict[ks_period]['stop']}'"
-                else:
-                    condition = f"COALESCE(l.date_maturity, l.date) <= '{ks_period_dict[ks_period]['start']}'"
-
-                aging_cases.append(f"SUM(CASE WHEN {condition} THEN l.balance ELSE 0 END) AS period_{ks_period}")
+            aging_cases = [
+                f"SUM(CASE WHEN {condition} THEN l.balance ELSE 0 END) AS period_{ks_period}"
+                for ks_period, condition in self._ks_aging_bucket_conditions(ks_period_dict)
+            ]
 
             # OPTIMIZED BULK QUERY - Gets all aging data in ONE query
             bulk_aging_sql = f"""
@@ -3958,6 +4378,131 @@ class ks_dynamic_financial_base(models.Model):
             _logger.error(f"Error in optimized aging process: {str(e)}")
             return {}, {}
 
+    def _ks_aging_bucket_conditions(self, ks_period_dict):
+        """ SQL condition on the due date of the lines for each bucket of
+        ks_prepare_due_bucket_list, as a list of (period key, condition).
+        """
+        ks_conditions = []
+        for ks_period in ks_period_dict:
+            if ks_period_dict[ks_period].get('start') and ks_period_dict[ks_period].get('stop'):
+                condition = f"COALESCE(l.date_maturity, l.date) BETWEEN '{ks_period_dict[ks_period]['start']}' AND '{ks_period_dict[ks_period]['stop']}'"
+            elif not ks_period_dict[ks_period].get('start'):
+                condition = f"COALESCE(l.date_maturity, l.date) >= '{ks_period_dict[ks_period]['stop']}'"
+            else:
+                condition = f"COALESCE(l.date_maturity, l.date) <= '{ks_period_dict[ks_period]['start']}'"
+            ks_conditions.append((ks_period, condition))
+        return ks_conditions
+
+    def _ks_fetch_aging_window(self, ks_df_informations, ks_period_dict, ks_type, partner_ids, WHERE,
+                               row_from, row_to):
+        """
+        Single windowed pass over the open items of partner_ids: every returned
+        line carries the partner count, total and bucket amounts, and only the
+        lines ranked (latest first) in ]row_from, row_to] of each partner are kept.
+        """
+        ks_bucket_sums = ''.join(
+            f", SUM(CASE WHEN {condition} THEN l.balance ELSE 0 END) OVER ks_partner AS period_{ks_period}"
+            for ks_period, condition in self._ks_aging_bucket_conditions(ks_period_dict))
+        sql = """
+            SELECT * FROM (
+                SELECT
+                    l.partner_id,
+                    p.name AS partner_name,
+                    m.name AS move_name,
+                    m.id AS move_id,
+                    l.date AS date,
+                    COALESCE(l.date_maturity, l.date) AS date_maturity,
+                    j.name AS journal_name,
+                    a.name AS account_name,
+                    l.balance,
+                    l.debit,
+                    l.credit,
+                    COUNT(*) OVER ks_partner AS ks_count,
+                    SUM(l.balance) OVER ks_partner AS ks_total,
+                    ROW_NUMBER() OVER (PARTITION BY l.partner_id ORDER BY l.date DESC, l.id DESC) AS ks_row
+                    %s
+                FROM account_move_line l
+                INNER JOIN account_move m ON l.move_id = m.id
+                INNER JOIN account_account a ON l.account_id = a.id
+                INNER JOIN account_journal j ON l.journal_id = j.id
+                INNER JOIN res_partner p ON l.partner_id = p.id
+                WHERE
+                    l.balance <> 0
+                    %s
+                    AND a.account_type = %%(ks_type)s
+                    AND l.partner_id = ANY(%%(partner_ids)s)
+                    AND l.date <= %%(as_on_date)s
+                    AND l.company_id = ANY(%%(company_ids)s)
+                WINDOW ks_partner AS (PARTITION BY l.partner_id)
+            ) ks_aging
+            WHERE ks_total <> 0 AND ks_row > %%(row_from)s AND ks_row <= %%(row_to)s
+            ORDER BY partner_id, ks_row
+        """ % (ks_bucket_sums, WHERE)
+        self.env.cr.execute(sql, {
+            'ks_type': ks_type,
+            'partner_ids': list(partner_ids),
+            'as_on_date': ks_df_informations['date'].get('ks_end_date'),
+            'company_ids': ks_df_informations.get('company_ids'),
+            'row_from': row_from,
+            'row_to': row_to,
+        })
+        return self.env.cr.dictfetchall()
+
+    def _ks_partner_aging_set_based(self, ks_df_informations, ks_period_dict, ks_type, ks_partner_ids, WHERE):
+        """ Set-based counterpart of the partner loop of ks_partner_aging_process_data. """
+        company_currency_id = self.env['res.company'].sudo().browse(
+            ks_df_informations.get('company_id')).currency_id.id
+        ks_partner_dict = {
+            'Total': dict({
+                'partner_name': 'ZZZZZZZZZ',
+                'total': 0.0,
+                'company_currency_id': company_currency_id
+            }, **{ks_period_dict[ks_period]['name']: 0.0 for ks_period in ks_period_dict})
+        }
+        ks_line_keys = ('move_name', 'move_id', 'date', 'date_maturity', 'journal_name', 'account_name',
+                        'balance', 'debit', 'credit')
+        for row in self._ks_fetch_aging_window(ks_df_informations, ks_period_dict, ks_type,
+                                               ks_partner_ids.ids, WHERE, 0, 25):
+            partner_id = row['partner_id']
+            if partner_id not in ks_partner_dict:
+                ks_partner_dict[partner_id] = {
+                    'partner_name': row['partner_name'],
+                    'count': row['ks_count'],
+                    'total': row['ks_total'],
+                    'company_currency_id': company_currency_id,
+                    'pages': self.ks_fetch_page_list(row['ks_count']),
+                    'single_page': row['ks_count'] <= 50,
+                    'lines': [],
+                }
+                for ks_period in ks_period_dict:
+                    period_amount = row.get(f'period_{ks_period}', 0.0) or 0.0
+                    period_name = ks_period_dict[ks_period]['name']
+                    ks_partner_dict[partner_id][period_name] = period_amount
+                    ks_partner_dict['Total'][period_name] += period_amount
+                ks_partner_dict['Total']['total'] += row['ks_total']
+            ks_partner_dict[partner_id]['lines'].append({key: row[key] for key in ks_line_keys})
+
+        for partner_id, partner_data in ks_partner_dict.items():
+            if partner_id != 'Total':
+                self._ks_format_aging_lines(partner_data['lines'])
+        _logger.info(f"Set-based aging completed for {len(ks_partner_dict) - 1} partners with data")
+        return ks_partner_dict
+
+    def _ks_format_aging_lines(self, lines):
+        # Simple date formatting - no complex processing
+        for line in lines:
+            if line.get('date_maturity'):
+                try:
+                    if hasattr(line['date_maturity'], 'strftime'):
+                        line['date_maturity'] = line['date_maturity'].strftime('%Y-%m-%d')
+                    else:
+                        line['date_maturity'] = str(line['date_maturity'])
+                except:
+                    line['date_maturity'] = 'No Due Date'
+            else:
+                line['date_maturity'] = 'No Due Date'
+        return lines
+
     def ks_get_fast_aging_lines(self, partner_id, ks_type, WHERE, ks_as_on_date, ks_company_ids):
         """
         SUPER FAST line fetching - NO subqueries, NO complex joins
@@ -3991,22 +4536,7 @@ class ks_dynamic_financial_base(models.Model):
             """ % (WHERE, ks_type, partner_id, ks_as_on_date, '%s')
 
             self.env.cr.execute(fast_lines_sql, (ks_company_ids,))
-            lines = self.env.cr.dictfetchall()
-
-            # Simple date formatting - no complex processing
-            for line in lines:
-                if line.get('date_maturity'):
-                    try:
-                        if hasattr(line['date_maturity'], 'strftime'):
-                            line['date_maturity'] = line['date_maturity'].strftime('%Y-%m-%d')
-                        else:
-                            line['date_maturity'] = str(line['date_maturity'])
-                    except:
-                        line['date_maturity'] = 'No Due Date'
-                else:
-                    line['date_maturity'] = 'No Due Date'
-
-            return lines
+            return self._ks_format_aging_lines(self.env.cr.dictfetchall())
 
         except Exception as e:
             _logger.error(f"Error getting fast lines for partner {partner_id}: {str(e)}")
@@ -4031,6 +4561,17 @@ class ks_dynamic_financial_base(models.Model):
             else:
                 ks_type = 'liability_payable'
 
+            if self._ks_set_based_partner_reports():
+                # Slice the windowed result of this partner instead of count + fixed first page
+                ks_rows = self._ks_fetch_aging_window(ks_df_informations, ks_period_dict, ks_type, [int(ks_partner)],
+                                                      WHERE, offset * fetch_range, (offset + 1) * fetch_range)
+                if not ks_rows:
+                    return 0, 0, [], []
+                ks_line_keys = ('move_name', 'move_id', 'date', 'date_maturity', 'journal_name', 'account_name',
+                                'balance', 'debit', 'credit')
+                lines = self._ks_format_aging_lines([{key: row[key] for key in ks_line_keys} for row in ks_rows])
+                return ks_rows[0]['ks_count'], offset * fetch_range, lines, ks_period_list
+
             # Fast count query
             count_sql = """
                 SELECT COUNT(*)
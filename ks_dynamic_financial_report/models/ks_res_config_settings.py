@@ -12,4 +12,28 @@ class ResConfigSettings(models.TransientModel):
                                         config_parameter='ks_disable_bs_sign')
     ks_enable_net_tax = fields.Boolean('Enable Net Tax',
                                              config_parameter='ks_enable_net_tax')
+    ks_enable_balance_cache = fields.Boolean('Use Balance Cache',
+                                             config_parameter='ks_enable_balance_cache')
+    ks_stream_xlsx_export = fields.Boolean('Streaming Ledger Export',
+                                           config_parameter='ks_stream_xlsx_export')
+    ks_set_based_partner_reports = fields.Boolean('Set-Based Partner Reports',
+                                                  config_parameter='ks_set_based_partner_reports')
 
+    def set_values(self):
+        ks_was_enabled = self.env['ks.dfr.balance.cache']._ks_is_enabled()
+        super(ResConfigSettings, self).set_values()
+        if self.ks_enable_balance_cache and not ks_was_enabled:
+            self.env['ks.dfr.balance.cache'].sudo().ks_rebuild_cache()
+
+    def ks_action_check_balance_cache(self):
+        ks_mismatches = self.env['ks.dfr.balance.cache'].sudo().ks_check_and_rebuild_cache()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'warning' if ks_mismatches else 'success',
+                'message': _("The balance cache was out of sync on %s accounts and months and has been rebuilt.",
+                             ks_mismatches) if ks_mismatches else _("The balance cache matches the journal items."),
+                'sticky': False,
+            },
+        }
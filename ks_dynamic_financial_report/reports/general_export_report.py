@@ -1,29 +1,20 @@
 # -*- coding: utf-8 -*-
 from odoo import models, api, _
 import io
+import os
 import re
+import tempfile
 from odoo.tools.misc import xlsxwriter
 import datetime
 
+# Number of journal items fetched per round trip by the streaming export
+STREAM_CHUNK_SIZE = 2000
+
 
 class KsDynamicFinancialXlsxGLInherit(models.Model):
     _inherit = 'ks.dynamic.financial.base'
 
-    @api.model
-    def ks_get_xlsx_general_ledger(self, ks_df_informations):
-        ks_df_informations['ks_report_with_lines'] = True
-        ks_df_informations['initial_balance'] = True
-
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
-
-        move_lines = self.ks_process_general_ledger(ks_df_informations)
-        accounts_dict = move_lines[0] if isinstance(move_lines, tuple) else move_lines
-
-        ks_company_id = self.env['res.company'].sudo().browse(ks_df_informations.get('company_id'))
-
-        sheet = workbook.add_worksheet('General Ledger')
-
+    def _ks_gl_export_formats(self, workbook):
         # ==========================================
         # 1. ULTIMATE INDIAN NUMBER FORMATS (FORCING EXCEL)
         # These 3-part conditions guarantee perfect Crores, Lakhs, Thousands, and Zeros.
@@ -88,27 +79,35 @@ class KsDynamicFinancialXlsxGLInherit(models.Model):
         cell_wrap = workbook.add_format(
             {'border': 1, 'border_color': '#7a7a7a', 'align': 'left', 'valign': 'top', 'text_wrap': True})
 
-        # ==========================================
-        # 3. DETERMINE BRS COLUMN VISIBILITY
-        # ==========================================
-        bank_journals = self.env['account.journal'].search([('type', '=', 'bank')])
-        bank_account_ids = bank_journals.mapped('default_account_id').ids
-
-        has_bank_acc = False
-        for acc_key, acc_data in accounts_dict.items():
-            if acc_key == 'Total' or not isinstance(acc_data, dict): continue
-            if acc_data.get('id') in bank_account_ids:
-                has_bank_acc = True
-                break
-
-        # ==========================================
-        # 4. SET EXPANDED COLUMNS FOR CLEAR VISIBILITY
-        # ==========================================
+        return {
+            'fmt_amount_pos': fmt_amount_pos,
+            'fmt_amount_neg': fmt_amount_neg,
+            'fmt_total_pos': fmt_total_pos,
+            'fmt_total_neg': fmt_total_neg,
+            'fmt_bal_dr': fmt_bal_dr,
+            'fmt_bal_cr': fmt_bal_cr,
+            'fmt_init_bal_dr': fmt_init_bal_dr,
+            'fmt_init_bal_cr': fmt_init_bal_cr,
+            'title_fmt': title_fmt,
+            'subtitle_fmt': subtitle_fmt,
+            'header_fmt': header_fmt,
+            'account_header_fmt': account_header_fmt,
+            'init_bal_label_fmt': init_bal_label_fmt,
+            'init_bal_empty_fmt': init_bal_empty_fmt,
+            'cell_center': cell_center,
+            'cell_left': cell_left,
+            'cell_wrap': cell_wrap,
+        }
+
+    def _ks_gl_export_headers(self, has_bank_acc):
         headers = ['Date', 'Journal', 'Voucher', 'Accounts', 'Debit', 'Credit', 'Balance', 'Status',
                    'Reference / Narration']
         if has_bank_acc:
             headers.append('BRS Status')
+        return headers
 
+    def _ks_gl_export_write_title(self, sheet, fmt, ks_company_id, ks_df_informations, headers):
+        """ Writes the column widths, titles and column headers, returns the next row. """
         total_cols = len(headers)
 
         sheet.set_column(0, 0, 12)  # Date
@@ -119,16 +118,16 @@ class KsDynamicFinancialXlsxGLInherit(models.Model):
         sheet.set_column(6, 6, 20)  # Balance
         sheet.set_column(7, 7, 12)  # Status
         sheet.set_column(8, 8, 50)  # Ref/Narration
-        if has_bank_acc:
+        if total_cols > 9:
             sheet.set_column(9, 9, 14)  # BRS
 
         # ==========================================
         # 5. PRINT REPORT TITLES (MERGED FOR CENTERING)
         # ==========================================
         row = 0
-        sheet.merge_range(row, 0, row, total_cols - 1, ks_company_id.name, title_fmt)
+        sheet.merge_range(row, 0, row, total_cols - 1, ks_company_id.name, fmt['title_fmt'])
         row += 1
-        sheet.merge_range(row, 0, row, total_cols - 1, 'General Ledger', subtitle_fmt)
+        sheet.merge_range(row, 0, row, total_cols - 1, 'General Ledger', fmt['subtitle_fmt'])
         row += 1
 
         if ks_df_informations.get('date') and ks_df_informations['date'].get('ks_start_date'):
@@ -143,14 +142,183 @@ class KsDynamicFinancialXlsxGLInherit(models.Model):
             except Exception:
                 pass
             date_str = f"Period: {s_date} To {e_date}"
-            sheet.merge_range(row, 0, row, total_cols - 1, date_str, subtitle_fmt)
+            sheet.merge_range(row, 0, row, total_cols - 1, date_str, fmt['subtitle_fmt'])
         row += 2
 
         for col, header in enumerate(headers):
-            sheet.write(row, col, header, header_fmt)
+            sheet.write(row, col, header, fmt['header_fmt'])
         row += 1
 
         sheet.freeze_panes(row, 0)
+        return row
+
+    def _ks_gl_export_write_account(self, sheet, row, fmt, account_key, account_data, total_cols):
+        """ Writes the account header (UNMERGED), returns the next row. """
+        actual_code = account_data.get('code', account_key)
+        actual_name = account_data.get('name', '')
+        main_grp = account_data.get('main_group', 'N/A')
+        sub_grp = account_data.get('sub_group', 'N/A')
+        ss_grp = account_data.get('sub_sub_group', 'N/A')
+
+        acc_header_text = f"Account: {actual_code} {actual_name}    [ Main Group: {main_grp}  |  Sub Group: {sub_grp}  |  Sub Sub Group: {ss_grp} ]"
+        sheet.write(row, 0, acc_header_text, fmt['account_header_fmt'])
+        for col_idx in range(1, total_cols):
+            sheet.write(row, col_idx, '', fmt['account_header_fmt'])
+        return row + 1
+
+    def _ks_gl_export_write_initial(self, sheet, row, fmt, start_balance, has_bank_acc):
+        """ Writes the Initial Balance row, returns the next row. """
+        sheet.write(row, 0, '', fmt['init_bal_label_fmt'])
+        sheet.write(row, 1, '', fmt['init_bal_label_fmt'])
+        sheet.write(row, 2, '', fmt['init_bal_label_fmt'])
+        sheet.write(row, 3, "Initial Balance", fmt['init_bal_label_fmt'])
+        sheet.write(row, 4, '', fmt['init_bal_empty_fmt'])
+        sheet.write(row, 5, '', fmt['init_bal_empty_fmt'])
+
+        # Apply format based on Dr/Cr logic safely using absolute values
+        if start_balance >= 0:
+            sheet.write_number(row, 6, abs(start_balance), fmt['fmt_init_bal_dr'])
+        else:
+            sheet.write_number(row, 6, abs(start_balance), fmt['fmt_init_bal_cr'])
+
+        sheet.write(row, 7, '', fmt['init_bal_empty_fmt'])
+        sheet.write(row, 8, '', fmt['init_bal_empty_fmt'])
+        if has_bank_acc:
+            sheet.write(row, 9, '', fmt['init_bal_empty_fmt'])
+        return row + 1
+
+    def _ks_gl_export_write_line(self, sheet, row, fmt, line, has_bank_acc, is_bank_account):
+        """ Writes one journal item, returns the next row with its debit and credit. """
+        opp_acc_raw = str(line.get('corresponding_accounts') or '')
+        if opp_acc_raw:
+            raw_list = opp_acc_raw.split(', ')
+            clean_list = [re.sub(r'^\d+\s*-?\s*', '', o.strip()) for o in raw_list if o.strip()]
+            opp_acc_clean = '\n'.join(clean_list)
+        else:
+            opp_acc_clean = ''
+
+        lref = str(line.get('lref') or '').strip().replace('\n', ' ')
+        lname = str(line.get('lname') or '').strip().replace('\n', ' ')
+        if lref and lname and lref != lname:
+            ref_narration = f"{lref}\n{lname}"
+        else:
+            ref_narration = lref or lname
+
+        newlines_opp = opp_acc_clean.count('\n') if opp_acc_clean else 0
+        newlines_ref = ref_narration.count('\n') if ref_narration else 0
+        max_lines = max(newlines_opp, newlines_ref) + 1
+
+        if max_lines > 1:
+            sheet.set_row(row, 15 * max_lines)
+
+        ldate = line.get('ldate', '')
+        if ldate and isinstance(ldate, (datetime.date, datetime.datetime)):
+            ldate = ldate.strftime('%d/%m/%Y')
+        elif isinstance(ldate, str) and '-' in ldate:
+            try:
+                ldate = datetime.datetime.strptime(ldate, '%Y-%m-%d').strftime('%d/%m/%Y')
+            except:
+                pass
+
+        sheet.write(row, 0, ldate, fmt['cell_center'])
+        sheet.write(row, 1, line.get('lcode', ''), fmt['cell_center'])
+        sheet.write(row, 2, line.get('move_name', ''), fmt['cell_left'])
+        sheet.write(row, 3, opp_acc_clean, fmt['cell_wrap'])
+
+        debit = float(line.get('debit', 0.0))
+        credit = float(line.get('credit', 0.0))
+        balance = float(line.get('balance', 0.0))
+
+        if debit >= 0:
+            sheet.write_number(row, 4, abs(debit), fmt['fmt_amount_pos'])
+        else:
+            sheet.write_number(row, 4, abs(debit), fmt['fmt_amount_neg'])
+
+        if credit >= 0:
+            sheet.write_number(row, 5, abs(credit), fmt['fmt_amount_pos'])
+        else:
+            sheet.write_number(row, 5, abs(credit), fmt['fmt_amount_neg'])
+
+        if balance >= 0:
+            sheet.write_number(row, 6, abs(balance), fmt['fmt_bal_dr'])
+        else:
+            sheet.write_number(row, 6, abs(balance), fmt['fmt_bal_cr'])
+
+        sheet.write(row, 7, line.get('move_state', ''), fmt['cell_center'])
+        sheet.write(row, 8, ref_narration, fmt['cell_wrap'])
+
+        if has_bank_acc:
+            brs = line.get('brs_status_en', '') if is_bank_account else ''
+            sheet.write(row, 9, brs, fmt['cell_center'])
+
+        return row + 1, debit, credit
+
+    def _ks_gl_export_write_total(self, sheet, row, fmt, start_balance, total_debit, total_credit, has_bank_acc):
+        """ Writes the account total row (UNMERGED), returns the next row. """
+        sheet.write(row, 0, '', fmt['init_bal_label_fmt'])
+        sheet.write(row, 1, '', fmt['init_bal_label_fmt'])
+        sheet.write(row, 2, '', fmt['init_bal_label_fmt'])
+        sheet.write(row, 3, "Total:", fmt['init_bal_label_fmt'])
+
+        if total_debit >= 0:
+            sheet.write_number(row, 4, abs(total_debit), fmt['fmt_total_pos'])
+        else:
+            sheet.write_number(row, 4, abs(total_debit), fmt['fmt_total_neg'])
+
+        if total_credit >= 0:
+            sheet.write_number(row, 5, abs(total_credit), fmt['fmt_total_pos'])
+        else:
+            sheet.write_number(row, 5, abs(total_credit), fmt['fmt_total_neg'])
+
+        # FIX: Manually calculating the final balance to prevent the module's doubling bug
+        calculated_final_balance = start_balance + total_debit - total_credit
+
+        if calculated_final_balance >= 0:
+            sheet.write_number(row, 6, abs(calculated_final_balance), fmt['fmt_init_bal_dr'])
+        else:
+            sheet.write_number(row, 6, abs(calculated_final_balance), fmt['fmt_init_bal_cr'])
+
+        sheet.write(row, 7, '', fmt['init_bal_empty_fmt'])
+        sheet.write(row, 8, '', fmt['init_bal_empty_fmt'])
+        if has_bank_acc:
+            sheet.write(row, 9, '', fmt['init_bal_empty_fmt'])
+        return row + 2
+
+    @api.model
+    def ks_get_xlsx_general_ledger(self, ks_df_informations):
+        ks_df_informations['ks_report_with_lines'] = True
+        ks_df_informations['initial_balance'] = True
+
+        output = io.BytesIO()
+        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+
+        move_lines = self.ks_process_general_ledger(ks_df_informations)
+        accounts_dict = move_lines[0] if isinstance(move_lines, tuple) else move_lines
+
+        ks_company_id = self.env['res.company'].sudo().browse(ks_df_informations.get('company_id'))
+
+        sheet = workbook.add_worksheet('General Ledger')
+        fmt = self._ks_gl_export_formats(workbook)
+
+        # ==========================================
+        # 3. DETERMINE BRS COLUMN VISIBILITY
+        # ==========================================
+        bank_journals = self.env['account.journal'].search([('type', '=', 'bank')])
+        bank_account_ids = bank_journals.mapped('default_account_id').ids
+
+        has_bank_acc = False
+        for acc_key, acc_data in accounts_dict.items():
+            if acc_key == 'Total' or not isinstance(acc_data, dict): continue
+            if acc_data.get('id') in bank_account_ids:
+                has_bank_acc = True
+                break
+
+        # ==========================================
+        # 4. SET EXPANDED COLUMNS FOR CLEAR VISIBILITY
+        # ==========================================
+        headers = self._ks_gl_export_headers(has_bank_acc)
+        total_cols = len(headers)
+        row = self._ks_gl_export_write_title(sheet, fmt, ks_company_id, ks_df_informations, headers)
 
         # ==========================================
         # 6. PRINT TRANSACTION DATA
@@ -160,18 +328,7 @@ class KsDynamicFinancialXlsxGLInherit(models.Model):
                 continue
 
             is_bank_account = account_data.get('id') in bank_account_ids
-            actual_code = account_data.get('code', account_key)
-            actual_name = account_data.get('name', '')
-            main_grp = account_data.get('main_group', 'N/A')
-            sub_grp = account_data.get('sub_group', 'N/A')
-            ss_grp = account_data.get('sub_sub_group', 'N/A')
-
-            # Clean Account Header (UNMERGED)
-            acc_header_text = f"Account: {actual_code} {actual_name}    [ Main Group: {main_grp}  |  Sub Group: {sub_grp}  |  Sub Sub Group: {ss_grp} ]"
-            sheet.write(row, 0, acc_header_text, account_header_fmt)
-            for col_idx in range(1, total_cols):
-                sheet.write(row, col_idx, '', account_header_fmt)
-            row += 1
+            row = self._ks_gl_export_write_account(sheet, row, fmt, account_key, account_data, total_cols)
 
             total_debit = 0.0
             total_credit = 0.0
@@ -191,25 +348,7 @@ class KsDynamicFinancialXlsxGLInherit(models.Model):
             if not has_init_bal:
                 start_balance = float(account_data.get('initial_balance', 0.0))
 
-            # Print Initial Balance Row
-            sheet.write(row, 0, '', init_bal_label_fmt)
-            sheet.write(row, 1, '', init_bal_label_fmt)
-            sheet.write(row, 2, '', init_bal_label_fmt)
-            sheet.write(row, 3, "Initial Balance", init_bal_label_fmt)
-            sheet.write(row, 4, '', init_bal_empty_fmt)
-            sheet.write(row, 5, '', init_bal_empty_fmt)
-
-            # Apply format based on Dr/Cr logic safely using absolute values
-            if start_balance >= 0:
-                sheet.write_number(row, 6, abs(start_balance), fmt_init_bal_dr)
-            else:
-                sheet.write_number(row, 6, abs(start_balance), fmt_init_bal_cr)
-
-            sheet.write(row, 7, '', init_bal_empty_fmt)
-            sheet.write(row, 8, '', init_bal_empty_fmt)
-            if has_bank_acc:
-                sheet.write(row, 9, '', init_bal_empty_fmt)
-            row += 1
+            row = self._ks_gl_export_write_initial(sheet, row, fmt, start_balance, has_bank_acc)
 
             # ----------------------------------------------------
             # TRANSACTION LINES
@@ -217,110 +356,213 @@ class KsDynamicFinancialXlsxGLInherit(models.Model):
             for line in account_data.get('lines', []):
                 if line.get('initial_bal') or line.get('ending_bal'):
                     continue
-
-                opp_acc_raw = str(line.get('corresponding_accounts') or '')
-                if opp_acc_raw:
-                    raw_list = opp_acc_raw.split(', ')
-                    clean_list = [re.sub(r'^\d+\s*-?\s*', '', o.strip()) for o in raw_list if o.strip()]
-                    opp_acc_clean = '\n'.join(clean_list)
-                else:
-                    opp_acc_clean = ''
-
-                lref = str(line.get('lref') or '').strip().replace('\n', ' ')
-                lname = str(line.get('lname') or '').strip().replace('\n', ' ')
-                if lref and lname and lref != lname:
-                    ref_narration = f"{lref}\n{lname}"
-                else:
-                    ref_narration = lref or lname
-
-                newlines_opp = opp_acc_clean.count('\n') if opp_acc_clean else 0
-                newlines_ref = ref_narration.count('\n') if ref_narration else 0
-                max_lines = max(newlines_opp, newlines_ref) + 1
-
-                if max_lines > 1:
-                    sheet.set_row(row, 15 * max_lines)
-
-                ldate = line.get('ldate', '')
-                if ldate and isinstance(ldate, (datetime.date, datetime.datetime)):
-                    ldate = ldate.strftime('%d/%m/%Y')
-                elif isinstance(ldate, str) and '-' in ldate:
-                    try:
-                        ldate = datetime.datetime.strptime(ldate, '%Y-%m-%d').strftime('%d/%m/%Y')
-                    except:
-                        pass
-
-                sheet.write(row, 0, ldate, cell_center)
-                sheet.write(row, 1, line.get('lcode', ''), cell_center)
-                sheet.write(row, 2, line.get('move_name', ''), cell_left)
-                sheet.write(row, 3, opp_acc_clean, cell_wrap)
-
-                debit = float(line.get('debit', 0.0))
-                credit = float(line.get('credit', 0.0))
-                balance = float(line.get('balance', 0.0))
-
+                row, debit, credit = self._ks_gl_export_write_line(
+                    sheet, row, fmt, line, has_bank_acc, is_bank_account)
                 total_debit += debit
                 total_credit += credit
 
-                if debit >= 0:
-                    sheet.write_number(row, 4, abs(debit), fmt_amount_pos)
-                else:
-                    sheet.write_number(row, 4, abs(debit), fmt_amount_neg)
-
-                if credit >= 0:
-                    sheet.write_number(row, 5, abs(credit), fmt_amount_pos)
-                else:
-                    sheet.write_number(row, 5, abs(credit), fmt_amount_neg)
-
-                if balance >= 0:
-                    sheet.write_number(row, 6, abs(balance), fmt_bal_dr)
-                else:
-                    sheet.write_number(row, 6, abs(balance), fmt_bal_cr)
-
-                sheet.write(row, 7, line.get('move_state', ''), cell_center)
-                sheet.write(row, 8, ref_narration, cell_wrap)
-
-                if has_bank_acc:
-                    brs = line.get('brs_status_en', '') if is_bank_account else ''
-                    sheet.write(row, 9, brs, cell_center)
-
-                row += 1
+            row = self._ks_gl_export_write_total(
+                sheet, row, fmt, start_balance, total_debit, total_credit, has_bank_acc)
 
-            # ----------------------------------------------------
-            # ACCOUNT TOTAL ROW (UNMERGED) & BUG FIX
-            # ----------------------------------------------------
-            sheet.write(row, 0, '', init_bal_label_fmt)
-            sheet.write(row, 1, '', init_bal_label_fmt)
-            sheet.write(row, 2, '', init_bal_label_fmt)
-            sheet.write(row, 3, "Total:", init_bal_label_fmt)
+        workbook.close()
+        output.seek(0)
+        generated_file = output.read()
+        output.close()
 
-            if total_debit >= 0:
-                sheet.write_number(row, 4, abs(total_debit), fmt_total_pos)
-            else:
-                sheet.write_number(row, 4, abs(total_debit), fmt_total_neg)
+        return generated_file
+
+    def _ks_gl_stream_lines(self, query, params):
+        """ Yields the journal items of query through a server-side cursor,
+        STREAM_CHUNK_SIZE rows at a time, with their corresponding accounts.
+        """
+        cr = self.env.cr
+        cr.execute("DECLARE ks_gl_export_cursor NO SCROLL CURSOR FOR " + query, params)
+        while True:
+            cr.execute("FETCH FORWARD %s FROM ks_gl_export_cursor", (STREAM_CHUNK_SIZE,))
+            rows = cr.dictfetchall()
+            if not rows:
+                break
 
-            if total_credit >= 0:
-                sheet.write_number(row, 5, abs(total_credit), fmt_total_pos)
-            else:
-                sheet.write_number(row, 5, abs(total_credit), fmt_total_neg)
+            # Corresponding accounts of the moves of this chunk only
+            corr_acc_map = {}
+            cr.execute("""
+                SELECT aml.move_id, aml.id, aa.code, aa.name, aml.debit, aml.credit
+                FROM account_move_line aml
+                JOIN account_account aa ON aa.id = aml.account_id
+                WHERE aml.move_id IN %s
+            """, (tuple({row['move_id'] for row in rows}),))
+            for corr_row in cr.dictfetchall():
+                corr_acc_map.setdefault(corr_row['move_id'], []).append(corr_row)
+
+            for row in rows:
+                corr_strs = []
+                for corr_row in corr_acc_map.get(row['move_id'], []):
+                    if corr_row['id'] != row['lid']:
+                        net = corr_row['debit'] - corr_row['credit']
+                        dr_cr = ' (Dr)' if net >= 0 else ' (Cr)'
+                        corr_strs.append(f"{corr_row['code']} {corr_row['name']}: {abs(net):,.2f}{dr_cr}")
+                row['corresponding_accounts'] = ', '.join(corr_strs)
+                yield row
+        cr.execute("CLOSE ks_gl_export_cursor")
 
-            # FIX: Manually calculating the final balance to prevent the module's doubling bug
-            calculated_final_balance = start_balance + total_debit - total_credit
+    @api.model
+    def ks_get_xlsx_general_ledger_stream(self, ks_df_informations):
+        """ Constant-memory variant of ks_get_xlsx_general_ledger.
 
-            if calculated_final_balance >= 0:
-                sheet.write_number(row, 6, abs(calculated_final_balance), fmt_init_bal_dr)
-            else:
-                sheet.write_number(row, 6, abs(calculated_final_balance), fmt_init_bal_cr)
+        Only the per-account totals are computed upfront; the journal items
+        are read through a server-side cursor and written row by row with
+        xlsxwriter's constant_memory mode to a temporary file.
 
-            sheet.write(row, 7, '', init_bal_empty_fmt)
-            sheet.write(row, 8, '', init_bal_empty_fmt)
-            if has_bank_acc:
-                sheet.write(row, 9, '', init_bal_empty_fmt)
+        :return: path of the generated file, to be removed by the caller
+        """
+        ks_df_informations['ks_report_with_lines'] = True
+        ks_df_informations['initial_balance'] = True
+        cr = self.env.cr
 
-            row += 2
+        WHERE, account_domain = self.ks_df_where_clause(ks_df_informations)
+        if ks_df_informations.get('ks_partner_ids'):
+            partner_ids = [int(p) for p in ks_df_informations.get('ks_partner_ids', [])]
+            if partner_ids:
+                WHERE += " AND p.id IN (%s)" % ",".join(map(str, partner_ids))
 
-        workbook.close()
-        output.seek(0)
-        generated_file = output.read()
-        output.close()
+        ks_company_id = self.env['res.company'].sudo().browse(ks_df_informations.get('company_id'))
+        ks_account_ids = self.env['account.account'].sudo().search(account_domain)
+        selected_account_ids = [acc.get('id') for acc in ks_df_informations.get('account', []) if acc.get('selected')]
+        if selected_account_ids:
+            ks_account_ids = ks_account_ids.filtered(lambda acc: acc.id in selected_account_ids)
+        accounts_dict = {
+            x.code: {
+                'name': x.name,
+                'code': x.code,
+                'id': x.id,
+                'main_group': dict(x._fields['main_group'].selection).get(x.main_group) or '',
+                'sub_group': dict(x._fields['account_type'].selection).get(x.account_type) or '',
+                'sub_sub_group': x.sub_sub_group_id.name or '',
+                'internal_group': x.internal_group,
+                'currency': x.company_id.currency_id or ks_company_id.currency_id,
+            } for x in sorted(ks_account_ids, key=lambda a: a.code)
+        }
+
+        ks_start_date = ks_df_informations['date'].get('ks_start_date')
+        ks_end_date = ks_df_informations['date'].get('ks_end_date')
+        is_range_process = ks_df_informations['date']['ks_process'] == 'range'
+        if is_range_process:
+            KS_WHERE_INIT = WHERE + " AND l.date < '%s'" % ks_start_date
+            KS_WHERE_CURRENT = WHERE + " AND l.date >= '%s' AND l.date <= '%s'" % (ks_start_date, ks_end_date)
+        else:
+            KS_WHERE_INIT = WHERE
+            KS_WHERE_CURRENT = WHERE + " AND l.date <= '%s'" % ks_end_date
+        KS_FROM = '''
+            FROM account_move_line l
+            JOIN account_move m ON (l.move_id=m.id)
+            JOIN account_account a ON (l.account_id=a.id)
+            LEFT JOIN res_partner p ON (l.partner_id=p.id)
+            JOIN account_journal j ON (l.journal_id=j.id)
+        '''
+
+        ks_opening = {}
+        ks_period = {}
+        if accounts_dict:
+            tuple_acc_ids = tuple(ks_account_ids.ids)
+            cr.execute(('SELECT a.code AS account_code, COALESCE(SUM(l.debit - l.credit), 0) AS balance'
+                        + KS_FROM + 'WHERE %s AND a.id IN %%s GROUP BY a.code') % KS_WHERE_INIT, (tuple_acc_ids,))
+            ks_opening = {row['account_code']: row['balance'] for row in cr.dictfetchall()}
+            cr.execute(('SELECT a.code AS account_code, COALESCE(SUM(l.debit), 0) AS debit, '
+                        'COALESCE(SUM(l.credit), 0) AS credit'
+                        + KS_FROM + 'WHERE %s AND a.id IN %%s GROUP BY a.code') % KS_WHERE_CURRENT, (tuple_acc_ids,))
+            ks_period = {row['account_code']: row for row in cr.dictfetchall()}
+
+        # Same visibility rule as ks_process_general_ledger
+        show_all = ks_df_informations.get('ks_show_all_accounts', False)
+        is_ledger_bal_enabled = self.env['ir.config_parameter'].sudo().get_param('ks_enable_ledger_in_bal')
+        for ks_code in list(accounts_dict):
+            ks_currency = accounts_dict[ks_code]['currency']
+            ks_totals = ks_period.get(ks_code, {})
+            # The ledger balance of balance sheet accounts covers the same lines as the opening balance
+            initial_balance_for_summary = 0.0
+            if is_ledger_bal_enabled and accounts_dict[ks_code]['internal_group'] not in ['income', 'expense'] \
+                    and is_range_process:
+                initial_balance_for_summary = ks_opening.get(ks_code, 0.0)
+
+            is_zero_account = ks_currency.is_zero(ks_opening.get(ks_code, 0.0)) and \
+                              ks_currency.is_zero(initial_balance_for_summary) and \
+                              ks_currency.is_zero(ks_totals.get('debit', 0.0)) and \
+                              ks_currency.is_zero(ks_totals.get('credit', 0.0))
+            if not show_all and is_zero_account:
+                accounts_dict.pop(ks_code)
 
-        return generated_file
\ No newline at end of file
+        bank_journals = self.env['account.journal'].search([('type', '=', 'bank')])
+        bank_account_ids = bank_journals.mapped('default_account_id').ids
+        has_bank_acc = any(acc_data['id'] in bank_account_ids for acc_data in accounts_dict.values())
+
+        lang = self.env.user.lang
+        lang_id_obj = self.env['res.lang'].search([('code', '=', lang)], limit=1)
+        lang_date_format = lang_id_obj['date_format'].replace('/', '-') if lang_id_obj else '%Y-%m-%d'
+
+        fd, path = tempfile.mkstemp(prefix='ks_general_ledger_', suffix='.xlsx')
+        os.close(fd)
+        try:
+            workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+            sheet = workbook.add_worksheet('General Ledger')
+            fmt = self._ks_gl_export_formats(workbook)
+            headers = self._ks_gl_export_headers(has_bank_acc)
+            total_cols = len(headers)
+            row = self._ks_gl_export_write_title(sheet, fmt, ks_company_id, ks_df_informations, headers)
+
+            ks_lines = iter(())
+            if accounts_dict:
+                # Accounts are written in code order: the items must follow the same (bytewise) order
+                ks_lines = self._ks_gl_stream_lines(('''
+                    SELECT
+                        a.code AS account_code,
+                        l.id AS lid,
+                        l.date AS ldate,
+                        j.name AS lcode,
+                        m.name AS move_name,
+                        m.state AS move_state,
+                        l.ref AS lref,
+                        l.narration AS lname,
+                        l.is_brs_cleared,
+                        l.move_id,
+                        COALESCE(l.debit,0) AS debit,
+                        COALESCE(l.credit,0) AS credit
+                ''' + KS_FROM + '''
+                    WHERE %s AND a.id IN %%s
+                    ORDER BY a.code COLLATE "C", l.date, l.create_date, l.id
+                ''') % KS_WHERE_CURRENT, (tuple(acc['id'] for acc in accounts_dict.values()),))
+            pending = next(ks_lines, None)
+
+            for account_key, account_data in accounts_dict.items():
+                is_bank_account = account_data['id'] in bank_account_ids
+                row = self._ks_gl_export_write_account(sheet, row, fmt, account_key, account_data, total_cols)
+
+                start_balance = float(ks_opening.get(account_key, 0.0))
+                row = self._ks_gl_export_write_initial(sheet, row, fmt, start_balance, has_bank_acc)
+
+                total_debit = 0.0
+                total_credit = 0.0
+                running_balance = start_balance
+                while pending is not None and pending['account_code'] <= account_key:
+                    if pending['account_code'] == account_key:
+                        running_balance += pending['debit'] - pending['credit']
+                        pending['balance'] = running_balance
+                        pending['ldate'] = pending['ldate'].strftime(lang_date_format)
+                        if is_bank_account:
+                            pending['brs_status_en'] = 'Cleared' if pending.get('is_brs_cleared') else 'Pending'
+                        row, debit, credit = self._ks_gl_export_write_line(
+                            sheet, row, fmt, pending, has_bank_acc, is_bank_account)
+                        total_debit += debit
+                        total_credit += credit
+                    pending = next(ks_lines, None)
+
+                row = self._ks_gl_export_write_total(
+                    sheet, row, fmt, start_balance, total_debit, total_credit, has_bank_acc)
+
+            # Exhaust the generator so that the server-side cursor gets closed
+            for pending in ks_lines:
+                pass
+            workbook.close()
+        except Exception:
+            os.unlink(path)
+            raise
+        return path
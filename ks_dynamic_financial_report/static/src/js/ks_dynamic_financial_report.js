@@ -117,6 +117,7 @@ odoo.define('ks_dynamic_financial_report.dynamic_report', function (require) {
             'click .ks_pl-py-mline': 'ksGetPlMoveLines',
             'click .ks_pr-py-mline': 'ksGetAgedLinesInfo',
             'click .ks_cj-py-mline': 'ksGetConsolidateInfo',
+            'click .ks_py-mline-more': 'ksLoadMoreMoveLines',
             'click .ks_report_pdf': 'ksReportPrintPdf',
             'click .ks_report_xlsx': 'ksPrintReportXlsx',
             'click [action]': 'ksGetAction',
@@ -468,16 +469,109 @@ odoo.define('ks_dynamic_financial_report.dynamic_report', function (require) {
         /**
          * @method to get general ledger line by page
          */
-        ksGetGlLineByPage: function (offset, account_id) {
+        ksGetGlLineByPage: function (offset, account_id, cursor) {
             var self = this;
 
             return self._rpc({
                 model: self.ks_dyn_fin_model,
                 method: 'ks_build_detailed_gen_move_lines',
                 args: [self.ks_report_id, offset, account_id, self.ks_df_report_opt],
+                kwargs: {ks_cursor: cursor || {}},
             });
         },
 
+        /**
+         * @method to format the general ledger move lines of a page
+         */
+        ksFormatGlLines: function (lines) {
+            var self = this;
+            _.each(lines, function (k, v) {
+                var ksFormatConfigurations = {
+                    currency_id: k.company_currency_id,
+                    noSymbol: true,
+                };
+                k.debit = self.ksFormatCurrencySign(k.debit, ksFormatConfigurations, k.debit < 0 ? '-' : '');
+                k.credit = self.ksFormatCurrencySign(k.credit, ksFormatConfigurations, k.credit < 0 ? '-' : '');
+                // --- Start Modification for Dr/Cr ---
+
+                // 1. Format Balance with Dr/Cr
+                if (k.balance) {
+                    // If balance exists (not 0), checks if negative (Cr) or positive (Dr)
+                    var bal_suffix = k.balance < 0 ? ' Cr' : ' Dr';
+                    // Pass empty string '' as sign to get absolute value (no minus sign), then append suffix
+                    k.balance = self.ksFormatCurrencySign(k.balance, ksFormatConfigurations, '') + bal_suffix;
+                } else {
+                    // If balance is 0, keep standard formatting (usually '-')
+                    k.balance = self.ksFormatCurrencySign(k.balance, ksFormatConfigurations, '');
+                }
+
+                // 2. Format Initial Balance with Dr/Cr
+                if (k.initial_balance) {
+                    var init_suffix = k.initial_balance < 0 ? ' Cr' : ' Dr';
+                    k.initial_balance = self.ksFormatCurrencySign(k.initial_balance, ksFormatConfigurations, '') + init_suffix;
+                } else {
+                    k.initial_balance = self.ksFormatCurrencySign(k.initial_balance, ksFormatConfigurations, '');
+                }
+
+                // --- End Modification ---
+                k.ldate = field_utils.format.date(field_utils.parse.date(k.ldate, {}, {
+                    isUTC: true
+                }));
+            });
+        },
+
+        /**
+         * @method to format the profit and loss move lines of a page
+         */
+        ksFormatPlLines: function (lines) {
+            var self = this;
+            _.each(lines, function (k, v) {
+                var ksFormatConfigurations = {
+                    currency_id: k.company_currency_id,
+                    noSymbol: true,
+                };
+                k.debit = self.ksFormatCurrencySign(k.debit, ksFormatConfigurations, k.debit < 0 ? '-' : '');
+                k.credit = self.ksFormatCurrencySign(k.credit, ksFormatConfigurations, k.credit < 0 ? '-' : '');
+                k.balance = self.ksFormatCurrencySign(k.balance, ksFormatConfigurations, k.balance < 0 ? '-' : '');
+                k.initial_balance = self.ksFormatCurrencySign(k.initial_balance, ksFormatConfigurations, k.initial_balance < 0 ? '-' : '');
+                k.ldate = field_utils.format.date(field_utils.parse.date(k.ldate, {}, {
+                    isUTC: true
+                }));
+            });
+        },
+
+        /**
+         * @method to render a page of move lines below an account line
+         * The first page replaces the move lines, the next ones are appended to them.
+         * datas[3] is the cursor of the next page, a "Load more" link is shown while there is one.
+         */
+        ksRenderMoveLinesPage: function ($accountLine, template, datas, append) {
+            var $td = $accountLine.next('tr').find('td');
+            var $page = $(QWeb.render(template, {
+                count: datas[0],
+                offset: datas[1],
+                account_data: datas[2],
+                ks_enable_ledger_in_bal: this.ks_enable_ledger_in_bal,
+            }));
+            if (append) {
+                $td.find('.ks_py-mline-table-div tbody:first').append($page.find('tbody:first').children());
+            } else {
+                $td.find('.ks_py-mline-table-div').remove();
+                $td.find('ul').after($page);
+                $td.find('ul li:first a').css({
+                    'background-color': '#00ede8',
+                    'font-weight': 'bold',
+                });
+            }
+            $accountLine.data('ksCursor', datas[3] || false);
+            $td.find('.ks_py-mline-more-div').remove();
+            if (datas[3]) {
+                $td.find('.ks_py-mline-table-div').append(
+                    $('<div class="ks_py-mline-more-div text-center p-2"/>').append(
+                        $('<a class="ks_py-mline-more" href="#"/>').text(_t('Load more'))));
+            }
+        },
+
         /**
          * @method to get move line by page
          */
@@ -486,57 +580,15 @@ odoo.define('ks_dynamic_financial_report.dynamic_report', function (require) {
 
             $('.o_filter_menu').removeClass('ks_d_block')
             var self = this;
-            var account_id = $(event.currentTarget).data('bsAccountId');
+            var $accountLine = $(event.currentTarget);
+            var account_id = $accountLine.data('bsAccountId');
             var offset = 0;
-            var td = $(event.currentTarget).next('tr').find('td');
+            var td = $accountLine.next('tr').find('td');
 
             if (td.length == 1) {
                 self.ksGetGlLineByPage(offset, account_id).then(function (datas) {
-                    _.each(datas[2], function (k, v) {
-                        var ksFormatConfigurations = {
-                            currency_id: k.company_currency_id,
-                            noSymbol: true,
-                        };
-                        k.debit = self.ksFormatCurrencySign(k.debit, ksFormatConfigurations, k.debit < 0 ? '-' : '');
-                        k.credit = self.ksFormatCurrencySign(k.credit, ksFormatConfigurations, k.credit < 0 ? '-' : '');
-                        // --- Start Modification for Dr/Cr ---
-
-                        // 1. Format Balance with Dr/Cr
-                        if (k.balance) {
-    // If balance exists (not 0), checks if negative (Cr) or positive (Dr)
-                        var bal_suffix = k.balance < 0 ? ' Cr' : ' Dr';
-    // Pass empty string '' as sign to get absolute value (no minus sign), then append suffix
-                        k.balance = self.ksFormatCurrencySign(k.balance, ksFormatConfigurations, '') + bal_suffix;
-                        } else {
-    // If balance is 0, keep standard formatting (usually '-')
-                        k.balance = self.ksFormatCurrencySign(k.balance, ksFormatConfigurations, '');
-                        }
-
-// 2. Format Initial Balance with Dr/Cr
-if (k.initial_balance) {
-    var init_suffix = k.initial_balance < 0 ? ' Cr' : ' Dr';
-    k.initial_balance = self.ksFormatCurrencySign(k.initial_balance, ksFormatConfigurations, '') + init_suffix;
-} else {
-    k.initial_balance = self.ksFormatCurrencySign(k.initial_balance, ksFormatConfigurations, '');
-}
-
-// --- End Modification ---
-                        k.ldate = field_utils.format.date(field_utils.parse.date(k.ldate, {}, {
-                            isUTC: true
-                        }));
-                    });
-                    $(event.currentTarget).next('tr').find('td .ks_py-mline-table-div').remove();
-                    $(event.currentTarget).next('tr').find('td ul').after(
-                        QWeb.render('ks_df_gl_subsection', {
-                            count: datas[0],
-                            offset: datas[1],
-                            account_data: datas[2],
-                            ks_enable_ledger_in_bal: self.ks_enable_ledger_in_bal,
-                        }))
-                    $(event.currentTarget).next('tr').find('td ul li:first a').css({
-                        'background-color': '#00ede8',
-                        'font-weight': 'bold',
-                    });
+                    self.ksFormatGlLines(datas[2]);
+                    self.ksRenderMoveLinesPage($accountLine, 'ks_df_gl_subsection', datas, false);
                 })
             }
         },
@@ -544,12 +596,13 @@ if (k.initial_balance) {
         /**
          * @method to get profit and loss lines by page
          */
-        ksGetPlLinesByPage: function (offset, account_id) {
+        ksGetPlLinesByPage: function (offset, account_id, cursor) {
             var self = this;
             return self._rpc({
                 model: self.ks_dyn_fin_model,
                 method: 'ks_build_detailed_move_lines',
                 args: [self.ks_report_id, offset, account_id, self.ks_df_report_opt, self.$ks_searchview_buttons.find('.ks_search_account_filter').length],
+                kwargs: {ks_cursor: cursor || {}},
             })
 
         },
@@ -562,40 +615,45 @@ if (k.initial_balance) {
 
             event.preventDefault();
             var self = this;
-            var account_id = $(event.currentTarget).data('bsAccountId');
+            var $accountLine = $(event.currentTarget);
+            var account_id = $accountLine.data('bsAccountId');
             var offset = 0;
-            var td = $(event.currentTarget).next('tr').find('td');
+            var td = $accountLine.next('tr').find('td');
             if (td.length == 1) {
                 self.ksGetPlLinesByPage(offset, account_id).then(function (datas) {
-                    _.each(datas[2], function (k, v) {
-                        var ksFormatConfigurations = {
-                            currency_id: k.company_currency_id,
-                            noSymbol: true,
-                        };
-                        k.debit = self.ksFormatCurrencySign(k.debit, ksFormatConfigurations, k.debit < 0 ? '-' : '');
-                        k.credit = self.ksFormatCurrencySign(k.credit, ksFormatConfigurations, k.credit < 0 ? '-' : '');
-                        k.balance = self.ksFormatCurrencySign(k.balance, ksFormatConfigurations, k.balance < 0 ? '-' : '');
-                        k.initial_balance = self.ksFormatCurrencySign(k.initial_balance, ksFormatConfigurations, k.initial_balance < 0 ? '-' : '');
-                        k.ldate = field_utils.format.date(field_utils.parse.date(k.ldate, {}, {
-                            isUTC: true
-                        }));
-                    });
-                    $(event.currentTarget).next('tr').find('td .ks_py-mline-table-div').remove();
-                    $(event.currentTarget).next('tr').find('td ul').after(
-                        QWeb.render('ks_df_sub_pl0', {
-                            count: datas[0],
-                            offset: datas[1],
-                            account_data: datas[2],
-                            ks_enable_ledger_in_bal: self.ks_enable_ledger_in_bal,
-                        }))
-                    $(event.currentTarget).next('tr').find('td ul li:first a').css({
-                        'background-color': '#00ede8',
-                        'font-weight': 'bold',
-                    });
+                    self.ksFormatPlLines(datas[2]);
+                    self.ksRenderMoveLinesPage($accountLine, 'ks_df_sub_pl0', datas, false);
                 })
             }
         },
 
+        /**
+         * @method to append the next page of move lines, read after the stored cursor
+         */
+        ksLoadMoreMoveLines: function (event) {
+            event.preventDefault();
+            event.stopPropagation();
+            var self = this;
+            var $accountLine = $(event.currentTarget).closest('tr').prev('tr');
+            var cursor = $accountLine.data('ksCursor');
+            if (!cursor) {
+                return;
+            }
+            var account_id = $accountLine.data('bsAccountId');
+            $(event.currentTarget).closest('.ks_py-mline-more-div').remove();
+            if ($accountLine.hasClass('ks_pl-py-mline')) {
+                self.ksGetPlLinesByPage(0, account_id, cursor).then(function (datas) {
+                    self.ksFormatPlLines(datas[2]);
+                    self.ksRenderMoveLinesPage($accountLine, 'ks_df_sub_pl0', datas, true);
+                });
+            } else {
+                self.ksGetGlLineByPage(0, account_id, cursor).then(function (datas) {
+                    self.ksFormatGlLines(datas[2]);
+                    self.ksRenderMoveLinesPage($accountLine, 'ks_df_gl_subsection', datas, true);
+                });
+            }
+        },
+
         /**
          * @method to get Aged Report move lines detailed information
          */
@@ -0,0 +1,114 @@
+from odoo import Command
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestBalanceCache(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.env['ir.config_parameter'].sudo().set_param('ks_enable_balance_cache', True)
+        cls.balance_cache = cls.env['ks.dfr.balance.cache']
+        cls.balance_cache.ks_rebuild_cache()
+
+        cls.account_revenue = cls.company_data['default_account_revenue']
+        cls.account_expense = cls.company_data['default_account_expense']
+        cls.account_receivable = cls.company_data['default_account_receivable']
+        cls.account_assets = cls.company_data['default_account_assets']
+
+        cls.trial_balance = cls.env.ref('ks_dynamic_financial_report.ks_df_tb0')
+        cls.general_ledger = cls.env.ref('ks_dynamic_financial_report.ks_df_gl0')
+        cls.profit_and_loss = cls.env.ref('ks_dynamic_financial_report.ks_df_pnl0')
+
+    def _create_entry(self, date, amount, debit_account=None, credit_account=None, post=True):
+        move = self.env['account.move'].create({
+            'move_type': 'entry',
+            'date': date,
+            'journal_id': self.company_data['default_journal_misc'].id,
+            'line_ids': [
+                Command.create({'account_id': (debit_account or self.account_receivable).id, 'debit': amount}),
+                Command.create({'account_id': (credit_account or self.account_revenue).id, 'credit': amount}),
+            ],
+        })
+        if post:
+            move.action_post()
+        return move
+
+    def _normalize(self, value):
+        if isinstance(value, float):
+            return round(value, 2)
+        if isinstance(value, dict):
+            return {key: self._normalize(val) for key, val in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._normalize(val) for val in value]
+        return value
+
+    def _get_report_results(self, date_from, date_to):
+        ks_earlier_informations = {'date': {
+            'ks_process': 'range',
+            'ks_filter': 'custom',
+            'ks_start_date': date_from,
+            'ks_end_date': date_to,
+        }}
+        results = {}
+        for report in (self.trial_balance, self.general_ledger):
+            info = report.ks_get_dynamic_fin_info(dict(ks_earlier_informations))
+            results[report.ks_name] = {key: info[key] for key in (
+                'ks_report_lines', 'ks_initial_balance', 'ks_current_balance', 'ks_ending_balance',
+                'ks_retained', 'ks_subtotal')}
+
+        ks_df_informations = self.profit_and_loss._ks_get_df_informations(dict(ks_earlier_informations))
+        ks_filter_context = self.profit_and_loss.ks_filter_context(ks_df_informations)
+        accounts = self.env['account.account'].search([('company_id', '=', self.env.company.id)])
+        results['account_balances'] = self.profit_and_loss.with_context(ks_filter_context)._ks_compute_account_balance(
+            accounts, ks_df_informations)
+        return self._normalize(results)
+
+    def test_reports_with_and_without_cache(self):
+        """ Whole months read from the cache, partial months and other periods
+        from the journal items, give the same report totals.
+        """
+        self._create_entry('2018-12-20', 100.0)
+        self._create_entry('2019-01-10', 200.0)
+        self._create_entry('2019-01-20', 300.0, credit_account=self.account_assets)
+        february_entry = self._create_entry('2019-02-01', 400.0)
+        self._create_entry('2019-02-28', 500.0, debit_account=self.account_expense)
+        reposted_entry = self._create_entry('2019-03-15', 600.0)
+        cancelled_entry = self._create_entry('2019-04-05', 700.0)
+        self._create_entry('2019-04-20', 800.0)
+        self._create_entry('2019-03-10', 900.0, post=False)
+
+        # Reset to draft and post again at another date
+        reposted_entry.button_draft()
+        reposted_entry.date = '2019-03-31'
+        reposted_entry.action_post()
+        cancelled_entry.button_draft()
+        cancelled_entry.button_cancel()
+
+        # Line level changes on a posted move
+        self.env['account.move.line'].create([
+            {'move_id': february_entry.id, 'account_id': self.account_expense.id, 'debit': 50.0},
+            {'move_id': february_entry.id, 'account_id': self.account_assets.id, 'credit': 50.0},
+        ])
+        february_entry.line_ids.filtered(lambda line: line.account_id == self.account_revenue).account_id = \
+            self.account_expense
+
+        self.assertEqual(self.balance_cache._ks_check_cache(), 0)
+
+        for date_from, date_to in (('2019-01-15', '2019-04-10'), ('2019-02-01', '2019-03-31')):
+            with_cache = self._get_report_results(date_from, date_to)
+            self.env['ir.config_parameter'].sudo().set_param('ks_enable_balance_cache', False)
+            without_cache = self._get_report_results(date_from, date_to)
+            self.env['ir.config_parameter'].sudo().set_param('ks_enable_balance_cache', True)
+            self.assertEqual(with_cache, without_cache)
+
+    def test_check_and_rebuild_cache(self):
+        self._create_entry('2019-05-10', 100.0)
+        self.assertEqual(self.balance_cache.ks_check_and_rebuild_cache(), 0)
+
+        self.env.cr.execute("UPDATE ks_dfr_balance_cache SET debit = debit + 1")
+        self.balance_cache.invalidate_model()
+        self.assertTrue(self.balance_cache.ks_check_and_rebuild_cache())
+        self.assertEqual(self.balance_cache._ks_check_cache(), 0)
@@ -1,7 +1,7 @@
 {
     "name": "membership_custom_module",
     'license': 'LGPL-3',
-    "depends": ["base", "website", "portal", "sale", 'website_sale', 'product', "uom", ],
+    "depends": ["base", "website", "portal", "sale", 'website_sale', 'product', "uom", "stock", ],
     "data": ['security/ir.model.access.csv', 'views/membership_menu_views.xml', 'views/membership_planning_views.xml',
              'views/slots_views.xml', 'views/inventory_slot_page_views.xml', 'views/respartner_views.xml',
              'views/saleorder_views.xml', 'views/membership_template_views.xml',
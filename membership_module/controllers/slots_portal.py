@@ -8,11 +8,21 @@ from itertools import count
 from base64 import b64encode
 from werkzeug.wrappers import Response
 from werkzeug import datastructures
+from werkzeug.http import http_date
+from datetime import timezone
+import hashlib
 import json
 import logging
 
 # _logger = logging.getLogger(__name__)
 
+# On hand quantity up to which a product is shown as out of stock
+NORMAL_STOCK_THRESHOLD = 8
+LEAFY_STOCK_THRESHOLD = 20
+
+# {(dbname, company_id, website_id): (stamp, etag, last_modified, data)}, local to the worker
+_inventory_products_cache = {}
+
 
  
 class MySlotsPortal(portal.CustomerPortal):
@@ -164,54 +174,88 @@ class MySlotsPortal(portal.CustomerPortal):
     #     }
     
 
+    def _get_inventory_products_feed(self):
+        """ Return the (etag, last modified, data) of the inventory product feed of
+        the current website, rebuilt only when the stock or the products changed.
+        """
+        website = request.website
+        company = website.company_id
+        request.env['stock.quant'].flush_model(['product_id', 'quantity', 'company_id'])
+        request.env['product.template'].flush_model()
+        # Any quant or product change moves the stamp, whichever worker served it
+        request.env.cr.execute("""
+            SELECT (SELECT MAX(t.write_date) FROM product_template t
+                     WHERE t.radio_field IN ('leafy', 'normal')),
+                   (SELECT COUNT(*) FROM product_template t
+                     WHERE t.radio_field IN ('leafy', 'normal') AND t.active),
+                   MAX(q.write_date), COUNT(q.id)
+            FROM stock_quant q
+            JOIN product_product p ON p.id = q.product_id
+            JOIN product_template t ON t.id = p.product_tmpl_id
+            WHERE t.radio_field IN ('leafy', 'normal') AND q.company_id = %s
+        """, (company.id,))
+        stamp = request.env.cr.fetchone()
+        key = (request.env.cr.dbname, company.id, website.id)
+        cached = _inventory_products_cache.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1:]
+
+        templates = request.env['product.template'].sudo().search([('radio_field', 'in', ('leafy', 'normal'))])
+        products = templates.product_variant_id
+        quantities = {
+            group['product_id'][0]: group['quantity']
+            for group in request.env['stock.quant'].sudo().read_group(
+                [('product_id', 'in', products.ids), ('company_id', '=', company.id),
+                 ('location_id.usage', '=', 'internal'), ('location_id.warehouse_id', '!=', False)],
+                ['quantity:sum'], ['product_id'])
+        }
+        data = {'leaf_products': [], 'normal_products': []}
+        for template in templates:
+            product_product = template.product_variant_id
+            on_hand_quantity = quantities.get(product_product.id, 0.0)
+            if not product_product or on_hand_quantity <= 0:
+                continue
+            threshold = LEAFY_STOCK_THRESHOLD if template.radio_field == 'leafy' else NORMAL_STOCK_THRESHOLD
+            data['leaf_products' if template.radio_field == 'leafy' else 'normal_products'].append({
+                'id': product_product.id,
+                'name': product_product.name,
+                'list_price': product_product.lst_price,
+                'quantity': 1,
+                'uom': product_product.uom_id.name,
+                'image_url': website.image_url(template, 'image_128'),  # Versioned URL, cached by the browser
+                'status': 'Out of Stock' if on_hand_quantity <= threshold else 'In Stock'  # Status indicator
+            })
+
+        last_modified = max(filter(None, stamp[::2]), default=None) or datetime.utcnow()
+        etag = '"%s"' % hashlib.sha1(repr((key, stamp)).encode()).hexdigest()
+        _inventory_products_cache[key] = (stamp, etag, last_modified, data)
+        return etag, last_modified, data
+
     @http.route('/get_inventory_products', type='json', auth='public', website=True, csrf=False)
     def get_inventory_products(self):
-        ProductTemplate = http.request.env['product.template']
-        normal_product_data = []
-        leaf_product_data = []
-
-        leaf_products_template = ProductTemplate.sudo().search([('radio_field', '=', 'leafy')])
-        normal_products_template = ProductTemplate.sudo().search([('radio_field', '=', 'normal')])
-
-        for template in normal_products_template:
-            product_product = template.product_variant_id.sudo()
-            if product_product:
-                on_hand_quantity = product_product.qty_available
-                if on_hand_quantity > 0:
-                    print("@@@@@@@^^^^^^^^^",str(template.id))
-                    image_url = '/web/image/product.template/' + str(template.id) + '/image_128'  # Constructing image URL
-                    normal_product_data.append({
-                        'id': product_product.id,
-                        'name': product_product.name,
-                        'list_price': product_product.lst_price,
-                        'quantity': 1,
-                        'uom': product_product.uom_id.name,
-                        'image_url': image_url,  # Include image URL in the data
-                        'status': 'Out of Stock' if on_hand_quantity <= 8 else 'In Stock' # Status indicator
-                    })
-
-        for template in leaf_products_template:
-            product_product = template.product_variant_id.sudo()
-            if product_product:
-                on_hand_quantity = product_product.qty_available
-                if on_hand_quantity > 0:
-                    image_url = '/web/image/product.template/' + str(template.id) + '/image_128'  # Constructing image URL
-                    leaf_product_data.append({
-                        'id': product_product.id,
-                        'name': product_product.name,
-                        'list_price': product_product.lst_price,
-                        'quantity': 1,
-                        'uom': product_product.uom_id.name,
-                        'image_url':image_url,  # Include image URL in the data
-                        'status': 'Out of Stock' if on_hand_quantity <= 20 else 'In Stock'             
-                    })
-
-        return {
-            'leaf_products': leaf_product_data,
-            'normal_products': normal_product_data
-        }
+        return self._get_inventory_products_feed()[2]
+
+    @http.route('/membership/inventory_products', type='http', methods=['GET'], auth='public', website=True, sitemap=False)
+    def inventory_products_feed(self, **kw):
+        """ Same feed as /get_inventory_products, revalidated by the browser with
+        If-None-Match / If-Modified-Since.
+        """
+        etag, last_modified, data = self._get_inventory_products_feed()
+        headers = [
+            ('ETag', etag),
+            ('Last-Modified', http_date(last_modified.replace(tzinfo=timezone.utc))),
+            ('Cache-Control', 'no-cache'),
+        ]
+        if_none_match = request.httprequest.if_none_match
+        if if_none_match:
+            not_modified = if_none_match.contains(etag.strip('"'))
+        else:
+            if_modified_since = request.httprequest.if_modified_since
+            not_modified = bool(if_modified_since) and last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= if_modified_since
+        if not_modified:
+            return Response(status=304, headers=headers)
+        return request.make_json_response(data, headers=headers)
 
-        
     # def _get_product_image_url(self, product_product):
     #     ProductProduct = http.request.env['product.product'].sudo()
     #     product_product_sudo = ProductProduct.browse(product_product.id).sudo()
@@ -1,6 +1,12 @@
+import logging
+import threading
+from collections import defaultdict
+
 from odoo import models, fields, api
 from datetime import datetime, timedelta, time
 
+_logger = logging.getLogger(__name__)
+
 class ResPartner(models.Model):
 	_inherit = 'res.partner'
 
@@ -13,84 +19,99 @@ class ResPartner(models.Model):
 
 	@api.model
 	def _cron_remove_slots(self):
-	    current_datetime = fields.Datetime.now()
-	    print('^^^^^',current_datetime)
-	    partners = self.env['res.partner'].search([])
-	    for partner in partners:
-	        slots_to_remove = partner.partner_slot_line_ids.filtered(lambda slot: slot.slot_date and fields.Datetime.from_string(slot.slot_date) < current_datetime)
-	        print('^^^^^',slots_to_remove)
-	        if slots_to_remove:
-	        	partner.allocated_slots -= len(slots_to_remove)
-	        	slots_to_remove.unlink()
-	        	payment_slots_to_remove = partner.partner_payment_slot_line_ids.filtered(lambda payment_slot: payment_slot.slot_id in slots_to_remove.mapped('id'))
-	        	if payment_slots_to_remove:
-	        		payment_slots_to_remove.unlink()
-	
+		today = fields.Date.context_today(self)
+		self.env['partner.ownslots'].flush_model(['slot_date', 'partner_id'])
+		self.env.cr.execute("""
+			SELECT id, partner_id FROM partner_ownslots
+			WHERE slot_date <= %s
+		""", (today,))
+		rows = self.env.cr.fetchall()
+		if not rows:
+			return
+		slot_ids = tuple(row[0] for row in rows)
+		slot_keys = set((partner_id, slot_id) for slot_id, partner_id in rows)
+
+		self.flush_model(['allocated_slots'])
+		self.env.cr.execute("""
+			UPDATE res_partner p
+			SET allocated_slots = COALESCE(p.allocated_slots, 0) - expired.slot_count
+			FROM (
+				SELECT partner_id, COUNT(*) AS slot_count FROM partner_ownslots
+				WHERE id IN %s AND partner_id IS NOT NULL
+				GROUP BY partner_id
+			) expired
+			WHERE p.id = expired.partner_id
+		""", (slot_ids,))
+		self.invalidate_model(['allocated_slots'])
+
+		payment_slots = self.env['partner.paymentslot'].search([('slot_id', 'in', slot_ids)])
+		payment_slots.filtered(lambda payment_slot: (payment_slot.partner_id.id, payment_slot.slot_id) in slot_keys).unlink()
+		self.env['partner.ownslots'].browse(slot_ids).unlink()
+		_logger.info("Removed %s expired slots", len(slot_ids))
 
 	@api.model
-	def _cron_payment_slots_save(self):
-		print('^^^^^>>>>>>>>>>>>>>>>>>>>>>>>>>>')
-		current_datetime = fields.Datetime.now()
-		partners = self.env['res.partner'].search([('plan_ids', '!=', False)])
-		for partner in partners:
-			valid_slot_lines = partner.partner_slot_line_ids.filtered(lambda s: s.slot_date)
-			for slot_line in valid_slot_lines:
-				slot_datetime = slot_line.slot_date
-				slot_datetime = datetime.combine(slot_line.slot_date, datetime.min.time())
-				time_difference = current_datetime - slot_datetime
-				print(time_difference)
-				# if 0 < time_difference.total_seconds() < 7 * 3600:
-				print("Slot date:", slot_datetime)
-				print('slot_id', slot_line.id)
-				slot_id = slot_line.id
-				slot_payments = self.env['partner.paymentslot'].search([('slot_id', '=', slot_id)])
-				print(slot_payments)
-			
-				if not slot_payments:
-					slot_description = self.env['slots.description'].browse(slot_line.slot_id.id)
-					sale_order = self.env['sale.order'].search([('partner_id', '=', partner.id), ('slot_id', '=', slot_line.slot_id.id)])
-					if not sale_order:
-						sale_order_line_vals_list = []
-						for product_line in slot_description.product_line_ids:
-							sale_order_line_vals = {
-							'product_id': product_line.product_id.id,
-	                        'name': product_line.product_id.display_name,
-	                        'product_uom_qty': product_line.quantity,
-	                        'price_unit': product_line.price_unit,
-	                        'product_uom': product_line.uom.id,
-
-							}
-							sale_order_line_vals_list.append((0, 0, sale_order_line_vals))
-						sale_order_vals = {
-						'partner_id': partner.id,
-						'order_line': sale_order_line_vals_list,
-						'slot_id': slot_line.slot_id.id
-						}
-						sale_order = self.env['sale.order'].create(sale_order_vals)
-				else:
-					print('^^^^^>>>>>>>>>>>>>>>>>>>>>>>>>>> sale order creation')
-					for slot_payment in slot_payments:
-						uom = self.env['uom.uom'].search([('name', '=', slot_payment.uomName)], limit=1)
-						sale_order_line_vals_list = []
-						sale_order_line_vals ={
-						'product_id': slot_payment.product_id,
-						'name': slot_payment.product_name,
-	                    'product_uom_qty': slot_payment.quantity,
-	                    'price_unit': slot_payment.price_unit,
-	                    'product_uom': uom.id if uom else False,
-						}
-						sale_order_line_vals_list.append((0, 0, sale_order_line_vals))
-
-					sale_order_vals = {
-						'partner_id': partner.id,
-						'order_line': sale_order_line_vals_list,
-						'slot_id': slot_line.slot_id.id
-						}
-					sale_order = self.env['sale.order'].create(sale_order_vals)
-
-
-
-			
+	def _cron_payment_slots_save(self, chunk_size=200):
+		slot_lines = self.env['partner.ownslots'].search([
+			('partner_id.plan_ids', '!=', False),
+			('slot_date', '!=', False),
+		], order='partner_id, slot_date, id')
+		if not slot_lines:
+			return
+
+		# Pre-fetch everything the orders are built from
+		payment_slots_by_slot = defaultdict(list)
+		for payment_slot in self.env['partner.paymentslot'].search_read(
+				[('slot_id', 'in', slot_lines.ids)],
+				['slot_id', 'product_id', 'product_name', 'quantity', 'uomName', 'price_unit']):
+			payment_slots_by_slot[payment_slot['slot_id']].append(payment_slot)
+		existing_orders = set(
+			(order['partner_id'], order['slot_id'])
+			for order in self.env['sale.order'].search_read(
+				[('partner_id', 'in', slot_lines.partner_id.ids), ('slot_id', 'in', slot_lines.slot_id.ids)],
+				['partner_id', 'slot_id'], load=False))
+		uom_names = set(payment_slot['uomName'] for payment_slots in payment_slots_by_slot.values()
+						for payment_slot in payment_slots if payment_slot['uomName'])
+		uom_by_name = {}
+		for uom in self.env['uom.uom'].search([('name', 'in', list(uom_names))]):
+			uom_by_name.setdefault(uom.name, uom.id)
+
+		sale_order_vals_list = []
+		for slot_line in slot_lines:
+			key = (slot_line.partner_id.id, slot_line.slot_id.id)
+			# Already created, possibly by an interrupted run
+			if key in existing_orders:
+				continue
+			existing_orders.add(key)
+			slot_payments = payment_slots_by_slot.get(slot_line.id)
+			if not slot_payments:
+				sale_order_line_vals_list = [(0, 0, {
+					'product_id': product_line.product_id.id,
+					'name': product_line.product_id.display_name,
+					'product_uom_qty': product_line.quantity,
+					'price_unit': product_line.price_unit,
+					'product_uom': product_line.uom.id,
+				}) for product_line in slot_line.slot_id.product_line_ids]
+			else:
+				sale_order_line_vals_list = [(0, 0, {
+					'product_id': slot_payment['product_id'],
+					'name': slot_payment['product_name'],
+					'product_uom_qty': slot_payment['quantity'],
+					'price_unit': slot_payment['price_unit'],
+					'product_uom': uom_by_name.get(slot_payment['uomName'], False),
+				}) for slot_payment in slot_payments]
+			sale_order_vals_list.append({
+				'partner_id': slot_line.partner_id.id,
+				'order_line': sale_order_line_vals_list,
+				'slot_id': slot_line.slot_id.id,
+			})
+
+		auto_commit = not getattr(threading.current_thread(), 'testing', False)
+		for index in range(0, len(sale_order_vals_list), chunk_size):
+			self.env['sale.order'].create(sale_order_vals_list[index:index + chunk_size])
+			# Commit each chunk, the orders already created are skipped if the run is resumed
+			if auto_commit:
+				self.env.cr.commit()
+		_logger.info("Created %s slot sale orders", len(sale_order_vals_list))
 
 
 
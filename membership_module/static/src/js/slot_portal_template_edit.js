@@ -675,7 +675,8 @@ odoo.define('membership_module.slot_portal_template_edit', function(require) {
 		$('.btn-add-products').click(function () {
 			var slotDate = $('p:contains("Slot Date:")').text().trim().split(':')[1].trim(); // Extract slot date from the page
         	// if (isWithin48Hours(slotDate)) {
-				ajax.jsonRpc('/get_inventory_products', 'call', {})
+				// Plain GET so that the browser revalidates the feed with its ETag
+				$.getJSON('/membership/inventory_products')
 					.then(function (data) {
 						renderKanbanView(data);
 					});
@@ -1,17 +1,23 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
+from bisect import bisect_left
 from collections import defaultdict, namedtuple
 from dateutil.relativedelta import relativedelta
 from math import log10
 
 from odoo import api, fields, models, _
+from odoo.exceptions import UserError
 from odoo.tools.date_utils import add, subtract
 from odoo.tools.float_utils import float_round
 from odoo.osv.expression import OR, AND
 from collections import OrderedDict
 
 
+# Cell edits that can be applied through apply_cell_edit
+CELL_EDIT_METHODS = ('set_forecast_qty', 'set_replenish_qty', 'remove_replenish_qty')
+
+
 class MrpProductionSchedule(models.Model):
     _name = 'mrp.production.schedule'
     _order = 'warehouse_id, product_id'
@@ -318,30 +324,37 @@ class MrpProductionSchedule(models.Model):
         - safety_stock_qty:
         starting_inventory_qty - forecast_qty - indirect_demand_qty + replenish_qty
         """
-        company_id = self.env.company
-        date_range = company_id._get_date_range()
-        date_range_year_minus_1 = company_id._get_date_range(years=1)
-        date_range_year_minus_2 = company_id._get_date_range(years=2)
-
         # We need to get the schedule that impact the schedules in self. Since
         # the state is not saved, it needs to recompute the quantity to
         # replenish of finished products. It will modify the indirect
         # demand and replenish_qty of schedules in self.
         schedules_to_compute = self.env['mrp.production.schedule'].browse(self.get_impacted_schedule()) | self
+        grid_data = schedules_to_compute._get_mps_grid_data(self)
+        production_schedule_states_by_id = schedules_to_compute._compute_mps_grid(grid_data)
+        return [production_schedule_states_by_id[_id] for _id in self.ids if _id in production_schedule_states_by_id]
+
+    def _get_mps_grid_data(self, schedules_to_display):
+        """ Load in bulk everything the MPS grid of the schedules in self
+        depends on, so that _compute_mps_grid is pure arithmetic.
+
+        param schedules_to_display: schedules in self whose cells are returned,
+        the other ones are only used to compute the indirect demand.
+        return: dict with the date ranges, the schedules in evaluation order,
+        the incoming/outgoing quantities by (period, product, warehouse), the
+        forecast matrix by (schedule id, period index), the starting inventory
+        and lead times by schedule id and the read values of the schedules.
+        rtype: dict
+        """
+        company_id = self.env.company
+        date_range = company_id._get_date_range()
 
         # Dependencies between schedules
-        indirect_demand_trees = schedules_to_compute._get_indirect_demand_tree()
-
-        indirect_ratio_mps = schedules_to_compute._get_indirect_demand_ratio_mps(indirect_demand_trees)
-
-        # Get the schedules that do not depends from other in first position in
-        # order to compute the schedule state only once.
-        indirect_demand_order = schedules_to_compute._get_indirect_demand_order(indirect_demand_trees)
-        indirect_demand_qty = defaultdict(float)
-        incoming_qty, incoming_qty_done = self._get_incoming_qty(date_range)
-        outgoing_qty, outgoing_qty_done = self._get_outgoing_qty(date_range)
-        dummy, outgoing_qty_year_minus_1 = self._get_outgoing_qty(date_range_year_minus_1)
-        dummy, outgoing_qty_year_minus_2 = self._get_outgoing_qty(date_range_year_minus_2)
+        indirect_demand_trees = self._get_indirect_demand_tree()
+
+        incoming_qty, incoming_qty_done = schedules_to_display._get_incoming_qty(date_range)
+        outgoing_qty, outgoing_qty_done = schedules_to_display._get_outgoing_qty(date_range)
+        dummy, outgoing_qty_year_minus_1 = schedules_to_display._get_outgoing_qty(company_id._get_date_range(years=1))
+        dummy, outgoing_qty_year_minus_2 = schedules_to_display._get_outgoing_qty(company_id._get_date_range(years=2))
         read_fields = [
             'forecast_target_qty',
             'min_to_replenish_qty',
@@ -352,51 +365,111 @@ class MrpProductionSchedule(models.Model):
             read_fields.append('warehouse_id')
         if self.env.user.has_group('uom.group_uom'):
             read_fields.append('product_uom_id')
-        production_schedule_states = schedules_to_compute.read(read_fields)
-        production_schedule_states_by_id = {mps['id']: mps for mps in production_schedule_states}
-        for production_schedule in indirect_demand_order:
+        return {
+            'date_range': date_range,
+            'date_range_year_minus_1': company_id._get_date_range(years=1),
+            'date_range_year_minus_2': company_id._get_date_range(years=2),
+            'schedules_to_display': schedules_to_display,
+            'read_values': self.read(read_fields),
+            # Get the schedules that do not depends from other in first
+            # position in order to compute the schedule state only once.
+            'indirect_demand_order': self._get_indirect_demand_order(indirect_demand_trees),
+            'indirect_ratio_mps': self._get_indirect_demand_ratio_mps(indirect_demand_trees),
+            'incoming_qty': incoming_qty,
+            'incoming_qty_done': incoming_qty_done,
+            'outgoing_qty': outgoing_qty,
+            'outgoing_qty_done': outgoing_qty_done,
+            'outgoing_qty_year_minus_1': outgoing_qty_year_minus_1,
+            'outgoing_qty_year_minus_2': outgoing_qty_year_minus_2,
+            'forecast_matrix': self._get_forecast_matrix(date_range),
+            'starting_inventory_qty': self._get_starting_inventory_qty(),
+            'lead_times': {production_schedule.id: production_schedule._get_lead_times() for production_schedule in self},
+        }
+
+    def _compute_mps_grid(self, grid_data, start_indexes=None):
+        """ Compute the cells of the schedules from the data loaded by
+        _get_mps_grid_data. The schedules are evaluated in the indirect demand
+        order, each one pushing its quantities to replenish as indirect demand
+        of its components at the period given by its lead time.
+
+        param start_indexes: {(product, warehouse): period index} to only
+        compute the cells from that period onward. The first period of the
+        components is derived from the periods whose indirect demand they
+        receive, the schedules reached by none of them are not returned. The
+        returned cells then carry their period 'index'.
+        return: the states of the schedules to display by id
+        rtype: dict
+        """
+        date_range = grid_data['date_range']
+        date_range_year_minus_1 = grid_data['date_range_year_minus_1']
+        date_range_year_minus_2 = grid_data['date_range_year_minus_2']
+        schedules_to_display = grid_data['schedules_to_display']
+        forecast_matrix = grid_data['forecast_matrix']
+        incoming_qty = grid_data['incoming_qty']
+        incoming_qty_done = grid_data['incoming_qty_done']
+        outgoing_qty = grid_data['outgoing_qty']
+        outgoing_qty_done = grid_data['outgoing_qty_done']
+        outgoing_qty_year_minus_1 = grid_data['outgoing_qty_year_minus_1']
+        outgoing_qty_year_minus_2 = grid_data['outgoing_qty_year_minus_2']
+        indirect_ratio_mps = grid_data['indirect_ratio_mps']
+
+        today = fields.Date.today()
+        date_stops = [date_stop for dummy, date_stop in date_range]
+        # Indirect demand by (product, warehouse), one cell per period
+        indirect_demand_qty = defaultdict(lambda: [0.0] * len(date_range))
+        incremental = start_indexes is not None
+        start_indexes = dict(start_indexes or {})
+        production_schedule_states_by_id = {mps['id']: dict(mps) for mps in grid_data['read_values']}
+        for production_schedule in grid_data['indirect_demand_order']:
             # Bypass if the schedule is only used in order to compute indirect
             # demand.
             rounding = production_schedule.product_id.uom_id.rounding
-            lead_time = production_schedule._get_lead_times()
+            lead_time = grid_data['lead_times'][production_schedule.id]
             # Ignore "Days to Supply Components" when set demand for components since it's normally taken care by the
             # components themselves
             lead_time_ignore_components = lead_time - production_schedule.product_id.product_tmpl_id.days_to_prepare_mo
             production_schedule_state = production_schedule_states_by_id[production_schedule['id']]
-            if production_schedule in self:
-                procurement_date = add(fields.Date.today(), days=lead_time)
+            product_warehouse = (production_schedule.product_id, production_schedule.warehouse_id)
+            start_index = start_indexes.get(product_warehouse, None if incremental else 0)
+            to_display = production_schedule in schedules_to_display and start_index is not None
+            if to_display:
+                procurement_date = add(today, days=lead_time)
                 precision_digits = max(0, int(-(log10(production_schedule.product_uom_id.rounding))))
                 production_schedule_state['precision_digits'] = precision_digits
                 production_schedule_state['forecast_ids'] = []
 
-            starting_inventory_qty = production_schedule.product_id.with_context(warehouse=production_schedule.warehouse_id.id).qty_available
+            schedule_indirect_demand = indirect_demand_qty[product_warehouse]
+            components_ratio = indirect_ratio_mps[(production_schedule.warehouse_id, production_schedule.product_id)]
+            starting_inventory_qty = grid_data['starting_inventory_qty'][production_schedule.id]
             if len(date_range):
-                starting_inventory_qty -= incoming_qty_done.get((date_range[0], production_schedule.product_id, production_schedule.warehouse_id), 0.0)
-                starting_inventory_qty += outgoing_qty_done.get((date_range[0], production_schedule.product_id, production_schedule.warehouse_id), 0.0)
+                starting_inventory_qty -= incoming_qty_done.get((date_range[0], *product_warehouse), 0.0)
+                starting_inventory_qty += outgoing_qty_done.get((date_range[0], *product_warehouse), 0.0)
 
             for index, (date_start, date_stop) in enumerate(date_range):
                 forecast_values = {}
-                key = ((date_start, date_stop), production_schedule.product_id, production_schedule.warehouse_id)
-                key_y_1 = (date_range_year_minus_1[index], *key[1:])
-                key_y_2 = (date_range_year_minus_2[index], *key[1:])
-                existing_forecasts = production_schedule.forecast_ids.filtered(lambda p: p.date >= date_start and p.date <= date_stop)
-                if production_schedule in self:
+                key = ((date_start, date_stop), *product_warehouse)
+                existing_forecasts = forecast_matrix.get((production_schedule.id, index))
+                if to_display:
+                    # Needed by the state of the following cells
+                    forecast_values['incoming_qty'] = float_round(incoming_qty.get(key, 0.0) + incoming_qty_done.get(key, 0.0), precision_rounding=rounding)
+                if to_display and index >= start_index:
+                    key_y_1 = (date_range_year_minus_1[index], *product_warehouse)
+                    key_y_2 = (date_range_year_minus_2[index], *product_warehouse)
                     forecast_values['date_start'] = date_start
                     forecast_values['date_stop'] = date_stop
-                    forecast_values['incoming_qty'] = float_round(incoming_qty.get(key, 0.0) + incoming_qty_done.get(key, 0.0), precision_rounding=rounding)
                     forecast_values['outgoing_qty'] = float_round(outgoing_qty.get(key, 0.0) + outgoing_qty_done.get(key, 0.0), precision_rounding=rounding)
                     forecast_values['outgoing_qty_year_minus_1'] = float_round(outgoing_qty_year_minus_1.get(key_y_1, 0.0), precision_rounding=rounding)
                     forecast_values['outgoing_qty_year_minus_2'] = float_round(outgoing_qty_year_minus_2.get(key_y_2, 0.0), precision_rounding=rounding)
 
-                forecast_values['indirect_demand_qty'] = float_round(indirect_demand_qty.get(key, 0.0), precision_rounding=rounding, rounding_method='UP')
+                forecast_values['indirect_demand_qty'] = float_round(schedule_indirect_demand[index], precision_rounding=rounding, rounding_method='UP')
                 replenish_qty_updated = False
                 if existing_forecasts:
-                    forecast_values['forecast_qty'] = float_round(sum(existing_forecasts.mapped('forecast_qty')), precision_rounding=rounding)
-                    forecast_values['replenish_qty'] = float_round(sum(existing_forecasts.mapped('replenish_qty')), precision_rounding=rounding)
+                    forecast_values['forecast_qty'] = float_round(existing_forecasts['forecast_qty'], precision_rounding=rounding)
+                    forecast_values['replenish_qty'] = float_round(existing_forecasts['replenish_qty'], precision_rounding=rounding)
 
                     # Check if the to replenish quantity has been manually set or
                     # if it needs to be computed.
-                    replenish_qty_updated = any(existing_forecasts.mapped('replenish_qty_updated'))
+                    replenish_qty_updated = existing_forecasts['replenish_qty_updated']
                     forecast_values['replenish_qty_updated'] = replenish_qty_updated
                 else:
                     forecast_values['forecast_qty'] = 0.0
@@ -409,22 +482,29 @@ class MrpProductionSchedule(models.Model):
                 forecast_values['starting_inventory_qty'] = float_round(starting_inventory_qty, precision_rounding=rounding)
                 forecast_values['safety_stock_qty'] = float_round(starting_inventory_qty - forecast_values['forecast_qty'] - forecast_values['indirect_demand_qty'] + forecast_values['replenish_qty'], precision_rounding=rounding)
 
-                if production_schedule in self:
+                if to_display:
                     production_schedule_state['forecast_ids'].append(forecast_values)
                 starting_inventory_qty = forecast_values['safety_stock_qty']
+                if not components_ratio:
+                    continue
+                # Set the indirect demand qty for children schedules, in the
+                # first period ending after the components are needed.
+                related_date = max(subtract(date_start, days=lead_time_ignore_components), today)
+                related_index = bisect_left(date_stops, related_date)
+                if incremental and start_index is not None and index >= start_index:
+                    # The indirect demand of the components may change from there
+                    for product in components_ratio:
+                        component_key = (product, production_schedule.warehouse_id)
+                        start_indexes[component_key] = min(start_indexes.get(component_key, related_index), related_index)
                 if not forecast_values['replenish_qty']:
                     continue
-                # Set the indirect demand qty for children schedules.
-                for (product, ratio) in indirect_ratio_mps[(production_schedule.warehouse_id, production_schedule.product_id)].items():
-                    related_date = max(subtract(date_start, days=lead_time_ignore_components), fields.Date.today())
-                    index = next(i for i, (dstart, dstop) in enumerate(date_range) if related_date <= dstart or (related_date >= dstart and related_date <= dstop))
-                    related_key = (date_range[index], product, production_schedule.warehouse_id)
-                    indirect_demand_qty[related_key] += ratio * forecast_values['replenish_qty']
-
-            if production_schedule in self:
+                for (product, ratio) in components_ratio.items():
+                    indirect_demand_qty[(product, production_schedule.warehouse_id)][related_index] += ratio * forecast_values['replenish_qty']
+
+            if to_display:
                 # The state is computed after all because it needs the final
                 # quantity to replenish.
-                forecasts_state = production_schedule._get_forecasts_state(production_schedule_states_by_id, date_range, procurement_date)
+                forecasts_state = production_schedule._get_forecasts_state(production_schedule_states_by_id, date_range, procurement_date, forecast_matrix=forecast_matrix)
                 forecasts_state = forecasts_state[production_schedule.id]
                 for index, forecast_state in enumerate(forecasts_state):
                     production_schedule_state['forecast_ids'][index].update(forecast_state)
@@ -433,7 +513,62 @@ class MrpProductionSchedule(models.Model):
                 # depends from another.
                 has_indirect_demand = any(forecast['indirect_demand_qty'] != 0 for forecast in production_schedule_state['forecast_ids'])
                 production_schedule_state['has_indirect_demand'] = has_indirect_demand
-        return [production_schedule_states_by_id[_id] for _id in self.ids if _id in production_schedule_states_by_id]
+                if incremental:
+                    production_schedule_state['forecast_ids'] = [
+                        dict(forecast, index=index)
+                        for index, forecast in enumerate(production_schedule_state['forecast_ids'])
+                        if index >= start_index
+                    ]
+        return {
+            production_schedule.id: production_schedule_states_by_id[production_schedule.id]
+            for production_schedule in schedules_to_display
+            if production_schedule.id in production_schedule_states_by_id
+            and 'forecast_ids' in production_schedule_states_by_id[production_schedule.id]
+        }
+
+    def _get_forecast_matrix(self, date_range):
+        """ Sum the forecasts of the schedules in self by period, read in one
+        query.
+
+        return: {(schedule id, period index): {'forecast_qty', 'replenish_qty',
+        'replenish_qty_updated', 'procurement_launched'}} for the periods having
+        at least one forecast.
+        rtype: dict
+        """
+        forecast_matrix = {}
+        if not self or not date_range:
+            return forecast_matrix
+        date_stops = [date_stop for dummy, date_stop in date_range]
+        forecasts = self.env['mrp.product.forecast'].search_read([
+            ('production_schedule_id', 'in', self.ids),
+            ('date', '>=', date_range[0][0]),
+            ('date', '<=', date_range[-1][1]),
+        ], ['production_schedule_id', 'date', 'forecast_qty', 'replenish_qty', 'replenish_qty_updated', 'procurement_launched'], load=False)
+        for forecast in forecasts:
+            key = (forecast['production_schedule_id'], bisect_left(date_stops, forecast['date']))
+            cell = forecast_matrix.setdefault(key, {
+                'forecast_qty': 0.0,
+                'replenish_qty': 0.0,
+                'replenish_qty_updated': False,
+                'procurement_launched': False,
+            })
+            cell['forecast_qty'] += forecast['forecast_qty']
+            cell['replenish_qty'] += forecast['replenish_qty']
+            cell['replenish_qty_updated'] |= forecast['replenish_qty_updated']
+            cell['procurement_launched'] |= forecast['procurement_launched']
+        return forecast_matrix
+
+    def _get_starting_inventory_qty(self):
+        """ Return {schedule id: quantity on hand of the product in the
+        schedule warehouse}, computed in one batch by warehouse.
+        """
+        starting_inventory_qty = {}
+        for warehouse in self.warehouse_id:
+            schedules = self.filtered(lambda mps: mps.warehouse_id == warehouse)
+            qty_by_product = {product.id: product.qty_available for product in schedules.product_id.with_context(warehouse=warehouse.id)}
+            for production_schedule in schedules:
+                starting_inventory_qty[production_schedule.id] = qty_by_product[production_schedule.product_id.id]
+        return starting_inventory_qty
 
     def get_impacted_schedule(self, domain=False):
         """ When the user modify the demand forecast on a schedule. The new
@@ -446,6 +581,12 @@ class MrpProductionSchedule(models.Model):
         :return ids of supplied and supplying schedules
         :rtype list
         """
+        return (self._get_supplying_schedules(domain) | self._get_supplied_schedules(domain)).ids
+
+    def _get_supplying_schedules(self, domain=False):
+        """ Return the schedules of the finished products that use the products
+        in self as component, no matter at which BoM level.
+        """
         if not domain:
             domain = []
 
@@ -461,12 +602,19 @@ class MrpProductionSchedule(models.Model):
             related_products |= products
             return _used_in_bom(products, related_products)
 
-        supplying_mps = self.env['mrp.production.schedule'].search(
+        return self.env['mrp.production.schedule'].search(
             AND([domain, [
                 ('warehouse_id', 'in', self.mapped('warehouse_id').ids),
                 ('product_id', 'in', _used_in_bom(self.mapped('product_id'), self.env['product.product']).ids)
             ]]))
 
+    def _get_supplied_schedules(self, domain=False):
+        """ Return the schedules of the components used by the products in
+        self, no matter at which BoM level.
+        """
+        if not domain:
+            domain = []
+
         def _use_boms(products, related_products):
             """ Explore bom line from products's BoMs in order to get components
             used.
@@ -479,12 +627,45 @@ class MrpProductionSchedule(models.Model):
             related_products |= components
             return _use_boms(components, related_products)
 
-        supplied_mps = self.env['mrp.production.schedule'].search(
+        return self.env['mrp.production.schedule'].search(
             AND([domain, [
                 ('warehouse_id', 'in', self.mapped('warehouse_id').ids),
                 ('product_id', 'in', _use_boms(self.mapped('product_id'), self.env['product.product']).ids)
             ]]))
-        return (supplying_mps | supplied_mps).ids
+
+    def apply_cell_edit(self, method, date_index, quantity=None, domain=False):
+        """ Apply a cell edit and return the cells it may have changed, instead
+        of reloading the state of every impacted schedule.
+
+        An edit on a schedule only changes its own cells from the edited
+        period onward and, through the indirect demand, the cells of its
+        components from the period receiving that demand onward. Only these
+        cells are computed and returned.
+
+        param method: one of CELL_EDIT_METHODS
+        param date_index: the edited period
+        param quantity: the new quantity, unused by remove_replenish_qty
+        param domain: the schedules displayed by the client
+        return: [{'id', 'has_indirect_demand', 'cells': [{'index', field: value}]}]
+        for the edited schedule and its components
+        rtype: list
+        """
+        self.ensure_one()
+        if method not in CELL_EDIT_METHODS:
+            raise UserError(_('%s is not a production schedule cell edit.', method))
+        args = [date_index] if method == 'remove_replenish_qty' else [date_index, quantity]
+        getattr(self, method)(*args)
+
+        schedules_to_display = self | self._get_supplied_schedules(domain)
+        schedules_to_compute = self.env['mrp.production.schedule'].browse(schedules_to_display.get_impacted_schedule()) | schedules_to_display
+        grid_data = schedules_to_compute._get_mps_grid_data(schedules_to_display)
+        states = schedules_to_compute._compute_mps_grid(
+            grid_data, start_indexes={(self.product_id, self.warehouse_id): date_index})
+        return [{
+            'id': production_schedule_id,
+            'has_indirect_demand': state['has_indirect_demand'],
+            'cells': state['forecast_ids'],
+        } for production_schedule_id, state in states.items()]
 
     def remove_replenish_qty(self, date_index):
         """ Remove the quantity to replenish on the forecast cell.
@@ -574,7 +755,7 @@ class MrpProductionSchedule(models.Model):
             'warehouse_id': self.warehouse_id,
         }
 
-    def _get_forecasts_state(self, production_schedule_states, date_range, procurement_date):
+    def _get_forecasts_state(self, production_schedule_states, date_range, procurement_date, forecast_matrix=None):
         """ Return the state for each forecast cells.
         - to_relaunch: A procurement has been launched for the same date range
         but a replenish modification require a new procurement.
@@ -594,10 +775,14 @@ class MrpProductionSchedule(models.Model):
         param production_schedule_states: schedules with a state to compute
         param date_range: list of period where a state should be computed
         param procurement_date: today + lead times for products in self
+        param forecast_matrix: forecasts of self by period as returned by
+        _get_forecast_matrix, read when not given
         return: the state for each time slot in date_range for each schedule in
         production_schedule_states
         rtype: dict
         """
+        if forecast_matrix is None:
+            forecast_matrix = self._get_forecast_matrix(date_range)
         forecasts_state = defaultdict(list)
         for production_schedule in self:
             forecast_values = production_schedule_states[production_schedule.id]['forecast_ids']
@@ -605,8 +790,8 @@ class MrpProductionSchedule(models.Model):
             for index, (date_start, date_stop) in enumerate(date_range):
                 forecast_state = {}
                 forecast_value = forecast_values[index]
-                existing_forecasts = production_schedule.forecast_ids.filtered(lambda p: p.date >= date_start and p.date <= date_stop)
-                procurement_launched = any(existing_forecasts.mapped('procurement_launched'))
+                existing_forecasts = forecast_matrix.get((production_schedule.id, index))
+                procurement_launched = bool(existing_forecasts and existing_forecasts['procurement_launched'])
 
                 replenish_qty = forecast_value['replenish_qty']
                 incoming_qty = forecast_value['incoming_qty']
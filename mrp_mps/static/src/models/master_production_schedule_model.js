@@ -59,6 +59,36 @@ export class MasterProductionScheduleModel extends EventBus {
         });
     }
 
+    /**
+     * Apply a cell edit on the server and patch the cells it changed, on the
+     * edited schedule and on the schedules of its components.
+     * @private
+     * @param {Integer} productionScheduleId mrp.production.schedule Id.
+     * @param {String} method set_forecast_qty, set_replenish_qty or remove_replenish_qty
+     * @param {Integer} dateIndex period to save (column number)
+     * @param {Float} quantity The new quantity
+     * @return {Promise}
+     */
+    async _applyCellEdit(productionScheduleId, method, dateIndex, quantity) {
+        const changes = await this.orm.call(
+            'mrp.production.schedule',
+            'apply_cell_edit',
+            [productionScheduleId, method, dateIndex, quantity, this.domain],
+        );
+        for (const change of changes) {
+            const productionSchedule = this.data.production_schedule_ids.find(ps => ps.id === change.id);
+            if (!productionSchedule) {
+                continue;
+            }
+            productionSchedule.has_indirect_demand = change.has_indirect_demand;
+            for (const cell of change.cells) {
+                const { index, ...values } = cell;
+                Object.assign(productionSchedule.forecast_ids[index], values);
+            }
+        }
+        this.notify();
+    }
+
     notify() {
         this.unselectAll();
         this.trigger('update');
@@ -101,10 +131,10 @@ export class MasterProductionScheduleModel extends EventBus {
     }
 
     /**
-     * Save the forecasted quantity and reload the current schedule in order
-     * to update its To Replenish quantity and its safety stock (current and
-     * future period). Also update the other schedules linked by BoM in order
-     * to update them depending the indirect demand.
+     * Save the forecasted quantity and update the cells it changed: the To
+     * Replenish quantity and the safety stock of the current schedule
+     * (current and future period) and the indirect demand of the schedules of
+     * its components.
      * @private
      * @param {Integer} productionScheduleId mrp.production.schedule Id.
      * @param {Integer} dateIndex period to save (column number)
@@ -113,13 +143,7 @@ export class MasterProductionScheduleModel extends EventBus {
      */
     _saveForecast(productionScheduleId, dateIndex, forecastQty) {
         return this.mutex.exec(() => {
-            this.orm.call(
-                'mrp.production.schedule',
-                'set_forecast_qty',
-                [productionScheduleId, dateIndex, forecastQty],
-            ).then(() => {
-                return this.reload(productionScheduleId);
-            });
+            return this._applyCellEdit(productionScheduleId, 'set_forecast_qty', dateIndex, forecastQty);
         });
     }
 
@@ -216,8 +240,8 @@ export class MasterProductionScheduleModel extends EventBus {
     }
 
     /**
-     * Save the quantity To Replenish and reload the current schedule in order
-     * to update it's safety stock and quantity in future period. Also mark
+     * Save the quantity To Replenish and update the cells it changed: its
+     * safety stock and quantity in future period. Also mark
      * the cell with a blue background in order to show that it was manually
      * updated.
      * @private
@@ -228,13 +252,7 @@ export class MasterProductionScheduleModel extends EventBus {
      */
     _saveToReplenish(productionScheduleId, dateIndex, replenishQty) {
         return this.mutex.exec(() => {
-            this.orm.call(
-                'mrp.production.schedule',
-                'set_replenish_qty',
-                [productionScheduleId, dateIndex, replenishQty],
-            ).then(() => {
-                return this.reload(productionScheduleId);
-            });
+            return this._applyCellEdit(productionScheduleId, 'set_replenish_qty', dateIndex, replenishQty);
         });
     }
 
@@ -247,13 +265,7 @@ export class MasterProductionScheduleModel extends EventBus {
      */
     _removeQtyToReplenish(productionScheduleId, dateIndex) {
         return this.mutex.exec(() => {
-            this.orm.call(
-                'mrp.production.schedule',
-                'remove_replenish_qty',
-                [productionScheduleId, dateIndex]
-            ).then(() => {
-                return this.reload(productionScheduleId);
-            });
+            return this._applyCellEdit(productionScheduleId, 'remove_replenish_qty', dateIndex, null);
         });
     }
 
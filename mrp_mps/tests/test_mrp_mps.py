@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
+import logging
+import time
+
 from datetime import date, datetime, timedelta
-from odoo.tests import common, Form
+from odoo.tests import common, tagged, Form
 from odoo import Command
+from odoo.exceptions import UserError
 from odoo.tools.date_utils import start_of
 
+_logger = logging.getLogger(__name__)
+
 
 class TestMpsMps(common.TransactionCase):
 
@@ -726,3 +732,117 @@ class TestMpsMps(common.TransactionCase):
         mps_impacted = mps_p_l[0].get_impacted_schedule()
         self.assertEqual(len(mps_impacted), 1)
         self.assertEqual(mps_impacted[0], mps_c2.id)
+
+    def test_forecast_matrix(self):
+        """ The forecasts are summed by period in one read and the grid built
+        from them matches the forecasts of each period.
+        """
+        mps_dates = self.env.company._get_date_range()
+        self.env['mrp.product.forecast'].create([{
+            'production_schedule_id': self.mps_table.id,
+            'date': mps_dates[0][0],
+            'forecast_qty': 2,
+        }, {
+            'production_schedule_id': self.mps_table.id,
+            'date': mps_dates[0][1],
+            'forecast_qty': 3,
+        }, {
+            'production_schedule_id': self.mps_table.id,
+            'date': mps_dates[2][1],
+            'forecast_qty': 4,
+            'replenish_qty': 1,
+            'replenish_qty_updated': True,
+        }])
+        forecast_matrix = self.mps._get_forecast_matrix(mps_dates)
+        self.assertEqual(forecast_matrix[(self.mps_table.id, 0)]['forecast_qty'], 5)
+        self.assertFalse(forecast_matrix[(self.mps_table.id, 0)]['replenish_qty_updated'])
+        self.assertEqual(forecast_matrix[(self.mps_table.id, 2)]['forecast_qty'], 4)
+        self.assertTrue(forecast_matrix[(self.mps_table.id, 2)]['replenish_qty_updated'])
+        self.assertFalse((self.mps_table.id, 1) in forecast_matrix)
+        self.assertFalse((self.mps_drawer.id, 0) in forecast_matrix)
+
+        mps_table, mps_drawer = (self.mps_table | self.mps_drawer).get_production_schedule_view_state()
+        self.assertEqual([f['forecast_qty'] for f in mps_table['forecast_ids'][:3]], [5, 0, 4])
+        self.assertEqual([f['replenish_qty'] for f in mps_table['forecast_ids'][:3]], [5, 0, 1])
+        # 1 drawer by table, needed in the same period without lead time
+        self.assertEqual([f['indirect_demand_qty'] for f in mps_drawer['forecast_ids'][:3]], [5, 0, 1])
+        self.assertTrue(mps_drawer['has_indirect_demand'])
+        self.assertFalse(mps_table['has_indirect_demand'])
+
+    def test_apply_cell_edit(self):
+        """ A cell edit returns the cells of the edited schedule from the
+        edited period onward and the ones of its components, matching a full
+        recompute of the grid.
+        """
+        changes = self.mps_table.apply_cell_edit('set_forecast_qty', 1, 2)
+        changes_by_id = {change['id']: change for change in changes}
+        # Finished products and unrelated schedules are left untouched
+        self.assertEqual(set(changes_by_id), {self.mps_table.id, self.mps_drawer.id, self.mps_table_leg.id, self.mps_screw.id})
+        table_cells = {cell['index']: cell for cell in changes_by_id[self.mps_table.id]['cells']}
+        self.assertEqual(min(table_cells), 1)
+        self.assertEqual(table_cells[1]['forecast_qty'], 2)
+        self.assertEqual(table_cells[1]['replenish_qty'], 2)
+        self.assertTrue(changes_by_id[self.mps_drawer.id]['has_indirect_demand'])
+
+        states = {state['id']: state for state in self.mps.get_production_schedule_view_state()}
+        for change in changes:
+            for cell in change['cells']:
+                for field, value in cell.items():
+                    if field != 'index':
+                        self.assertEqual(states[change['id']]['forecast_ids'][cell['index']][field], value)
+
+        changes = self.mps_table.apply_cell_edit('set_replenish_qty', 1, 5)
+        table_cells = {cell['index']: cell for cell in changes[0]['cells']}
+        self.assertTrue(table_cells[1]['replenish_qty_updated'])
+        changes = self.mps_table.apply_cell_edit('remove_replenish_qty', 1)
+        drawer_change = next(change for change in changes if change['id'] == self.mps_drawer.id)
+        drawer_cells = {cell['index']: cell for cell in drawer_change['cells']}
+        self.assertEqual(drawer_cells[1]['indirect_demand_qty'], 2)
+
+        with self.assertRaises(UserError):
+            self.mps_table.apply_cell_edit('unlink', 1)
+
+
+@tagged('-standard', 'mrp_mps_benchmark')
+class TestMpsGridBenchmark(common.TransactionCase):
+    """ Time the MPS grid when the number of schedules and periods grows. Run
+    it with --test-tags mrp_mps_benchmark.
+    """
+
+    def _create_schedules(self, count):
+        products = self.env['product.product'].create([{
+            'name': 'MPS Benchmark %s' % i,
+            'type': 'product',
+        } for i in range(count)])
+        warehouse = self.env['stock.warehouse'].search([('company_id', '=', self.env.company.id)], limit=1)
+        # Chain the products two by two so that the grid has indirect demand
+        self.env['mrp.bom'].create([{
+            'product_tmpl_id': products[i].product_tmpl_id.id,
+            'product_qty': 1,
+            'bom_line_ids': [Command.create({'product_id': products[i + 1].id, 'product_qty': 2})],
+        } for i in range(0, count - 1, 2)])
+        return self.env['mrp.production.schedule'].create([{
+            'product_id': product.id,
+            'warehouse_id': warehouse.id,
+        } for product in products])
+
+    def test_grid_scaling(self):
+        for schedule_count, period_count in ((20, 12), (100, 12), (100, 52), (400, 52)):
+            self.env.company.write({
+                'manufacturing_period': 'week',
+                'manufacturing_period_to_display': period_count,
+            })
+            schedules = self._create_schedules(schedule_count)
+            date_range = self.env.company._get_date_range()
+            self.env['mrp.product.forecast'].create([{
+                'production_schedule_id': schedule.id,
+                'date': date_start,
+                'forecast_qty': 10,
+            } for schedule in schedules[::2] for date_start, dummy in date_range])
+            self.env.invalidate_all()
+            start = time.time()
+            states = schedules.get_production_schedule_view_state()
+            _logger.info("MPS grid of %s schedules x %s periods computed in %.2fs",
+                         schedule_count, period_count, time.time() - start)
+            self.assertEqual(len(states), schedule_count)
+            self.assertEqual(states[1]['forecast_ids'][0]['indirect_demand_qty'], 20)
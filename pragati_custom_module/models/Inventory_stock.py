@@ -1,8 +1,10 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, _
 # from babel.numbers import format_currency
 
+# Number of move dates listed in date_done, the whole history is available
+# through action_view_move_history.
+DATE_DONE_HISTORY_LIMIT = 20
 
-from odoo import models, fields, api
 
 class StockQuant(models.Model):
     _inherit = 'stock.quant'
@@ -10,7 +12,7 @@ class StockQuant(models.Model):
     move_location_id = fields.Many2one(
         'stock.location',
         string='From Location',
-        compute='_compute_move_location_id',
+        compute='_compute_move_history',
         store=False
     )
 
@@ -22,70 +24,112 @@ class StockQuant(models.Model):
 
     qty_done = fields.Float(
         string='Total Quantity Done',
-        compute='_compute_qty_done',
+        compute='_compute_move_history',
         store=False,
         readonly=True
     )
 
-    date_done = fields.Text(  # Show only move dates
+    date_done = fields.Text(  # Show only the latest move dates
         'Move History (Date)',
         copy=False,
         readonly=True,
-        help="All transfer dates for this product and location.",
-        compute='_compute_date_done',
+        help="Latest transfer dates for this product and location.",
+        compute='_compute_move_history',
         store=False
     )
 
-    @api.depends('location_id', 'product_id')
-    def _compute_move_location_id(self):
-        for quant in self:
-            move_line = self.env['stock.move.line'].search(
-                [
-                    ('location_dest_id', '=', quant.location_id.id),
-                    ('product_id', '=', quant.product_id.id)
-                ],
-                limit=1,
-                order='id desc'
-            )
-            quant.move_location_id = move_line.location_id if move_line else False
+    def _get_move_history(self):
+        """ Read the move history of all the quants in one query, the latest
+        dates of each quant being read through its own limited subquery.
+        Like the ORM searches, only the move lines of the allowed companies
+        are read.
+
+        :return: {(location_id, product_id): (last source location id, total quantity
+                 done, latest done dates newest first, number of done moves)}
+        """
+        pairs = {(quant.location_id.id, quant.product_id.id) for quant in self
+                 if quant.location_id and quant.product_id}
+        if not pairs:
+            return {}
+        location_ids, product_ids = zip(*pairs)
+        self.env['stock.move.line'].flush_model(
+            ['location_id', 'location_dest_id', 'product_id', 'state', 'qty_done', 'date', 'company_id'])
+        self.env.cr.execute("""
+            SELECT p.location_id, p.product_id, last_move.location_id, done.qty_done, recent.dates, done.done_count
+            FROM unnest(%(location_ids)s::int[], %(product_ids)s::int[]) AS p(location_id, product_id)
+            CROSS JOIN LATERAL (
+                SELECT COALESCE(SUM(qty_done), 0) AS qty_done, COUNT(*) AS done_count
+                FROM stock_move_line
+                WHERE location_dest_id = p.location_id AND product_id = p.product_id
+                  AND state = 'done' AND company_id = ANY(%(company_ids)s)
+            ) done
+            CROSS JOIN LATERAL (
+                SELECT ARRAY(
+                    SELECT date
+                    FROM stock_move_line
+                    WHERE location_dest_id = p.location_id AND product_id = p.product_id
+                      AND state = 'done' AND date IS NOT NULL AND company_id = ANY(%(company_ids)s)
+                    ORDER BY date DESC
+                    LIMIT %(limit)s
+                ) AS dates
+            ) recent
+            LEFT JOIN LATERAL (
+                SELECT location_id
+                FROM stock_move_line
+                WHERE location_dest_id = p.location_id AND product_id = p.product_id
+                  AND company_id = ANY(%(company_ids)s)
+                ORDER BY id DESC
+                LIMIT 1
+            ) last_move ON TRUE
+        """, {
+            'location_ids': list(location_ids),
+            'product_ids': list(product_ids),
+            'company_ids': self.env.companies.ids,
+            'limit': DATE_DONE_HISTORY_LIMIT,
+        })
+        return {(row[0], row[1]): row[2:] for row in self.env.cr.fetchall()}
 
     @api.depends('location_id', 'product_id')
-    def _compute_qty_done(self):
+    def _compute_move_history(self):
+        history = self._get_move_history()
         for quant in self:
-            move_lines = self.env['stock.move.line'].search(
-                [
-                    ('location_dest_id', '=', quant.location_id.id),
-                    ('product_id', '=', quant.product_id.id),
-                    ('state', '=', 'done'),
-                ]
-            )
-            quant.qty_done = sum(move_lines.mapped('qty_done'))
+            move_location_id, qty_done, dates, done_count = history.get(
+                (quant.location_id.id, quant.product_id.id), (False, 0.0, None, 0))
+            quant.move_location_id = move_location_id
+            quant.qty_done = qty_done
 
-    @api.depends('location_id', 'product_id')
-    def _compute_date_done(self):
-        for quant in self:
-            move_lines = self.env['stock.move.line'].search(
-                [
-                    ('location_dest_id', '=', quant.location_id.id),
-                    ('product_id', '=', quant.product_id.id),
-                    ('state', '=', 'done'),
-                ],
-                order='date asc'
-            )
-
-            if not move_lines:
+            if not done_count:
                 quant.date_done = "No move history found."
                 continue
 
             result = "Move Dates:\n"
             result += "-" * 20 + "\n"
-
-            for ml in move_lines:
-                date_str = ml.date.strftime('%Y-%m-%d %H:%M') if ml.date else ''
-                result += f"{date_str}\n"
+            if done_count > len(dates or []):
+                result += _("... %s earlier moves", done_count - len(dates)) + "\n"
+            for date in reversed(dates or []):
+                result += f"{date.strftime('%Y-%m-%d %H:%M')}\n"
 
             quant.date_done = result
 
+    def action_view_move_history(self):
+        """ Open the done move lines of the quant, the list view paginates the
+        whole history.
+        """
+        self.ensure_one()
+        return {
+            'name': _('Move History'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'stock.move.line',
+            'view_mode': 'tree,form',
+            'domain': [
+                ('location_dest_id', '=', self.location_id.id),
+                ('product_id', '=', self.product_id.id),
+                ('state', '=', 'done'),
+            ],
+            'context': {'create': False},
+            'target': 'current',
+        }
+
 
 # class StockQuant(models.Model):
 #     _inherit = 'stock.quant'
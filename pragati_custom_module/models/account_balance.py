@@ -8,21 +8,9 @@ class ServiceCompletion(models.Model):
 
     @api.depends('service_order_id')
     def _compute_balance_amount(self):
+        # Latest reference amount minus the received amounts of the payment
+        # advice lines of each SO, grouped in one query for all the records
+        balances = self.env['payment.advice.line']._get_reference_balances(
+            self.service_order_id.mapped('name'))
         for rec in self:
-            rec.balance_amount = 0.0
-            if rec.service_order_id:
-                service_order_name = rec.service_order_id.name
-
-                # Get payment advice lines related to this SO
-                paid_lines = self.env['payment.advice.line'].search([
-                    ('reference', '=', service_order_name)
-                ])
-
-                # Take the latest reference_amount from advice lines (in case of multiple entries)
-                reference_amount = 0.0
-                if paid_lines:
-                    reference_amount = max(line.reference_amount for line in paid_lines)
-
-                paid = sum(line.rec_amount for line in paid_lines)
-
-                rec.balance_amount = reference_amount - paid
+            rec.balance_amount = balances.get(rec.service_order_id.name, 0.0) if rec.service_order_id else 0.0
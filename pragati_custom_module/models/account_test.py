@@ -7,28 +7,16 @@ class AccountMove(models.Model):
         string="Balance Amount", compute='_compute_balance_amount', store=True
     )
 
+    def _get_balance_references(self):
+        self.ensure_one()
+        return [reference.strip() for reference in (self.invoice_origin, self.name, self.ref) if reference]
+
     @api.depends('invoice_origin', 'name', 'ref')
     def _compute_balance_amount(self):
-        for move in self:
-            move.balance_amount = 0.0
-            references_to_try = []
-
-            if move.invoice_origin:
-                references_to_try.append(move.invoice_origin.strip())
-            if move.name:
-                references_to_try.append(move.name.strip())
-            if move.ref:
-                references_to_try.append(move.ref.strip())
-
-            for ref in references_to_try:
-                advice_lines = self.env['payment.advice.line'].search([
-                    ('reference', '=', ref)
-                ])
-                if advice_lines:
-                    reference_amount = max(
-                        (line.reference_amount for line in advice_lines if line.reference_amount),
-                        default=0.0
-                    )
-                    paid = sum(line.rec_amount or 0.0 for line in advice_lines)
-                    move.balance_amount = reference_amount - paid
-                    break
+        references_by_move = {move: move._get_balance_references() for move in self}
+        balances = self.env['payment.advice.line']._get_reference_balances(
+            [ref for references in references_by_move.values() for ref in references])
+        for move, references in references_by_move.items():
+            # First reference having payment advice lines
+            ref = next((ref for ref in references if ref in balances), None)
+            move.balance_amount = balances[ref] if ref else 0.0
@@ -4,8 +4,9 @@ from datetime import date
 class StockLot(models.Model):
     _inherit = 'stock.lot'
 
-    alert_date = fields.Date(string='Alert Date')
+    alert_date = fields.Date(string='Alert Date', index=True)
 
+    # Depends on today: kept up to date by _refresh_expiry_state in the daily cron
     expiry_state = fields.Selection([
         ('ok', 'OK'),
         ('alert', 'Alert')
@@ -22,10 +23,40 @@ class StockLot(models.Model):
             else:
                 rec.expiry_state = 'ok'
 
+    @api.model
+    def _refresh_expiry_state(self, today=None):
+        """ Recompute the expiry state of the lots whose state changed with the date,
+        in one query instead of recomputing every lot.
+        """
+        today = today or date.today()
+        self.flush_model(['alert_date', 'removal_date', 'expiry_state'])
+        self.env.cr.execute("""
+            UPDATE stock_lot
+            SET expiry_state = new_state
+            FROM (
+                SELECT id, CASE WHEN removal_date::date >= %(today)s AND alert_date <= %(today)s
+                                THEN 'alert' ELSE 'ok' END AS new_state
+                FROM stock_lot
+            ) computed
+            WHERE computed.id = stock_lot.id
+              AND stock_lot.expiry_state IS DISTINCT FROM computed.new_state
+        """, {'today': today})
+        self.invalidate_model(['expiry_state'])
+        return self.env.cr.rowcount
+
+    def _get_expiry_alert_line(self):
+        self.ensure_one()
+        return (
+            f"🔹 <b>Product:</b> {self.product_id.display_name} - "
+            f"<b>Lot:</b> {self.name} - "
+            f"<b>Expiration Date:</b> {self.expiration_date or 'N/A'}"
+        )
+
     @api.model
     def _check_lot_expiry_alerts(self):
         today = date.today()
-        lots = self.search([('alert_date', '=', today)])
+        self._refresh_expiry_state(today)
+        lots = self.search([('alert_date', '=', today)], order='expiration_date, id')
         if not lots:
             return
 
@@ -53,36 +84,31 @@ class StockLot(models.Model):
             })
             return
 
-        partner_ids = users.mapped('partner_id.id')
-
         activity_type = self.env.ref('mail.mail_activity_data_todo', raise_if_not_found=False)
         if not activity_type:
             return
 
-        for lot in lots:
-            message = (
-                f"🔔 <b>Expiry Alert</b><br/>"
-                f"🔹 <b>Product:</b> {lot.product_id.display_name}<br/>"
-                f"🔹 <b>Lot:</b> {lot.name}<br/>"
-                f"🔹 <b>Expiration Date:</b> {lot.expiration_date or 'N/A'}"
-            )
-
-            # Post to chatter with all partners
-            lot.message_post(
-                body=message,
-                partner_ids=partner_ids,
-                message_type="notification",
-                subtype_xmlid='mail.mt_note',
-            )
+        # Activities are created in one batch without the assignment mail of each
+        # of them, the users get the digest below instead.
+        res_model_id = self.env['ir.model']._get_id('stock.lot')
+        self.env['mail.activity'].with_context(mail_activity_quick_update=True).create([{
+            'res_model_id': res_model_id,
+            'res_id': lot.id,
+            'activity_type_id': activity_type.id,
+            'summary': 'Product Expiry Alert',
+            'note': lot._get_expiry_alert_line(),
+            'user_id': user.id,
+            'date_deadline': lot.alert_date or today,
+        } for lot in lots for user in users])
 
-            # Create activity for each user
-            for user in users:
-                self.env['mail.activity'].create({
-                    'res_model_id': self.env['ir.model']._get_id('stock.lot'),
-                    'res_id': lot.id,
-                    'activity_type_id': activity_type.id,
-                    'summary': 'Product Expiry Alert',
-                    'note': message,
-                    'user_id': user.id,
-                    'date_deadline': lot.alert_date or today,
-                })
+        # One summary of all the expiring lots for each user
+        message = (
+            f"🔔 <b>Expiry Alert</b>: {len(lots)} lot(s) reached their alert date<br/>"
+            + "<br/>".join(lot._get_expiry_alert_line() for lot in lots)
+        )
+        self.browse().message_notify(
+            body=message,
+            subject='Product Expiry Alert (%s)' % today,
+            partner_ids=users.partner_id.ids,
+            subtype_xmlid='mail.mt_note',
+        )
@@ -14,6 +14,8 @@
     """,
     'data': [
         'security/ir.model.access.csv',
+        'data/stock_report_snapshot_data.xml',
+        'views/stock_report_snapshot_views.xml',
         'wizard/stock_report.xml',
         'report/stock_report.xml',
         'report/stock_template.xml'
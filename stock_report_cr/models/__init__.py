@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo Module Developed by CandidRoot Solutions Pvt. Ltd.
+# See LICENSE file for full copyright and licensing details.
+from . import stock_report_snapshot
+from . import stock_move_line
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo Module Developed by CandidRoot Solutions Pvt. Ltd.
+# See LICENSE file for full copyright and licensing details.
+from odoo import models, api
+
+SNAPSHOT_FIELDS = {'state', 'date', 'qty_done', 'location_id', 'location_dest_id', 'product_id', 'company_id'}
+
+
+class StockMoveLine(models.Model):
+    _inherit = "stock.move.line"
+
+    def _invalidate_stock_snapshots(self, dates):
+        """ Done move lines dated before a closed snapshot are not part of it. """
+        dates = [date for date in dates if date]
+        if dates:
+            self.env['stock.report.snapshot'].sudo()._invalidate_snapshots(min(dates))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines._invalidate_stock_snapshots([line.date for line in lines if line.state == 'done'])
+        return lines
+
+    def write(self, vals):
+        if not SNAPSHOT_FIELDS.intersection(vals):
+            return super().write(vals)
+        # Both the old and the new date of the done lines are affected
+        dates = [line.date for line in self if line.state == 'done']
+        res = super().write(vals)
+        self._invalidate_stock_snapshots(dates + [line.date for line in self if line.state == 'done'])
+        return res
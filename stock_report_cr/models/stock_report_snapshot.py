@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo Module Developed by CandidRoot Solutions Pvt. Ltd.
+# See LICENSE file for full copyright and licensing details.
+from odoo import fields, models, api, _
+from datetime import datetime, timedelta, time
+import logging
+
+_logger = logging.getLogger(__name__)
+
+SNAPSHOT_DAILY_RETENTION = 62
+
+
+class StockReportSnapshot(models.Model):
+    """ Stock position per (date, location, product, company) at the end of the
+    snapshot date, closed every night from the previous snapshot and the done
+    move lines of the day. As-of-date stock queries start from the latest
+    snapshot and only sum the move lines after it.
+    """
+    _name = "stock.report.snapshot"
+    _description = "Stock Report Snapshot"
+    _order = "date desc, location_id, product_id"
+
+    date = fields.Date('Date', required=True, readonly=True, index=True)
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True)
+    location_id = fields.Many2one('stock.location', string='Location', required=True, readonly=True,
+                                  ondelete='cascade')
+    product_id = fields.Many2one('product.product', string='Product', required=True, readonly=True,
+                                 ondelete='cascade')
+    quantity = fields.Float('Quantity', readonly=True)
+    value = fields.Float('Value', readonly=True)
+
+    _sql_constraints = [
+        ('snapshot_uniq', 'unique(date, company_id, location_id, product_id)',
+         'Only one stock snapshot per date, company, location and product is allowed.'),
+    ]
+
+    @api.model
+    def _snapshot_end(self, snapshot_date):
+        """ First move line datetime not covered by the snapshot of snapshot_date. """
+        return datetime.combine(snapshot_date + timedelta(days=1), time.min)
+
+    @api.model
+    def _get_snapshot_date(self, before_dt):
+        """ Date of the latest snapshot entirely before before_dt (a datetime, or a
+        date standing for its midnight), False if none.
+        """
+        if isinstance(before_dt, datetime):
+            before_dt = before_dt.date()
+        self.flush_model(['date'])
+        self.env.cr.execute("SELECT MAX(date) FROM stock_report_snapshot WHERE date < %s", (before_dt,))
+        return self.env.cr.fetchone()[0] or False
+
+    @api.model
+    def _close_snapshot(self, snapshot_date):
+        """ Store the stock position at the end of snapshot_date, from the previous
+        snapshot and the done move lines since then.
+        """
+        to_dt = self._snapshot_end(snapshot_date)
+        previous_date = self._get_snapshot_date(to_dt - timedelta(days=1))
+        from_dt = self._snapshot_end(previous_date) if previous_date else datetime.min
+        self.env['stock.move.line'].flush_model(
+            ['state', 'date', 'qty_done', 'location_id', 'location_dest_id', 'product_id', 'company_id'])
+        self.env.cr.execute("DELETE FROM stock_report_snapshot WHERE date = %s", (snapshot_date,))
+        self.env.cr.execute("""
+            INSERT INTO stock_report_snapshot
+                (date, company_id, location_id, product_id, quantity, value,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT %(date)s, pos.company_id, pos.location_id, pos.product_id, SUM(pos.qty), 0,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM (
+                SELECT company_id, location_id, product_id, quantity AS qty
+                FROM stock_report_snapshot
+                WHERE date = %(previous_date)s
+                UNION ALL
+                SELECT company_id, location_dest_id, product_id, qty_done
+                FROM stock_move_line
+                WHERE state = 'done' AND date >= %(from_dt)s AND date < %(to_dt)s
+                UNION ALL
+                SELECT company_id, location_id, product_id, -qty_done
+                FROM stock_move_line
+                WHERE state = 'done' AND date >= %(from_dt)s AND date < %(to_dt)s
+            ) pos
+            GROUP BY pos.company_id, pos.location_id, pos.product_id
+            HAVING SUM(pos.qty) <> 0
+        """, {
+            'date': snapshot_date,
+            'previous_date': previous_date or None,
+            'from_dt': from_dt,
+            'to_dt': to_dt,
+            'uid': self.env.uid,
+        })
+        count = self.env.cr.rowcount
+        if 'stock.valuation.layer' in self.env:
+            # Value the positions at the average unit cost of the valuation layers
+            self.env['stock.valuation.layer'].flush_model(['company_id', 'product_id', 'quantity', 'value'])
+            self.env.cr.execute("""
+                UPDATE stock_report_snapshot s
+                SET value = s.quantity * v.unit_cost
+                FROM (
+                    SELECT company_id, product_id, SUM(value) / NULLIF(SUM(quantity), 0) AS unit_cost
+                    FROM stock_valuation_layer
+                    WHERE create_date < %(to_dt)s
+                    GROUP BY company_id, product_id
+                ) v
+                WHERE s.date = %(date)s AND s.company_id = v.company_id AND s.product_id = v.product_id
+                  AND v.unit_cost IS NOT NULL
+            """, {'date': snapshot_date, 'to_dt': to_dt})
+        self.invalidate_model()
+        _logger.info("Closed stock snapshot of %s: %s positions", snapshot_date, count)
+        return count
+
+    @api.model
+    def _invalidate_snapshots(self, move_dt):
+        """ Drop the snapshots covering move_dt, after a done move line was dated
+        (backdated) or changed before a closed snapshot. Stock queries then start
+        from an earlier snapshot and the next close sums the move lines since it.
+        """
+        self.flush_model(['date'])
+        self.env.cr.execute("DELETE FROM stock_report_snapshot WHERE date >= %s", (move_dt.date(),))
+        if self.env.cr.rowcount:
+            _logger.info("Dropped %s stock snapshot positions from %s", self.env.cr.rowcount, move_dt.date())
+            self.invalidate_model()
+
+    @api.model
+    def _gc_snapshots(self, today):
+        """ Keep the recent daily snapshots and the month-end ones. """
+        self.env.cr.execute("""
+            DELETE FROM stock_report_snapshot
+            WHERE date < %s
+              AND date <> (date_trunc('month', date) + interval '1 month - 1 day')::date
+              AND date <> (SELECT MAX(date) FROM stock_report_snapshot)
+        """, (today - timedelta(days=SNAPSHOT_DAILY_RETENTION),))
+        self.invalidate_model()
+
+    @api.model
+    def cron_close_snapshots(self):
+        """ Nightly job: close yesterday's stock position. """
+        # Snapshot boundaries are UTC midnights, whatever the cron user timezone
+        today = fields.Date.today()
+        yesterday = today - timedelta(days=1)
+        if not self.search_count([('date', '=', yesterday)]):
+            self._close_snapshot(yesterday)
+        self._gc_snapshots(today)
+        return True
+
+    @api.model
+    def rebuild_snapshots(self):
+        """ Drop every snapshot and close yesterday's position from the whole move history. """
+        self.env.cr.execute("DELETE FROM stock_report_snapshot")
+        self.invalidate_model()
+        return self._close_snapshot(fields.Date.today() - timedelta(days=1))
+
+    @api.model
+    def check_snapshots(self):
+        """ Compare the current stock of internal locations, as computed from the
+        latest snapshot and the move lines since then, with stock.quant.
+
+        :return: list of (location_id, product_id, snapshot quantity, quant quantity)
+        """
+        now = fields.Datetime.now()
+        snapshot_date = self._get_snapshot_date(now)
+        from_dt = self._snapshot_end(snapshot_date) if snapshot_date else datetime.min
+        self.env['stock.quant'].flush_model(['location_id', 'product_id', 'quantity'])
+        self.env['stock.move.line'].flush_model(
+            ['state', 'date', 'qty_done', 'location_id', 'location_dest_id', 'product_id'])
+        self.env.cr.execute("""
+            SELECT pos.location_id, pos.product_id,
+                   COALESCE(SUM(pos.qty) FILTER (WHERE pos.origin = 'snapshot'), 0) AS snapshot_qty,
+                   COALESCE(SUM(pos.qty) FILTER (WHERE pos.origin = 'quant'), 0) AS quant_qty
+            FROM (
+                SELECT location_id, product_id, quantity AS qty, 'snapshot' AS origin
+                FROM stock_report_snapshot
+                WHERE date = %(date)s
+                UNION ALL
+                SELECT location_dest_id, product_id, qty_done, 'snapshot'
+                FROM stock_move_line
+                WHERE state = 'done' AND date >= %(from_dt)s
+                UNION ALL
+                SELECT location_id, product_id, -qty_done, 'snapshot'
+                FROM stock_move_line
+                WHERE state = 'done' AND date >= %(from_dt)s
+                UNION ALL
+                SELECT location_id, product_id, quantity, 'quant'
+                FROM stock_quant
+            ) pos
+            JOIN stock_location sl ON sl.id = pos.location_id
+            WHERE sl.usage = 'internal'
+            GROUP BY pos.location_id, pos.product_id
+            HAVING ABS(COALESCE(SUM(pos.qty) FILTER (WHERE pos.origin = 'snapshot'), 0)
+                       - COALESCE(SUM(pos.qty) FILTER (WHERE pos.origin = 'quant'), 0)) > 0.0001
+        """, {'date': snapshot_date or None, 'from_dt': from_dt})
+        mismatches = self.env.cr.fetchall()
+        for location_id, product_id, snapshot_qty, quant_qty in mismatches:
+            _logger.warning("Stock snapshot mismatch for location %s, product %s: %s computed, %s in quants",
+                            location_id, product_id, snapshot_qty, quant_qty)
+        return mismatches
+
+    def action_check_snapshots(self):
+        mismatches = self.check_snapshots()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Stock Snapshots"),
+                'message': _("%s location/product positions differ from the stock quants.", len(mismatches))
+                if mismatches else _("Stock snapshots are consistent with the stock quants."),
+                'type': 'warning' if mismatches else 'success',
+                'sticky': bool(mismatches),
+            },
+        }
+
+    def action_rebuild_snapshots(self):
+        count = self.rebuild_snapshots()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Stock Snapshots"),
+                'message': _("Stock snapshot rebuilt with %s positions.", count),
+                'type': 'success',
+                'sticky': False,
+            },
+        }
@@ -68,76 +68,93 @@ class ReportWizard(models.TransientModel):
             self.start_date = today - relativedelta(months=1, day=1)
             self.end_date = today.replace(day=1) - timedelta(days=1)
 
-    def _compute_initial_stock(self, product_ids, location_ids, start_date):
-        initial_stock_dict = {}
-        domain = [('date', '<', start_date), ('state', '=', 'done')]
-        if product_ids:
-            domain.append(('product_id', 'in', product_ids))
-
-        if location_ids:
-            domain_in = domain + [('location_dest_id', 'in', location_ids.ids)]
-            domain_out = domain + [('location_id', 'in', location_ids.ids)]
+    def _get_stock_movements(self, start_dt, end_dt):
+        """ Initial stock, incoming and outgoing quantities per (location, product)
+        in a single pass over the done move lines up to end_dt. The initial stock
+        starts from the latest stock snapshot before start_dt when there is one,
+        snapshots covering a backdated move line are dropped when it is written.
+        """
+        snapshot_obj = self.env['stock.report.snapshot']
+        snapshot_date = snapshot_obj._get_snapshot_date(start_dt)
+        self.env['stock.move.line'].flush_model(
+            ['state', 'date', 'qty_done', 'location_id', 'location_dest_id', 'product_id', 'company_id'])
+        if self.location_ids:
+            location_filter = "sl.id = ANY(%(location_ids)s)"
         else:
-            domain_in = domain + [('location_dest_id.usage', '=', 'internal')]
-            domain_out = domain + [('location_id.usage', '=', 'internal')]
-
-        incoming_moves = self.env['stock.move.line'].read_group(domain_in,
-                                                                ['product_id', 'location_dest_id', 'qty_done:sum'],
-                                                                ['product_id', 'location_dest_id'], lazy=False)
-        for move in incoming_moves:
-            key = (move['location_dest_id'][0], move['product_id'][0])
-            initial_stock_dict[key] = initial_stock_dict.get(key, 0) + move['qty_done']
-
-        outgoing_moves = self.env['stock.move.line'].read_group(domain_out,
-                                                                ['product_id', 'location_id', 'qty_done:sum'],
-                                                                ['product_id', 'location_id'], lazy=False)
-        for move in outgoing_moves:
-            key = (move['location_id'][0], move['product_id'][0])
-            initial_stock_dict[key] = initial_stock_dict.get(key, 0) - move['qty_done']
+            location_filter = "sl.usage = 'internal'"
+        product_filter = "AND {alias}.product_id = ANY(%(product_ids)s)" if self.products else ""
+        query = """
+            SELECT ks.location_id, ks.product_id,
+                   COALESCE(SUM(ks.qty) FILTER (WHERE ks.date IS NULL OR ks.date < %(start_dt)s), 0) AS initial_stock,
+                   COALESCE(SUM(ks.qty) FILTER (WHERE ks.date >= %(start_dt)s AND ks.incoming), 0) AS in_qty,
+                   COALESCE(-SUM(ks.qty) FILTER (WHERE ks.date >= %(start_dt)s AND NOT ks.incoming), 0) AS out_qty
+            FROM (
+                SELECT s.location_id, s.product_id, NULL::timestamp AS date,
+                       s.quantity AS qty, TRUE AS incoming
+                FROM stock_report_snapshot s
+                JOIN stock_location sl ON sl.id = s.location_id
+                WHERE s.date = %(snapshot_date)s
+                  AND s.company_id = ANY(%(company_ids)s) AND {location_filter} {snapshot_product_filter}
+                UNION ALL
+                SELECT sml.location_dest_id AS location_id, sml.product_id, sml.date,
+                       sml.qty_done AS qty, TRUE AS incoming
+                FROM stock_move_line sml
+                JOIN stock_location sl ON sl.id = sml.location_dest_id
+                WHERE sml.state = 'done' AND sml.date >= %(from_dt)s AND sml.date <= %(end_dt)s
+                  AND sml.company_id = ANY(%(company_ids)s) AND {location_filter} {product_filter}
+                UNION ALL
+                SELECT sml.location_id, sml.product_id, sml.date,
+                       -sml.qty_done AS qty, FALSE AS incoming
+                FROM stock_move_line sml
+                JOIN stock_location sl ON sl.id = sml.location_id
+                WHERE sml.state = 'done' AND sml.date >= %(from_dt)s AND sml.date <= %(end_dt)s
+                  AND sml.company_id = ANY(%(company_ids)s) AND {location_filter} {product_filter}
+            ) ks
+            GROUP BY ks.location_id, ks.product_id
+        """.format(location_filter=location_filter,
+                   product_filter=product_filter.format(alias='sml'),
+                   snapshot_product_filter=product_filter.format(alias='s'))
+        self.env.cr.execute(query, {
+            'snapshot_date': snapshot_date or None,
+            'from_dt': snapshot_obj._snapshot_end(snapshot_date) if snapshot_date else datetime.min,
+            'start_dt': start_dt,
+            'end_dt': end_dt,
+            'company_ids': self.env.companies.ids,
+            'location_ids': self.location_ids.ids,
+            'product_ids': self.products.ids,
+        })
+        return {
+            (row['location_id'], row['product_id']): (row['initial_stock'], row['in_qty'], row['out_qty'])
+            for row in self.env.cr.dictfetchall()
+        }
 
-        return initial_stock_dict
+    def _get_product_info(self, product_ids):
+        """ Report attributes of the given products, read in batch. """
+        products = self.env['product.product'].browse(product_ids).with_company(self.company_id)
+        product_vals = products.read(
+            ['name', 'default_code', 'type', 'uom_id', 'categ_id', 'product_tmpl_id', 'list_price',
+             'standard_price'], load=False)
+        uom_names = {uom.id: uom.name for uom in products.uom_id}
+        categ_names = {categ.id: categ.name for categ in products.categ_id}
+        hsn_codes = {}
+        if 'l10n_in_hsn_code' in products.product_tmpl_id._fields:
+            hsn_codes = {tmpl['id']: tmpl['l10n_in_hsn_code']
+                         for tmpl in products.product_tmpl_id.read(['l10n_in_hsn_code'], load=False)}
+        return {vals['id']: dict(vals,
+                                 uom=uom_names.get(vals['uom_id'], ''),
+                                 category=categ_names.get(vals['categ_id'], ''),
+                                 hsn=hsn_codes.get(vals['product_tmpl_id']) or '')
+                for vals in product_vals}
 
     def _get_report_data(self, start_dt, end_dt):
-        domain_prod = [('product_id', 'in', self.products.ids)] if self.products else []
-        initial_stock_dict = self._compute_initial_stock(self.products.ids if self.products else [], self.location_ids,
-                                                         start_dt)
-
-        domain_in = [('date', '>=', start_dt), ('date', '<=', end_dt), ('state', '=', 'done')] + domain_prod
-        domain_out = list(domain_in)
-
-        if self.location_ids:
-            domain_in.append(('location_dest_id', 'in', self.location_ids.ids))
-            domain_out.append(('location_id', 'in', self.location_ids.ids))
-        else:
-            domain_in.append(('location_dest_id.usage', '=', 'internal'))
-            domain_out.append(('location_id.usage', '=', 'internal'))
-
-        incoming_moves = self.env['stock.move.line'].read_group(domain_in,
-                                                                ['product_id', 'location_dest_id', 'qty_done:sum'],
-                                                                ['product_id', 'location_dest_id'], lazy=False)
-        incoming_dict = {}
-        for move in incoming_moves:
-            key = (move['location_dest_id'][0], move['product_id'][0])
-            incoming_dict[key] = incoming_dict.get(key, 0) + move['qty_done']
-
-        outgoing_moves = self.env['stock.move.line'].read_group(domain_out,
-                                                                ['product_id', 'location_id', 'qty_done:sum'],
-                                                                ['product_id', 'location_id'], lazy=False)
-        outgoing_dict = {}
-        for move in outgoing_moves:
-            key = (move['location_id'][0], move['product_id'][0])
-            outgoing_dict[key] = outgoing_dict.get(key, 0) + move['qty_done']
-
-        all_keys = set(initial_stock_dict.keys()) | set(incoming_dict.keys()) | set(outgoing_dict.keys())
+        movements = self._get_stock_movements(start_dt, end_dt)
+        all_keys = set(movements.keys())
 
         loc_ids = list(set([k[0] for k in all_keys]))
         prod_ids = list(set([k[1] for k in all_keys]))
 
-        locations_obj = self.env['stock.location'].browse(loc_ids)
-        products_obj = self.env['product.product'].browse(prod_ids).with_company(self.company_id)
-
-        loc_dict = {l.id: l.name for l in locations_obj}
-        prod_dict = {p.id: p for p in products_obj}
+        loc_dict = {l['id']: l['name'] for l in self.env['stock.location'].browse(loc_ids).read(['name'])}
+        prod_dict = self._get_product_info(prod_ids)
 
         # --- NATIVE ODOO STOCK VALUATION MATCHING LOGIC ---
         # 1. Fetch exact total value natively to match the "Stock Valuation" screen.
@@ -157,16 +174,13 @@ class ReportWizard(models.TransientModel):
         product_net_balances = {}
         locations_count = {}
 
-        for loc_id, prod_id in all_keys:
+        for (loc_id, prod_id), (initial, in_qty, out_qty) in movements.items():
             product = prod_dict[prod_id]
 
             # CRITICAL FIX 1: Exclude 'consumables' from financial calculation like Odoo does
-            if product.type != 'product':
+            if product['type'] != 'product':
                 continue
 
-            initial = initial_stock_dict.get((loc_id, prod_id), 0)
-            in_qty = incoming_dict.get((loc_id, prod_id), 0)
-            out_qty = outgoing_dict.get((loc_id, prod_id), 0)
             balance = initial + in_qty - out_qty
 
             product_net_balances[prod_id] = product_net_balances.get(prod_id, 0.0) + balance
@@ -177,22 +191,19 @@ class ReportWizard(models.TransientModel):
         distributed_val_tracker = {}
 
         record_list = []
-        for loc_id, prod_id in all_keys:
-            initial = initial_stock_dict.get((loc_id, prod_id), 0)
-            in_qty = incoming_dict.get((loc_id, prod_id), 0)
-            out_qty = outgoing_dict.get((loc_id, prod_id), 0)
+        for (loc_id, prod_id), (initial, in_qty, out_qty) in movements.items():
             balance = initial + in_qty - out_qty
 
             if initial == 0 and in_qty == 0 and out_qty == 0 and balance == 0:
                 continue
 
             product = prod_dict[prod_id]
-            sale_price = round(float(product.list_price or 0.0), 2)
+            sale_price = round(float(product['list_price'] or 0.0), 2)
 
             loc_cost_value = 0.0
             cost_price = 0.0
 
-            if product.type == 'product':
+            if product['type'] == 'product':
                 total_val = valuation_lookup.get(prod_id, 0.0)
                 total_bal = product_net_balances.get(prod_id, 0.0)
 
@@ -210,7 +221,7 @@ class ReportWizard(models.TransientModel):
                         cost_price = total_val / total_bal
                         distributed_val_tracker[prod_id] = distributed_val_tracker.get(prod_id, 0.0) + loc_cost_value
                 elif total_bal == 0 and balance == 0:
-                    cost_price = product.standard_price
+                    cost_price = product['standard_price']
             else:
                 # Consumables keep physical qty but get 0.00 financial cost to match Odoo Native
                 cost_price = 0.0
@@ -218,10 +229,10 @@ class ReportWizard(models.TransientModel):
 
             record_list.append({
                 'location_name': loc_dict[loc_id],
-                'product': product.name,
-                'default_code': product.default_code or '',
-                'uom': product.uom_id.name,
-                'hsn': product.product_tmpl_id.l10n_in_hsn_code or '',
+                'product': product['name'],
+                'default_code': product['default_code'] or '',
+                'uom': product['uom'],
+                'hsn': product['hsn'],
                 'initial_stock': initial,
                 'in': in_qty,
                 'out': out_qty,
@@ -230,7 +241,8 @@ class ReportWizard(models.TransientModel):
                 'sale_value': round(sale_price * balance, 2),
                 'cost_price': round(cost_price, 2),
                 'cost_value': round(loc_cost_value, 2),  # Mathematically locked to Odoo Stock Valuation total
-                'rec_set': product,
+                'product_id': prod_id,
+                'category': product['category'],
             })
 
         return sorted(record_list, key=lambda k: (k['location_name'], k['product']))
@@ -256,19 +268,20 @@ class ReportWizard(models.TransientModel):
         location_totals = {}
         category_totals_by_loc = {}
 
-        for loc_name in set(r['location_name'] for r in record_list):
-            loc_recs = [r for r in record_list if r['location_name'] == loc_name]
-            location_totals[loc_name] = self._calculate_totals(loc_recs)
+        # Single pass: record_list is sorted by location, so every location keeps its product order
+        for r in record_list:
+            if self.group_by_category:
+                locations_data.setdefault(r['location_name'], {}).setdefault(r['category'], []).append(r)
+            else:
+                locations_data.setdefault(r['location_name'], []).append(r)
 
+        for loc_name, loc_data in locations_data.items():
             if self.group_by_category:
-                cat_dict = {}
-                for r in loc_recs:
-                    cat_name = r['rec_set'].categ_id.name
-                    cat_dict.setdefault(cat_name, []).append(r)
-                locations_data[loc_name] = cat_dict
-                category_totals_by_loc[loc_name] = self._calculate_category_totals(cat_dict)
+                category_totals_by_loc[loc_name] = self._calculate_category_totals(loc_data)
+                location_totals[loc_name] = self._calculate_totals(
+                    [r for recs in loc_data.values() for r in recs])
             else:
-                locations_data[loc_name] = loc_recs
+                location_totals[loc_name] = self._calculate_totals(loc_data)
 
         return locations_data, location_totals, category_totals_by_loc
 
@@ -448,7 +461,7 @@ class ReportWizard(models.TransientModel):
         # Aggregate data by product
         consolidated_dict = {}
         for rec in record_list:
-            prod_key = rec['rec_set'].id
+            prod_key = rec['product_id']
             if prod_key not in consolidated_dict:
                 consolidated_dict[prod_key] = {
                     'default_code': rec['default_code'],
@@ -463,7 +476,8 @@ class ReportWizard(models.TransientModel):
                     'cost_price': rec['cost_price'],
                     'sale_value': 0,
                     'cost_value': 0,
-                    'rec_set': rec['rec_set']
+                    'product_id': rec['product_id'],
+                    'category': rec['category'],
                 }
             consolidated_dict[prod_key]['initial_stock'] += rec['initial_stock']
             consolidated_dict[prod_key]['in'] += rec['in']
@@ -503,7 +517,7 @@ class ReportWizard(models.TransientModel):
         if self.group_by_category:
             consolidated_by_cat = {}
             for rec in consolidated_list:
-                cat_name = rec['rec_set'].categ_id.name
+                cat_name = rec['category']
                 consolidated_by_cat.setdefault(cat_name, []).append(rec)
 
             for cat_name, recs in consolidated_by_cat.items():